@@ -122,10 +122,11 @@ def analyze_isometric_edges(image_path):
     except Exception as e:
         return {'error': str(e)}
 
-def generate_js_mapping(filename, variable_name, grouped_data, description, helper_prefix):
+def generate_js_mapping(filename, variable_name, grouped_data, description, helper_prefix,
+                        generator='analyze_isometric_edges.py'):
     with open(filename, 'w') as f:
         f.write(f"// {description}\n")
-        f.write("// Generated by analyze_isometric_edges.py\n")
+        f.write(f"// Generated by {generator}\n")
         f.write("// Bitmask: 1=TR (N), 2=BR (E), 4=BL (S), 8=TL (W)\n\n")
         f.write(f"export const {variable_name} = {{\n")
         
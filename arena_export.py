@@ -0,0 +1,229 @@
+"""
+Arena Bundle Export
+Crops one or more rectangles out of a facet and writes a single small file
+with their land, statics and everything needed to draw and walk them: the
+art of the land tiles and statics, the land texmaps and the tiledata flags.
+Tile IDs are renumbered into a compact local ID space, so the client loads
+an arena with one fetch and a handful of typed-array views
+(js/modules/arenaBundleLoader.js) instead of the full 7168×4096 files.
+
+Only the map blocks and statics blocks under the rectangles are read, and
+mapdif/stadif patches are applied (map_patches.py).
+
+Run: python arena_export.py NAME X,Y,WIDTH,HEIGHT [X,Y,WIDTH,HEIGHT ...] [--map N] [--size WIDTHxHEIGHT]
+Output: assets/arenas/NAME.arena.bin
+
+Bundle format (little-endian, every section starts on an 8-byte boundary):
+    char[4]  magic 'UOAB'
+    uint16   version, uint16 map number, uint16 arena count, uint16 reserved
+    uint32   land ID count (L), static ID count (S), texmap count (T)
+    uint16   land_ids[L]          original land tile ID of each local land ID
+    uint16   land_textures[L]     local texmap of each local land ID (0xFFFF = none)
+    uint16   static_ids[S]        original graphic of each local static ID
+    uint16   texmap_ids[T]        original texture ID of each local texmap
+    uint32   land_flags[L], static_flags[S]   tiledata flags (low 32 bits)
+    uint8    static_heights[S]
+    arena    arenas[arena count]  16 bytes: u16 x, y, width, height (world tiles), u32 first static, u32 static count
+    per arena: uint16 land[height][width] (local land IDs), int8 z[height][width]
+    static   statics[]            10 bytes: u16 local graphic, u16 x, u16 y (world), i8 z, u8 reserved, u16 hue
+    uint32   blob_offsets[L + S + T + 1]   relative to the first blob
+    blobs:   art of each land ID, art of each static ID, texmaps.mul entry of each texmap (raw, as stored)
+"""
+
+from pathlib import Path
+import struct
+import sys
+import time
+
+import numpy as np
+
+from art_decoder import read_art
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+from mul_reader import MulArchive
+from statics_index import STATIC_QUERY_DTYPE, StaticsIndex
+from tiledata import TileData
+
+UO_PATH = Path('Ultima Online Classic')
+MUL_PATH = Path('assets/mul')
+ARENAS_PATH = Path('assets/arenas')
+
+ARENA_MAGIC = b'UOAB'
+ARENA_VERSION = 1
+ARENA_HEADER = struct.Struct('<4sHHHHIII')
+ARENA_ENTRY_DTYPE = np.dtype([
+    ('x', '<u2'),
+    ('y', '<u2'),
+    ('width', '<u2'),
+    ('height', '<u2'),
+    ('first_static', '<u4'),
+    ('static_count', '<u4'),
+])
+ARENA_STATIC_DTYPE = np.dtype([
+    ('graphic', '<u2'),
+    ('x', '<u2'),
+    ('y', '<u2'),
+    ('z', 'i1'),
+    ('reserved', 'u1'),
+    ('hue', '<u2'),
+])
+NO_TEXTURE = 0xFFFF
+STATIC_ART_OFFSET = 0x4000
+
+
+def read_texmaps(texture_ids):
+    """Raw texmaps.mul entries (b'' if absent), by texture ID"""
+    idx_file, mul_file = UO_PATH / 'texidx.mul', UO_PATH / 'texmaps.mul'
+    if not (idx_file.exists() and mul_file.exists()):
+        print(f"  ⚠️ No texmaps.mul/texidx.mul in {UO_PATH}, texmaps left out")
+        return [b''] * len(texture_ids)
+    with MulArchive(idx_file, mul_file) as archive:
+        return [bytes(archive.read_entry(i) or b'') for i in texture_ids]
+
+
+def covered_blocks(rects, width, height):
+    """Map-order indices of the blocks under a list of rectangles"""
+    blocks_y = height // 8
+    covered = []
+    for x, y, rect_width, rect_height in rects:
+        x0, y0 = max(0, x) // 8, max(0, y) // 8
+        x1, y1 = -(-min(width, x + rect_width) // 8), -(-min(height, y + rect_height) // 8)
+        bx, by = np.meshgrid(np.arange(x0, x1), np.arange(y0, y1), indexing='ij')
+        covered.append((bx * blocks_y + by).reshape(-1))
+    return np.unique(np.concatenate(covered))
+
+
+def crop_arenas(facet, statics, rects):
+    """(land ID rasters, Z rasters, statics) of each rectangle, clipped to the facet"""
+    land, z, items = [], [], []
+    for x, y, width, height in rects:
+        tile_ids, tile_z = facet.region(x, y, width, height)
+        if tile_ids.size == 0:
+            raise ValueError(f"Arena {x},{y},{width},{height} is outside the {facet.width}×{facet.height} facet")
+        land.append(tile_ids)
+        z.append(tile_z)
+        items.append(statics.query(x, y, width, height) if statics is not None else
+                     np.zeros(0, dtype=STATIC_QUERY_DTYPE))
+    return land, z, items
+
+
+def _write_section(f, array):
+    """Write an array and pad the file to the next 8-byte boundary"""
+    f.write(np.ascontiguousarray(array).tobytes())
+    f.write(b'\0' * (-f.tell() % 8))
+
+
+def export_arena(name, rects, map_num=0, map_size=None):
+    """Write assets/arenas/NAME.arena.bin for a list of (x, y, width, height) rectangles"""
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    if not map_file.exists():
+        raise FileNotFoundError(f"{map_file} not found (convert the UOP first)")
+
+    patches = MapPatches.load(MUL_PATH, map_num, width, height)
+    staidx_file, statics_file = MUL_PATH / f"staidx{map_num}.mul", MUL_PATH / f"statics{map_num}.mul"
+    statics = None
+    if staidx_file.exists() and statics_file.exists():
+        statics = StaticsIndex.from_mul(staidx_file, statics_file, width, height, patches,
+                                        blocks=covered_blocks(rects, width, height))
+    with MapArray(map_file, width, height, patches) as facet:
+        land, z, items = crop_arenas(facet, statics, rects)
+
+    # Local ID spaces: sorted unique original IDs, so local order follows the original
+    land_ids, land_local = np.unique(np.concatenate([ids.reshape(-1) for ids in land]), return_inverse=True)
+    all_items = np.concatenate(items)
+    static_ids, static_local = np.unique(all_items['graphic'], return_inverse=True)
+
+    tiledata_file = MUL_PATH / 'tiledata.mul'
+    land_flags = np.zeros(len(land_ids), dtype='<u4')
+    static_flags = np.zeros(len(static_ids), dtype='<u4')
+    static_heights = np.zeros(len(static_ids), dtype='u1')
+    textures = np.zeros(len(land_ids), dtype=np.int64)
+    if tiledata_file.exists():
+        tiledata = TileData(tiledata_file)
+        known_land = land_ids < len(tiledata.land)
+        land_flags[known_land] = tiledata.land_flags[land_ids[known_land]] & 0xFFFFFFFF
+        textures[known_land] = tiledata.land['texture'][land_ids[known_land]]
+        known_static = static_ids < len(tiledata.statics)
+        static_flags[known_static] = tiledata.static_flags[static_ids[known_static]] & 0xFFFFFFFF
+        static_heights[:] = tiledata.static_heights(static_ids)
+    else:
+        print(f"  ⚠️ {tiledata_file} not found, flags and texmaps left out")
+    # Texture 0 means the land tile has no texmap
+    texmap_ids, texmap_local = np.unique(textures[textures > 0], return_inverse=True)
+    land_textures = np.full(len(land_ids), NO_TEXTURE, dtype='<u2')
+    land_textures[textures > 0] = texmap_local
+
+    blobs = read_art([int(i) for i in land_ids] + [STATIC_ART_OFFSET + int(g) for g in static_ids])
+    blobs += read_texmaps([int(t) for t in texmap_ids])
+    blob_offsets = np.zeros(len(blobs) + 1, dtype='<u4')
+    np.cumsum([len(blob) for blob in blobs], out=blob_offsets[1:])
+
+    arenas = np.zeros(len(rects), dtype=ARENA_ENTRY_DTYPE)
+    records = np.zeros(len(all_items), dtype=ARENA_STATIC_DTYPE)
+    records['graphic'] = static_local
+    records['x'] = all_items['world_x']
+    records['y'] = all_items['world_y']
+    records['z'] = all_items['z']
+    records['hue'] = all_items['hue']
+
+    ARENAS_PATH.mkdir(parents=True, exist_ok=True)
+    output_file = ARENAS_PATH / f"{name}.arena.bin"
+    with open(output_file, 'wb') as f:
+        f.write(ARENA_HEADER.pack(ARENA_MAGIC, ARENA_VERSION, map_num, len(rects), 0,
+                                  len(land_ids), len(static_ids), len(texmap_ids)))
+        f.write(b'\0' * (-f.tell() % 8))
+        for section in (land_ids.astype('<u2'), land_textures, static_ids.astype('<u2'),
+                        texmap_ids.astype('<u2'), land_flags, static_flags, static_heights):
+            _write_section(f, section)
+
+        first_static = 0
+        for i, ((x, y, _, _), tile_ids, tile_items) in enumerate(zip(rects, land, items)):
+            arenas[i] = (max(0, x), max(0, y), tile_ids.shape[1], tile_ids.shape[0],
+                         first_static, len(tile_items))
+            first_static += len(tile_items)
+        _write_section(f, arenas)
+
+        start = 0
+        for tile_ids, tile_z in zip(land, z):
+            _write_section(f, land_local[start:start + tile_ids.size].astype('<u2'))
+            _write_section(f, tile_z)
+            start += tile_ids.size
+        _write_section(f, records)
+        _write_section(f, blob_offsets)
+        for blob in blobs:
+            f.write(blob)
+
+    print(f"✅ {len(rects)} arena(s): {sum(ids.size for ids in land)} tiles, {len(records)} statics, "
+          f"{len(land_ids)} land / {len(static_ids)} static / {len(texmap_ids)} texmap IDs, "
+          f"{output_file.stat().st_size / 1024:.1f} KB -> {output_file}")
+    return output_file
+
+
+def main():
+    args = sys.argv[1:]
+    map_num = 0
+    if '--map' in args:
+        i = args.index('--map')
+        map_num = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+
+    if len(args) < 2:
+        print("Usage: python arena_export.py NAME X,Y,WIDTH,HEIGHT [X,Y,WIDTH,HEIGHT ...] [--map N]")
+        sys.exit(1)
+    name = args[0]
+    rects = [tuple(int(v) for v in arg.split(',')) for arg in args[1:]]
+
+    print(f"Exporting arena '{name}' from map {map_num}: {' '.join(args[1:])}")
+    started = time.time()
+    export_arena(name, rects, map_num, map_size)
+    print(f"   {time.time() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,16 @@
+"""
+NumPy array helpers
+Small vectorized building blocks shared by the map, statics and art readers.
+"""
+
+import numpy as np
+
+
+def gather_ranges(starts, counts):
+    """Concatenated arange(start, start + count) for every pair, vectorized"""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.cumsum(counts)
+    # Per output position: its range's start minus how far that range begins in the output
+    return np.repeat(starts - (ends - counts), counts) + np.arange(total)
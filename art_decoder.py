@@ -0,0 +1,254 @@
+"""
+Art Decoder
+Decodes art.mul / artLegacyMUL.uop land tiles and static art into NumPy
+images.
+
+Land tiles are raw 44×44 diamonds, so a whole batch is decoded with one
+scatter through a precomputed diamond index map. For static art the entry is
+viewed as uint16 words and the run headers of all rows are walked together
+(one NumPy step per run index, not per run); the runs are then copied into a
+uint16 canvas with one gather, and the canvas becomes RGBA with one more
+through a 65536-entry lookup table.
+
+Usage:
+    from art_decoder import decode_land_tiles, decode_static_image, read_art
+    tiles = decode_land_tiles(read_art(land_ids))         # (count, 44, 44, 4) RGBA
+    image = decode_static_image(read_art([0x4000 + graphic])[0])
+
+Run: python art_decoder.py [--count N]   (decodes the static art and reports throughput)
+
+Land tile entry (art IDs 0x0000-0x3FFF): 1012 RGB555 pixels (2024 bytes), the
+rows of the diamond top to bottom; row y < 22 is 2 * (y + 1) pixels wide
+starting at x = 21 - y, row y >= 22 is 2 * (44 - y) wide starting at x = y - 22.
+Every pixel inside the diamond is opaque.
+
+Static art entry (art IDs 0x4000+, little-endian, as ClassicUO reads it):
+    uint32   flag
+    uint16   width, height
+    uint16   line_offsets[height]   in words, from the end of this table
+    rows     per row, runs of uint16 x_offset, uint16 x_run, then x_run RGB555
+             pixels; x_offset skips transparent pixels; (0, 0) ends the row
+Pixel value 0 is transparent.
+"""
+
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from array_utils import gather_ranges
+from mul_reader import MulArchive
+from uop_reader import UOPArchive, art_entry_name
+
+UO_PATH = Path('Ultima Online Classic')
+
+DECODER_VERSION = 1  # Bump when decoded output changes (asset_cache.py keys on it)
+ART_COUNT = 0x14000  # land 0x0000-0x3FFF + statics 0x4000-0x13FFF
+STATIC_ART_OFFSET = 0x4000
+LAND_TILE_SIZE = 44
+MAX_RUN_END = 2048  # ClassicUO stops decoding when x_offset + x_run reaches this
+
+
+def _build_rgba_lut():
+    """RGB555 -> RGBA for every uint16, low bits filled from the high ones; 0 is transparent.
+
+    Entries are packed into one uint32 each, so a lookup moves 4 bytes per pixel in one gather.
+    """
+    colors = np.arange(0x10000, dtype=np.uint32)
+    lut = np.empty((0x10000, 4), dtype=np.uint8)
+    for channel, shift in enumerate((10, 5, 0)):
+        value = (colors >> shift) & 0x1F
+        lut[:, channel] = (value << 3) | (value >> 2)
+    lut[:, 3] = 255
+    lut[0] = 0
+    return lut.view(np.uint32).reshape(-1)
+
+
+RGBA_LUT = _build_rgba_lut()
+
+
+def to_rgba(canvas):
+    """(height, width, 4) uint8 RGBA of a uint16 RGB555 canvas"""
+    return RGBA_LUT[canvas].view(np.uint8).reshape(canvas.shape + (4,))
+
+
+def _build_diamond_index():
+    """Flat 44×44 canvas position of every land tile pixel, in entry order"""
+    rows = []
+    for y in range(LAND_TILE_SIZE):
+        half = y + 1 if y < LAND_TILE_SIZE // 2 else LAND_TILE_SIZE - y
+        x0 = LAND_TILE_SIZE // 2 - half
+        rows.append(y * LAND_TILE_SIZE + np.arange(x0, x0 + 2 * half))
+    return np.concatenate(rows)
+
+
+DIAMOND_INDEX = _build_diamond_index()
+LAND_ENTRY_SIZE = len(DIAMOND_INDEX) * 2
+OPAQUE = np.uint32(0xFF000000)  # Alpha byte of a packed little-endian RGBA pixel
+
+
+def decode_land_tiles(entries):
+    """(count, 44, 44, 4) RGBA of a list of raw land entries; short or missing entries stay transparent"""
+    pixels = np.zeros((len(entries), len(DIAMOND_INDEX)), dtype=np.uint16)
+    valid = np.array([data is not None and len(data) >= LAND_ENTRY_SIZE for data in entries], dtype=bool)
+    if valid.any():
+        packed = b''.join(bytes(entries[i][:LAND_ENTRY_SIZE]) for i in np.flatnonzero(valid))
+        pixels[valid] = np.frombuffer(packed, dtype='<u2').reshape(-1, len(DIAMOND_INDEX))
+
+    canvas = np.zeros((len(entries), LAND_TILE_SIZE * LAND_TILE_SIZE), dtype=np.uint32)
+    canvas[:, DIAMOND_INDEX] = RGBA_LUT[pixels] | OPAQUE
+    canvas[~valid] = 0
+    return canvas.view(np.uint8).reshape(len(entries), LAND_TILE_SIZE, LAND_TILE_SIZE, 4)
+
+
+def decode_static_art(data):
+    """(height, width) uint16 RGB555 canvas of a static art entry, or None if it is malformed"""
+    if data is None or len(data) < 8:
+        return None
+    words = np.frombuffer(data, dtype='<u2', count=len(data) // 2)
+    width, height = int(words[2]), int(words[3])
+    if width == 0 or height == 0 or 4 + height > len(words):
+        return None
+
+    # Walk every row at once: step k reads the k-th run header of each row still open
+    rows = np.arange(height)
+    pos = 4 + height + words[4:4 + height].astype(np.int64)
+    x = np.zeros(height, dtype=np.int64)
+    src_starts, dst_starts, lengths = [], [], []
+    while len(rows):
+        if pos.max() + 1 >= len(words):
+            return None
+        x_offset, x_run = words[pos].astype(np.int64), words[pos + 1].astype(np.int64)
+        run_end = x_offset + x_run
+        if run_end.max() >= MAX_RUN_END:
+            return None
+        open_rows = run_end != 0
+        rows, pos, x = rows[open_rows], pos[open_rows] + 2, x[open_rows] + x_offset[open_rows]
+        x_run = x_run[open_rows]
+        src_starts.append(pos)
+        dst_starts.append(rows * width + x)
+        lengths.append(x_run)
+        pos = pos + x_run
+        x = x + x_run
+        if len(x) and x.max() > width:
+            return None
+
+    canvas = np.zeros(height * width, dtype=np.uint16)
+    lengths = np.concatenate(lengths)
+    src = gather_ranges(np.concatenate(src_starts), lengths)
+    if len(src):
+        if src.max() >= len(words):
+            return None
+        canvas[gather_ranges(np.concatenate(dst_starts), lengths)] = words[src]
+    return canvas.reshape(height, width)
+
+
+def decode_static_arts(entries):
+    """decode_static_art() of every entry in a list (a decode_batch for AssetCache.get_or_decode_many)"""
+    return [decode_static_art(data) for data in entries]
+
+
+def decode_static_rgba(data):
+    """(height, width, 4) RGBA array of a static art entry, or None"""
+    canvas = decode_static_art(data)
+    return None if canvas is None else to_rgba(canvas)
+
+
+def decode_static_image(data):
+    """PIL RGBA image of a static art entry, or None"""
+    rgba = decode_static_rgba(data)
+    return None if rgba is None else Image.fromarray(rgba, 'RGBA')
+
+
+def open_art_archive():
+    """artLegacyMUL.uop (UOPArchive) or art.mul (MulArchive) in UO_PATH, or None"""
+    uop_file = UO_PATH / 'artLegacyMUL.uop'
+    if uop_file.exists():
+        return UOPArchive(uop_file)
+    idx_file, mul_file = UO_PATH / 'artidx.mul', UO_PATH / 'art.mul'
+    if idx_file.exists() and mul_file.exists():
+        return MulArchive(idx_file, mul_file)
+    return None
+
+
+def art_entries(archive, art_ids, rows=None):
+    """Archive entry of each art ID: UOP table row or MUL ID, -1 where there is none.
+
+    `rows` may pass in an already resolved rows_for(ART_ENTRY, ART_COUNT).
+    """
+    art_ids = np.asarray(art_ids, dtype=np.int64)
+    if isinstance(archive, UOPArchive):
+        if rows is not None:
+            return rows[art_ids]
+        found = (archive.find(art_entry_name(art_id)) for art_id in art_ids.tolist())
+        return np.array([-1 if row is None else row for row in found], dtype=np.int64)
+    present = np.zeros(len(art_ids), dtype=bool)
+    inside = (art_ids >= 0) & (art_ids < len(archive))
+    present[inside] = archive.valid[art_ids[inside]]
+    return np.where(present, art_ids, -1)
+
+
+def entry_sizes(archive, entries):
+    """Decompressed size of each art_entries() entry, 0 where there is none"""
+    entries = np.asarray(entries, dtype=np.int64)
+    sizes = np.zeros(len(entries), dtype=np.int64)
+    present = entries >= 0
+    if isinstance(archive, UOPArchive):
+        sizes[present] = archive.entries['decompressed_size'][entries[present]]
+    else:
+        sizes[present] = archive.index['length'][entries[present]]
+    return sizes
+
+
+def read_art(art_ids):
+    """Raw art entries (bytes, b'' if absent) from artLegacyMUL.uop or art.mul, by art ID"""
+    archive = open_art_archive()
+    if archive is None:
+        print(f"  ⚠️ No artLegacyMUL.uop or art.mul in {UO_PATH}, art left out")
+        return [b''] * len(art_ids)
+    with archive:
+        if isinstance(archive, UOPArchive):
+            return [bytes(data) if data is not None else b''
+                    for _, data in archive.read_many(art_entry_name(i) for i in art_ids)]
+        return [bytes(archive.read_entry(i) or b'') for i in art_ids]
+
+
+def benchmark(count=None):
+    """Decode every static art entry to RGBA and report throughput"""
+    started = time.perf_counter()
+    graphics = range(count or ART_COUNT - STATIC_ART_OFFSET)
+    entries = [(g, data) for g, data in zip(graphics, read_art([STATIC_ART_OFFSET + g for g in graphics]))
+               if data]
+    read_time = time.perf_counter() - started
+    print(f"Read {len(entries)} static art entries in {read_time:.2f}s")
+
+    started = time.perf_counter()
+    pixels = 0
+    failed = 0
+    for i, (_, data) in enumerate(entries):
+        rgba = decode_static_rgba(data)
+        if rgba is None:
+            failed += 1
+        else:
+            pixels += rgba.shape[0] * rgba.shape[1]
+        if i % 1000 == 0:
+            print(f"  {i}/{len(entries)}", end='\r')
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(entries) - failed} decoded, {failed} malformed in {elapsed:.2f}s "
+          f"({pixels / elapsed / 1e6:.1f} Mpixel/s, {elapsed / max(1, len(entries)) * 1e6:.0f} µs/entry)")
+
+
+def main():
+    args = sys.argv[1:]
+    count = None
+    if '--count' in args:
+        i = args.index('--count')
+        count = int(args[i + 1])
+        del args[i:i + 2]
+    benchmark(count)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+Batch Art Exporter
+Exports ranges of land tiles and static art straight from art.mul /
+artLegacyMUL.uop to PNG or WebP, without Ultima.dll or UOFiddler.
+
+The IDs are split into contiguous chunks of roughly equal cost (stored entry
+size, which tracks pixel count) and handed to a process pool. Every worker
+maps the same archive read-only once, in the pool initializer, so the pages
+are shared through the OS page cache and only the ID lists cross process
+boundaries. There are several chunks per worker, so a few large statics do
+not leave the other cores idle at the end.
+
+Run: python art_export.py [RANGE ...] [--range-file PATH] [--all] [--statics]
+                          [--format png|webp] [--out DIR] [--workers N] [--changed] [--no-cache]
+Output: OUT/land/0xXXXX.png (land tiles, by art ID)
+        OUT/static/0xXXXX.png (static art, by graphic)
+
+A RANGE is 0x0003-0x0006 or a single 0x00B6; --range-file reads one per line
+in the same form (export_tiles_helper.py writes assets/tiles/tile_id_ranges.txt
+this way). Ranges are art IDs (land 0x0000-0x3FFF, statics 0x4000 + graphic)
+unless --statics is given, in which case they are static graphic IDs. --all
+exports every entry in the archive. IDs without art are skipped.
+
+--changed exports only the IDs whose artLegacyMUL.uop entries changed since
+the last export to the same folder and format (uop_manifest.py data hashes),
+e.g. after a client patch. art.mul has no data hashes, so it exports all.
+Decoded art goes through the shared asset_cache.py cache unless --no-cache
+is given.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from art_decoder import (ART_COUNT, DECODER_VERSION, LAND_ENTRY_SIZE, STATIC_ART_OFFSET, UO_PATH,
+                         art_entries, decode_land_tiles, decode_static_arts, entry_sizes,
+                         open_art_archive, to_rgba)
+from asset_cache import AssetCache, read_entries
+from uop_manifest import UOPManifest, changed_art_ids
+from uop_reader import ART_ENTRY, UOPArchive
+
+OUTPUT_PATH = Path('assets/export/art')
+RANGE_FILE = Path('assets/tiles/tile_id_ranges.txt')
+
+CHUNKS_PER_WORKER = 8
+PNG_COMPRESS_LEVEL = 3  # zlib level: 6+ is several times slower for ~5% smaller files
+RANGE_PATTERN = re.compile(r'^\s*(0x[0-9A-Fa-f]+|\d+)(?:\s*-\s*(0x[0-9A-Fa-f]+|\d+))?\s*$')
+
+# Per-worker state, set by _init_worker
+_archive = None
+_cache = None
+
+
+def parse_ranges(lines):
+    """Sorted unique IDs of range lines ('0x0003 - 0x0006' or '0x00B6'); other lines are ignored"""
+    ids = []
+    for line in lines:
+        match = RANGE_PATTERN.match(line)
+        if not match:
+            continue
+        start = int(match.group(1), 0)
+        end = int(match.group(2), 0) if match.group(2) else start
+        ids.append(np.arange(min(start, end), max(start, end) + 1))
+    return np.unique(np.concatenate(ids)) if ids else np.zeros(0, dtype=np.int64)
+
+
+def balanced_chunks(art_ids, costs, count):
+    """Split art_ids into at most `count` contiguous chunks of about equal total cost"""
+    cumulative = np.cumsum(costs)
+    targets = cumulative[-1] * np.arange(1, count) / count
+    bounds = np.unique(np.searchsorted(cumulative, targets, side='right'))
+    return [chunk for chunk in np.split(art_ids, bounds) if len(chunk)]
+
+
+def _init_worker(use_cache):
+    global _archive, _cache
+    _archive = open_art_archive()
+    _cache = AssetCache() if use_cache else None
+
+
+def save_image(image, path, image_format):
+    if image_format == 'webp':
+        image.save(path, 'WEBP', lossless=True)
+    else:
+        image.save(path, compress_level=PNG_COMPRESS_LEVEL)
+
+
+def _decode(entries, decoder, decode_batch):
+    """Decoded arrays of this worker's archive entries, through the cache if there is one"""
+    if _cache is not None:
+        return _cache.get_or_decode_many(_archive, entries, decoder, DECODER_VERSION, decode_batch)
+    return decode_batch(read_entries(_archive, entries))
+
+
+def export_chunk(task):
+    """Decode and write one chunk; returns (exported, skipped, pixels, bytes read, bytes written)"""
+    art_ids, entries, output_dir, image_format = task
+    exported = skipped = pixels = read_bytes = written = 0
+    extension = f".{image_format}"
+    sizes = entry_sizes(_archive, entries)
+
+    land = (art_ids < STATIC_ART_OFFSET) & (sizes >= LAND_ENTRY_SIZE)
+    skipped += int(((art_ids < STATIC_ART_OFFSET) & ~land).sum())
+    if land.any():
+        tiles = _decode(entries[land], 'land_tile', decode_land_tiles)
+        for tile, art_id, size in zip(tiles, art_ids[land].tolist(), sizes[land].tolist()):
+            path = output_dir / 'land' / f"0x{art_id:04X}{extension}"
+            save_image(Image.fromarray(tile, 'RGBA'), path, image_format)
+            exported += 1
+            pixels += tile.shape[0] * tile.shape[1]
+            read_bytes += size
+            written += path.stat().st_size
+
+    statics = art_ids >= STATIC_ART_OFFSET
+    canvases = _decode(entries[statics], 'static_art', decode_static_arts) if statics.any() else []
+    for canvas, art_id, size in zip(canvases, art_ids[statics].tolist(), sizes[statics].tolist()):
+        if canvas is None:
+            skipped += 1
+            continue
+        path = output_dir / 'static' / f"0x{art_id - STATIC_ART_OFFSET:04X}{extension}"
+        save_image(Image.fromarray(to_rgba(canvas), 'RGBA'), path, image_format)
+        exported += 1
+        pixels += canvas.shape[0] * canvas.shape[1]
+        read_bytes += size
+        written += path.stat().st_size
+    return exported, skipped, pixels, read_bytes, written
+
+
+def export_art(art_ids, output_dir=OUTPUT_PATH, image_format='png', workers=None, changed_only=False,
+               use_cache=True):
+    """Export art IDs with a process pool; returns (exported, skipped)"""
+    archive = open_art_archive()
+    if archive is None:
+        print(f"❌ No artLegacyMUL.uop or art.mul in {UO_PATH}")
+        return 0, len(art_ids)
+    with archive:
+        return _export_from(archive, art_ids, output_dir, image_format, workers, changed_only, use_cache)
+
+
+def _export_from(archive, art_ids, output_dir, image_format, workers, changed_only, use_cache):
+    art_ids = art_ids[(art_ids >= 0) & (art_ids < ART_COUNT)]
+    # Every art ID's table row, hashed once and reused for sizes and the manifest
+    rows = archive.rows_for(ART_ENTRY, ART_COUNT) if isinstance(archive, UOPArchive) else None
+    manifest = None
+    if changed_only and isinstance(archive, UOPArchive):
+        # One manifest per folder and format: a PNG export says nothing about the WebP files
+        manifest = UOPManifest(archive.filepath, output_dir / image_format)
+        requested = len(art_ids)
+        art_ids = art_ids[np.isin(art_ids, changed_art_ids(archive, manifest, rows=rows))]
+        print(f"  {len(art_ids)}/{requested} IDs changed since the last export to {output_dir}")
+    elif changed_only:
+        print("  ⚠️ --changed needs artLegacyMUL.uop (art.mul has no data hashes), exporting every ID")
+
+    entries = art_entries(archive, art_ids, rows)
+    sizes = entry_sizes(archive, entries)
+    missing = int((sizes == 0).sum())
+    art_ids, entries, sizes = art_ids[sizes > 0], entries[sizes > 0], sizes[sizes > 0]
+    if not len(art_ids):
+        print("  ⚠️ None of the requested IDs have art" if manifest is None else "✅ Nothing to export")
+        return 0, missing
+
+    workers = workers or os.cpu_count() or 1
+    chunks = balanced_chunks(np.arange(len(art_ids)), sizes, workers * CHUNKS_PER_WORKER)
+    (output_dir / 'land').mkdir(parents=True, exist_ok=True)
+    (output_dir / 'static').mkdir(parents=True, exist_ok=True)
+    print(f"Exporting {len(art_ids)} art entries ({sizes.sum() / 1024 / 1024:.1f} MB) in {len(chunks)} "
+          f"chunks on {workers} workers -> {output_dir}")
+
+    started = time.perf_counter()
+    exported = pixels = read_bytes = written = 0
+    skipped = missing
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(use_cache,)) as pool:
+        futures = [pool.submit(export_chunk, (art_ids[chunk], entries[chunk], output_dir, image_format))
+                   for chunk in chunks]
+        for i, future in enumerate(as_completed(futures), 1):
+            chunk_exported, chunk_skipped, chunk_pixels, chunk_read, chunk_written = future.result()
+            exported += chunk_exported
+            skipped += chunk_skipped
+            pixels += chunk_pixels
+            read_bytes += chunk_read
+            written += chunk_written
+            elapsed = time.perf_counter() - started
+            print(f"  Chunk {i}/{len(chunks)}: {exported} images, {exported / elapsed:.0f}/s", end='\r')
+    print()
+
+    if manifest is not None:
+        # Only remember content once every chunk is written
+        manifest.record(archive, entries)
+        manifest.save()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {exported} images ({skipped} IDs without art skipped) in {elapsed:.1f}s: "
+          f"{exported / elapsed:.0f} images/s, {pixels / elapsed / 1e6:.1f} Mpixel/s, "
+          f"{read_bytes / elapsed / 1024 / 1024:.1f} MB/s read, {written / 1024 / 1024:.1f} MB written")
+    return exported, skipped
+
+
+def main():
+    args = sys.argv[1:]
+    use_statics = '--statics' in args
+    if use_statics:
+        args.remove('--statics')
+    export_all = '--all' in args
+    if export_all:
+        args.remove('--all')
+    changed_only = '--changed' in args
+    if changed_only:
+        args.remove('--changed')
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
+    options = {}
+    for flag in ('--range-file', '--format', '--out', '--workers'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    image_format = options.get('--format', 'png').lower()
+    if image_format not in ('png', 'webp'):
+        print(f"❌ Unknown format {image_format}, use png or webp")
+        return
+
+    if export_all:
+        art_ids = np.arange(ART_COUNT)
+    else:
+        lines = list(args)
+        if '--range-file' in options or not args:
+            range_file = Path(options.get('--range-file', RANGE_FILE))
+            if not range_file.exists():
+                print(f"❌ {range_file} not found (give ranges, --range-file or --all)")
+                return
+            lines += range_file.read_text(encoding='utf-8').splitlines()
+        art_ids = parse_ranges(lines)
+        if use_statics:
+            art_ids = art_ids + STATIC_ART_OFFSET
+
+    workers = int(options['--workers']) if '--workers' in options else None
+    export_art(art_ids, Path(options.get('--out', OUTPUT_PATH)), image_format, workers, changed_only, use_cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Decoded Asset Cache
+On-disk cache of decoded buffers (RGBA images, indexed canvases, any NumPy
+array), shared by the extraction, export and atlas scripts so re-running
+them with a different layout does not decode the client files again.
+
+Entries are keyed by what the archive index already says about the source
+entry, so a hit never reads or decompresses it: for UOP the entry hash plus
+the table's data hash and sizes (uop_manifest.entry_signature, which falls
+back to a CRC of the stored bytes where the data hash is zero), for MUL the
+idx offset and length plus the data file's size and modification time (MUL
+has no content hash). The decoder name and version and the output
+parameters complete the key. A patched client file, a bumped decoder
+version or different options simply miss.
+
+Arrays are stored raw behind a 32-byte header (dtype and shape), which
+loads several times faster than .npy's parsed header. Writes go to a
+temporary file that is renamed into place, so parallel workers can share
+one cache directory and readers never see a partial entry. The total size
+is capped; the least recently used entries (by modification time, bumped
+on every hit) are evicted first. Each writer tracks the size from its own
+scan, so with several workers the cap is approximate until the next
+eviction rescans the directory.
+
+Usage:
+    cache = AssetCache()
+    canvas = cache.get_or_decode(archive, row, 'static_art', DECODER_VERSION, decode_static_art)
+    tiles = cache.get_or_decode_many(archive, rows, 'land_tile', DECODER_VERSION, decode_land_tiles)
+    print(cache.report())
+`archive` is a UOPArchive (entries are table rows) or a MulArchive
+(entries are IDs); -1 or None stands for a missing entry.
+
+Run: python asset_cache.py [--clear] [--trim MEGABYTES]   (prints the cache size)
+Cache: cache/decoded/<key[:2]>/<key>.bin
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from uop_manifest import entry_signature
+from uop_reader import UOPArchive
+
+CACHE_PATH = Path('cache/decoded')
+DEFAULT_MAX_BYTES = 2 << 30  # 2 GiB
+EVICT_TO = 0.9  # Evicting stops at this fraction of the cap, so it does not run on every write
+STALE_TEMP_SECONDS = 3600  # Temporary files this old belong to a crashed writer
+
+# Cached array file: magic, dtype string, ndim, up to 5 dimensions, then the raw data
+ENTRY_MAGIC = b'UODC'
+ENTRY_HEADER = struct.Struct('<4s4sB3x5I')
+
+
+def entry_sources(archive, entries):
+    """Identity of each archive entry from the index alone, None where it is absent"""
+    if isinstance(archive, UOPArchive):
+        hashes = archive.entries['hash']
+        return [None if entry is None or entry < 0 else
+                [f"{int(hashes[entry]):016x}", *entry_signature(archive, int(entry))]
+                for entry in entries]
+    stat = archive.filepath.stat()
+    data_file = [archive.filepath.name, stat.st_size, stat.st_mtime_ns]
+    return [None if entry is None or entry not in archive else
+            data_file + [int(archive.index['offset'][entry]), int(archive.index['length'][entry])]
+            for entry in entries]
+
+
+def read_entries(archive, entries):
+    """Bytes of each archive entry in order (UOP entries decompress on the archive's pool)"""
+    if isinstance(archive, UOPArchive):
+        rows = [None if entry is None or entry < 0 else int(entry) for entry in entries]
+        return [None if data is None else bytes(data) for _, data in archive.iter_rows(rows)]
+    return [None if data is None else bytes(data) for data in map(archive.read_entry, entries)]
+
+
+def cache_key(source, decoder, version, **params):
+    """Hex key of a decoded buffer: source entry identity + decoder name/version + output parameters"""
+    identity = json.dumps([source, decoder, version, params], sort_keys=True)
+    return hashlib.blake2b(identity.encode(), digest_size=20).hexdigest()
+
+
+class AssetCache:
+    """Size-capped LRU cache of NumPy arrays under one directory"""
+
+    def __init__(self, root=CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size = None  # Bytes on disk, scanned on first write
+
+    def path(self, key):
+        # A plain string: pathlib costs as much as the read on the hit path
+        return os.path.join(self.root, key[:2], f"{key}.bin")
+
+    def get(self, key):
+        """Cached array, or None (counted as a miss)"""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as f:
+                buffer = bytearray(os.fstat(f.fileno()).st_size)
+                f.readinto(buffer)
+            os.utime(path)  # Most recently used
+            magic, dtype, ndim, *shape = ENTRY_HEADER.unpack_from(buffer)
+            if magic != ENTRY_MAGIC or ndim > len(shape):
+                raise ValueError(f"Not a cache entry: {path}")
+            array = np.frombuffer(buffer, dtype=dtype.rstrip(b'\0').decode(), offset=ENTRY_HEADER.size)
+            array = array.reshape(shape[:ndim])
+        except FileNotFoundError:
+            # Absent, or evicted by another worker between open and utime
+            self.misses += 1
+            return None
+        except (ValueError, OSError, struct.error):
+            Path(path).unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array
+
+    def put(self, key, array):
+        """Store an array atomically, then evict if over the cap"""
+        array = np.ascontiguousarray(array)
+        if array.ndim > 5:
+            raise ValueError(f"Cannot cache a {array.ndim}-dimensional array")
+        shape = list(array.shape) + [0] * (5 - array.ndim)
+        header = ENTRY_HEADER.pack(ENTRY_MAGIC, array.dtype.str.encode(), array.ndim, *shape)
+        path = Path(self.path(key))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, suffix='.tmp', delete=False) as f:
+            f.write(header)
+            f.write(array.data)
+            temp_path = Path(f.name)
+        os.replace(temp_path, path)
+        self.writes += 1
+
+        if self._size is None:
+            self._size = sum(size for _, _, size in self._scan())
+        else:
+            self._size += path.stat().st_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def get_or_decode(self, archive, entry, decoder, version, decode, **params):
+        """decode(data, **params) of one archive entry through the cache; None results are not stored"""
+        return self.get_or_decode_many(archive, [entry], decoder, version,
+                                       lambda datas, **p: [decode(datas[0], **p)], **params)[0]
+
+    def get_or_decode_many(self, archive, entries, decoder, version, decode_batch, **params):
+        """Decoded array (or None) per archive entry.
+
+        Hits are answered from the index and the cache directory alone; the
+        misses are read together and decoded with one decode_batch(list of
+        bytes, **params) call, which returns one array or None per entry.
+        """
+        results = [None] * len(entries)
+        missing = []
+        for i, source in enumerate(entry_sources(archive, entries)):
+            if source is None:
+                continue
+            key = cache_key(source, decoder, version, **params)
+            results[i] = self.get(key)
+            if results[i] is None:
+                missing.append((i, key))
+        if not missing:
+            return results
+
+        datas = read_entries(archive, [entries[i] for i, _ in missing])
+        present = [(i, key, data) for (i, key), data in zip(missing, datas) if data]
+        if present:
+            decoded = decode_batch([data for _, _, data in present], **params)
+            for (i, key, _), array in zip(present, decoded):
+                if array is not None:
+                    self.put(key, array)
+                results[i] = array
+        return results
+
+    def _scan(self):
+        """(path, mtime, size) of every entry; stale temporary files are removed"""
+        entries = []
+        if not self.root.exists():
+            return entries
+        now = time.time()
+        for path in self.root.glob('*/*'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == '.bin':
+                entries.append((path, stat.st_mtime, stat.st_size))
+            elif path.suffix == '.tmp' and now - stat.st_mtime > STALE_TEMP_SECONDS:
+                path.unlink(missing_ok=True)
+            elif path.suffix == '.npy':
+                # Byte-keyed entries of the earlier .npy layout can never be hit again
+                path.unlink(missing_ok=True)
+        return entries
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until under EVICT_TO of the cap (or under max_bytes)"""
+        limit = self.max_bytes * EVICT_TO if max_bytes is None else max_bytes
+        entries = sorted(self._scan(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+        self._size = total
+
+    def clear(self):
+        for path, _, _ in self._scan():
+            path.unlink(missing_ok=True)
+        self._size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'evictions': self.evictions,
+        }
+
+    def report(self):
+        stats = self.stats()
+        return (f"cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+                f"{stats['writes']} written, {stats['evictions']} evicted")
+
+
+def main():
+    args = sys.argv[1:]
+    cache = AssetCache()
+    if '--clear' in args:
+        cache.clear()
+        print(f"✅ Cleared {cache.root}")
+        return
+    if '--trim' in args:
+        i = args.index('--trim')
+        cache.evict(int(args[i + 1]) << 20)
+        print(f"✅ Trimmed {cache.root}: {cache.evictions} entries evicted")
+
+    entries = cache._scan()
+    total = sum(size for _, _, size in entries)
+    print(f"{cache.root}: {len(entries)} entries, {total / 1024 / 1024:.1f} MB "
+          f"of {cache.max_bytes / 1024 / 1024:.0f} MB")
+    if entries:
+        oldest = min(mtime for _, mtime, _ in entries)
+        print(f"   least recently used entry: {time.strftime('%Y-%m-%d %H:%M', time.localtime(oldest))}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,8 @@ This is faster than converting all maps at once
 """
 
 from pathlib import Path
-import struct
-import zlib
+
+from uop_reader import UOPArchive
 
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
@@ -22,60 +22,18 @@ def convert_map(map_num=0):
     
     print(f"📖 Reading {uop_file.name}...")
     
-    entries = []
-    with open(uop_file, 'rb') as f:
-        magic = f.read(4)
-        if magic != b'MYP\x00':
-            raise ValueError(f"Not a valid UOP file: {uop_file}")
-        
-        version = struct.unpack('<I', f.read(4))[0]
-        signature = struct.unpack('<I', f.read(4))[0]
-        next_table = struct.unpack('<Q', f.read(8))[0]
-        block_size = struct.unpack('<I', f.read(4))[0]
-        file_count = struct.unpack('<I', f.read(4))[0]
+    mul_data = bytearray()
+    with UOPArchive(uop_file) as archive:
+        print(f"   Found {archive.file_count} file entries in UOP")
         
-        print(f"   Found {file_count} file entries in UOP")
+        rows = archive.map_rows(map_num)
+        print(f"📦 Extracting {len(rows)} entries...")
         
-        while next_table != 0:
-            f.seek(next_table)
-            files_in_block = struct.unpack('<I', f.read(4))[0]
-            next_table = struct.unpack('<Q', f.read(8))[0]
-            
-            for _ in range(files_in_block):
-                offset = struct.unpack('<Q', f.read(8))[0]
-                if offset == 0:
-                    f.seek(30, 1)
-                    continue
-                
-                header_size = struct.unpack('<I', f.read(4))[0]
-                comp_size = struct.unpack('<I', f.read(4))[0]
-                decomp_size = struct.unpack('<I', f.read(4))[0]
-                file_hash = struct.unpack('<Q', f.read(8))[0]
-                crc = struct.unpack('<I', f.read(4))[0]
-                compression = struct.unpack('<H', f.read(2))[0]
-                
-                entries.append({
-                    'offset': offset + header_size,
-                    'compressed_size': comp_size,
-                    'decompressed_size': decomp_size,
-                    'compression': compression
-                })
-    
-    print(f"📦 Extracting {len(entries)} entries...")
-    
-    mul_data = bytearray()
-    with open(uop_file, 'rb') as f:
-        for i, entry in enumerate(entries):
-            f.seek(entry['offset'])
-            data = f.read(entry['compressed_size'])
-            
-            if entry['compression'] == 1:
-                data = zlib.decompress(data)
-            
-            mul_data.extend(data)
+        for i, row in enumerate(rows):
+            mul_data.extend(archive.read_index(row))
             
             if (i + 1) % 50 == 0:
-                print(f"   Progress: {i + 1}/{len(entries)} entries ({len(mul_data) / 1024 / 1024:.1f} MB)")
+                print(f"   Progress: {i + 1}/{len(rows)} entries ({len(mul_data) / 1024 / 1024:.1f} MB)")
     
     print(f"💾 Writing {output_file.name} ({len(mul_data) / 1024 / 1024:.1f} MB)...")
     with open(output_file, 'wb') as f:
@@ -2,8 +2,8 @@
 Simple converter - just map0, extracts all data blocks sequentially
 """
 from pathlib import Path
-import struct
-import zlib
+
+from uop_reader import UOPArchive
 
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
@@ -22,76 +22,22 @@ if not uop_file.exists():
 print(f"✅ File exists ({uop_file.stat().st_size / 1024 / 1024:.1f} MB)")
 
 try:
-    entries = []
-    with open(uop_file, 'rb') as f:
-        # Read header
-        magic = f.read(4)
-        if magic != b'MYP\x00':
-            print(f"❌ Invalid magic: {magic}")
-            exit(1)
-        
-        version = struct.unpack('<I', f.read(4))[0]
-        format_timestamp = struct.unpack('<I', f.read(4))[0]
-        next_block = struct.unpack('<Q', f.read(8))[0]
-        block_size = struct.unpack('<I', f.read(4))[0]
-        count = struct.unpack('<i', f.read(4))[0]
+    with UOPArchive(uop_file) as archive:
+        print(f"Version: {archive.version}, Count: {archive.file_count}")
         
-        print(f"Version: {version}, Count: {count}, First block: {next_block}")
+        # Chunks are ordered by their hashed entry name
+        rows = archive.map_rows(0)
+        print(f"\n✅ Found {len(rows)} entries")
+        print(f"Extracting data...")
         
-        # Read all blocks
-        while next_block != 0:
-            f.seek(next_block)
-            files_count = struct.unpack('<i', f.read(4))[0]
-            next_block = struct.unpack('<q', f.read(8))[0]
-            
-            print(f"  Block at {f.tell()-8}: {files_count} files, next: {next_block}")
-            
-            for i in range(files_count):
-                offset = struct.unpack('<q', f.read(8))[0]
-                header_length = struct.unpack('<i', f.read(4))[0]
-                compressed_length = struct.unpack('<i', f.read(4))[0]
-                decompressed_length = struct.unpack('<i', f.read(4))[0]
-                file_hash = struct.unpack('<Q', f.read(8))[0]
-                data_hash = struct.unpack('<I', f.read(4))[0]
-                flag = struct.unpack('<h', f.read(2))[0]
-                
-                if offset == 0:
-                    continue
-                
-                entries.append({
-                    'offset': offset + header_length,
-                    'compressed': compressed_length,
-                    'decompressed': decompressed_length,
-                    'flag': flag
-                })
-    
-    print(f"\n✅ Found {len(entries)} entries")
-    print(f"Extracting data...")
-    
-    # Sort by offset to ensure sequential order
-    entries.sort(key=lambda x: x['offset'])
-    
-    mul_data = bytearray()
-    with open(uop_file, 'rb') as f:
-        for i, entry in enumerate(entries):
-            f.seek(entry['offset'])
-            data = f.read(entry['compressed'])
-            
-            # Decompress if needed (flag 1 = zlib)
-            if entry['flag'] == 1:
-                data = zlib.decompress(data)
-            elif entry['flag'] == 3:  # zlib+bwt (not handling BWT for now)
-                try:
-                    data = zlib.decompress(data)
-                except:
-                    print(f"  Warning: Entry {i} uses BWT compression, skipping")
-                    continue
-            
-            mul_data.extend(data)
+        mul_data = bytearray()
+        for i, row in enumerate(rows):
+            # Handles zlib (flag 1) and zlib+bwt (flag 3)
+            mul_data.extend(archive.read_index(row))
             
             if (i + 1) % 50 == 0:
                 mb = len(mul_data) / 1024 / 1024
-                print(f"  [{i+1}/{len(entries)}] {mb:.1f} MB", end='\r')
+                print(f"  [{i+1}/{len(rows)}] {mb:.1f} MB", end='\r')
     
     print(f"\n✅ Extracted {len(mul_data) / 1024 / 1024:.1f} MB")
     print(f"Writing {output_file.name}...")
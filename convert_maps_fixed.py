@@ -4,10 +4,10 @@ Run: python convert_maps_fixed.py
 """
 
 from pathlib import Path
-import struct
-import zlib
 import os
 
+from uop_reader import UOPArchive
+
 # Use absolute paths to avoid any path issues
 SCRIPT_DIR = Path(__file__).parent.absolute()
 UO_PATH = SCRIPT_DIR / 'Ultima Online Classic'
@@ -41,64 +41,22 @@ def convert_map(map_num):
     print(f"✅ File found ({file_size_mb:.1f} MB)")
     
     try:
-        entries = []
-        with open(uop_file, 'rb') as f:
-            magic = f.read(4)
-            if magic != b'MYP\x00':
-                print(f"❌ Invalid UOP magic: {magic}")
-                return False
-            
-            version = struct.unpack('<I', f.read(4))[0]
-            signature = struct.unpack('<I', f.read(4))[0]
-            next_table = struct.unpack('<Q', f.read(8))[0]
-            block_size = struct.unpack('<I', f.read(4))[0]
-            file_count = struct.unpack('<I', f.read(4))[0]
+        with UOPArchive(uop_file) as archive:
+            print(f"   UOP Version: {archive.version}, File count: {archive.file_count}")
             
-            print(f"   UOP Version: {version}, File count: {file_count}")
+            # Chunks are ordered by their hashed entry name
+            rows = archive.map_rows(map_num)
+            print(f"   Found {len(rows)} entries")
+            print(f"   Extracting and decompressing...")
             
-            while next_table != 0:
-                f.seek(next_table)
-                files_in_block = struct.unpack('<I', f.read(4))[0]
-                next_table = struct.unpack('<Q', f.read(8))[0]
-                
-                for _ in range(files_in_block):
-                    offset = struct.unpack('<Q', f.read(8))[0]
-                    if offset == 0:
-                        f.seek(30, 1)
-                        continue
-                    
-                    header_size = struct.unpack('<I', f.read(4))[0]
-                    comp_size = struct.unpack('<I', f.read(4))[0]
-                    decomp_size = struct.unpack('<I', f.read(4))[0]
-                    f.read(8)  # file_hash
-                    f.read(4)  # crc
-                    compression = struct.unpack('<H', f.read(2))[0]
-                    
-                    entries.append({
-                        'offset': offset + header_size,
-                        'compressed_size': comp_size,
-                        'decompressed_size': decomp_size,
-                        'compression': compression
-                    })
-        
-        print(f"   Found {len(entries)} entries")
-        print(f"   Extracting and decompressing...")
-        
-        mul_data = bytearray()
-        with open(uop_file, 'rb') as f:
-            for i, entry in enumerate(entries):
-                f.seek(entry['offset'])
-                data = f.read(entry['compressed_size'])
-                
-                if entry['compression'] == 1:
-                    data = zlib.decompress(data)
-                
-                mul_data.extend(data)
+            mul_data = bytearray()
+            for i, row in enumerate(rows):
+                mul_data.extend(archive.read_index(row))
                 
-                if (i + 1) % 100 == 0 or (i + 1) == len(entries):
+                if (i + 1) % 100 == 0 or (i + 1) == len(rows):
                     mb = len(mul_data) / 1024 / 1024
-                    pct = ((i + 1) / len(entries)) * 100
-                    print(f"   [{pct:5.1f}%] {i + 1}/{len(entries)} entries ({mb:.1f} MB)", end='\r')
+                    pct = ((i + 1) / len(rows)) * 100
+                    print(f"   [{pct:5.1f}%] {i + 1}/{len(rows)} entries ({mb:.1f} MB)", end='\r')
         
         print()  # New line
         
@@ -2,14 +2,19 @@
 Chunked UOP to MUL Converter - Processes in batches, saves progress, can resume
 Run: python convert_uop_chunked.py [map_number]
 Example: python convert_uop_chunked.py 0
+
+Each chunk is appended to map#.mul.tmp and fsynced before its checkpoint
+(entry count + byte offset) is recorded, so a resume just truncates the temp
+file to the checkpoint and carries on without reading it back.
 """
 
 from pathlib import Path
-import struct
-import zlib
 import json
+import os
 import sys
 
+from uop_reader import UOPArchive
+
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
 PROGRESS_FILE = Path('assets/mul/conversion_progress.json')
@@ -27,18 +32,39 @@ def load_progress():
             return {}
     return {}
 
-def save_progress(map_num, processed_count, total_size):
-    """Save current progress"""
+def write_progress(progress):
+    """Durably replace the progress file (write temp, fsync, rename)"""
+    temp_progress = PROGRESS_FILE.with_name(PROGRESS_FILE.name + '.tmp')
+    with open(temp_progress, 'w') as f:
+        json.dump(progress, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_progress, PROGRESS_FILE)
+
+def save_progress(map_num, processed_count, total_size, source_size):
+    """Save a checkpoint: entries done and bytes of the temp file they fill.
+    
+    Only call this after those bytes have been fsynced, so the checkpoint
+    never points past data that could be lost in a crash.
+    """
     progress = load_progress()
     progress[f'map{map_num}'] = {
         'processed': processed_count,
+        'bytes': total_size,
+        'source_size': source_size,
         'size_mb': total_size / 1024 / 1024
     }
-    with open(PROGRESS_FILE, 'w') as f:
-        json.dump(progress, f, indent=2)
+    write_progress(progress)
+
+def clear_progress(map_num):
+    """Drop the checkpoint for a finished map"""
+    progress = load_progress()
+    if f'map{map_num}' in progress:
+        del progress[f'map{map_num}']
+        write_progress(progress)
 
 def convert_map_chunked(map_num, resume=True):
-    """Convert one map file in chunks"""
+    """Convert one map file in chunks, appending each chunk to the temp file"""
     uop_file = UO_PATH / f"map{map_num}LegacyMUL.uop"
     output_file = OUTPUT_PATH / f"map{map_num}.mul"
     temp_file = OUTPUT_PATH / f"map{map_num}.mul.tmp"
@@ -51,129 +77,80 @@ def convert_map_chunked(map_num, resume=True):
         print(f"❌ File not found: {uop_file}")
         return False
     
-    file_size_mb = uop_file.stat().st_size / 1024 / 1024
-    print(f"✅ File found ({file_size_mb:.1f} MB)")
+    source_size = uop_file.stat().st_size
+    print(f"✅ File found ({source_size / 1024 / 1024:.1f} MB)")
     
     # Check for existing progress
-    progress = load_progress()
+    checkpoint = load_progress().get(f'map{map_num}', {})
     start_entry = 0
-    mul_data = bytearray()
+    written = 0
     
     if resume and temp_file.exists():
         print(f"📂 Found partial file: {temp_file.name}")
-        with open(temp_file, 'rb') as f:
-            mul_data = bytearray(f.read())
-        start_entry = progress.get(f'map{map_num}', {}).get('processed', 0)
-        print(f"   Resuming from entry {start_entry} ({len(mul_data) / 1024 / 1024:.1f} MB already processed)")
+        temp_size = temp_file.stat().st_size
+        if (checkpoint.get('source_size') == source_size and
+                'bytes' in checkpoint and checkpoint['bytes'] <= temp_size):
+            start_entry = checkpoint.get('processed', 0)
+            written = checkpoint['bytes']
+            print(f"   Resuming from entry {start_entry} ({written / 1024 / 1024:.1f} MB already processed)")
+        else:
+            print(f"   No usable checkpoint for this file, starting over")
     
     try:
-        # Read UOP structure
-        entries = []
-        with open(uop_file, 'rb') as f:
-            magic = f.read(4)
-            if magic != b'MYP\x00':
-                print(f"❌ Invalid UOP magic: {magic}")
-                return False
+        # Truncating to the checkpoint drops anything written after the last
+        # durable save; nothing before it is ever read back.
+        with UOPArchive(uop_file) as archive, open(temp_file, 'a+b') as tf:
+            tf.truncate(written)
+            tf.seek(written)
             
-            version = struct.unpack('<I', f.read(4))[0]
-            format_timestamp = struct.unpack('<I', f.read(4))[0]
-            next_block = struct.unpack('<Q', f.read(8))[0]
-            block_size = struct.unpack('<I', f.read(4))[0]
-            count = struct.unpack('<i', f.read(4))[0]
+            print(f"   UOP Version: {archive.version}, Total entries: {archive.file_count}")
             
-            print(f"   UOP Version: {version}, Total entries: {count}")
+            # Chunks are ordered by their hashed entry name
+            rows = archive.map_rows(map_num)
+            total_entries = len(rows)
             
-            while next_block != 0:
-                f.seek(next_block)
-                files_count = struct.unpack('<i', f.read(4))[0]
-                next_block = struct.unpack('<q', f.read(8))[0]
-                
-                for _ in range(files_count):
-                    offset = struct.unpack('<q', f.read(8))[0]
-                    header_length = struct.unpack('<i', f.read(4))[0]
-                    compressed_length = struct.unpack('<i', f.read(4))[0]
-                    decompressed_length = struct.unpack('<i', f.read(4))[0]
-                    file_hash = struct.unpack('<Q', f.read(8))[0]
-                    data_hash = struct.unpack('<I', f.read(4))[0]
-                    flag = struct.unpack('<h', f.read(2))[0]
-                    
-                    if offset == 0:
-                        continue
-                    
-                    entries.append({
-                        'offset': offset + header_length,
-                        'compressed': compressed_length,
-                        'decompressed': decompressed_length,
-                        'flag': flag
-                    })
-        
-        # Sort by offset for sequential processing
-        entries.sort(key=lambda x: x['offset'])
-        total_entries = len(entries)
-        
-        print(f"   Found {total_entries} entries")
-        print(f"   Processing in chunks of {CHUNK_SIZE} entries...")
-        print(f"   Starting from entry {start_entry}\n")
-        
-        # Process in chunks
-        with open(uop_file, 'rb') as f:
+            print(f"   Found {total_entries} entries")
+            print(f"   Processing in chunks of {CHUNK_SIZE} entries...")
+            print(f"   Starting from entry {start_entry}\n")
+            
+            # Process in chunks
             for chunk_start in range(start_entry, total_entries, CHUNK_SIZE):
                 chunk_end = min(chunk_start + CHUNK_SIZE, total_entries)
-                chunk = entries[chunk_start:chunk_end]
+                chunk = rows[chunk_start:chunk_end]
                 
                 print(f"   Processing entries {chunk_start}-{chunk_end-1}...", end=' ')
                 
-                chunk_data = bytearray()
-                for entry in chunk:
-                    try:
-                        f.seek(entry['offset'])
-                        data = f.read(entry['compressed'])
-                        
-                        if entry['flag'] == 1:  # zlib
-                            data = zlib.decompress(data)
-                        elif entry['flag'] == 3:  # zlib+bwt (try zlib first)
-                            try:
-                                data = zlib.decompress(data)
-                            except:
-                                print(f"\n      ⚠ Warning: Entry uses BWT, skipping")
-                                continue
-                        
-                        chunk_data.extend(data)
-                    except Exception as e:
-                        print(f"\n      ⚠ Warning: Error processing entry: {e}")
+                # Decompress the chunk's entries concurrently, write in order
+                for row, data in archive.iter_rows(chunk, return_errors=True):
+                    if isinstance(data, Exception):
+                        print(f"\n      ⚠ Warning: Error processing entry: {data}")
                         continue
+                    
+                    tf.write(data)
+                    written += len(data)
                 
-                mul_data.extend(chunk_data)
-                
-                # Save progress after each chunk
-                with open(temp_file, 'wb') as tf:
-                    tf.write(mul_data)
-                save_progress(map_num, chunk_end, len(mul_data))
+                # Data must be on disk before the checkpoint that covers it
+                tf.flush()
+                os.fsync(tf.fileno())
+                save_progress(map_num, chunk_end, written, source_size)
                 
-                mb = len(mul_data) / 1024 / 1024
+                mb = written / 1024 / 1024
                 pct = (chunk_end / total_entries) * 100
                 print(f"✓ ({pct:.1f}%, {mb:.1f} MB)")
         
         # Finalize - rename temp to final
         print(f"\n   Finalizing...")
-        with open(output_file, 'wb') as f:
-            f.write(mul_data)
+        os.replace(temp_file, output_file)
         
-        # Clean up temp file and progress
-        if temp_file.exists():
-            temp_file.unlink()
-        progress = load_progress()
-        if f'map{map_num}' in progress:
-            del progress[f'map{map_num}']
-            with open(PROGRESS_FILE, 'w') as f:
-                json.dump(progress, f, indent=2)
+        # Clean up progress
+        clear_progress(map_num)
         
-        print(f"✅ Successfully created {output_file.name} ({len(mul_data) / 1024 / 1024:.1f} MB)")
+        print(f"✅ Successfully created {output_file.name} ({written / 1024 / 1024:.1f} MB)")
         return True
         
     except KeyboardInterrupt:
         print(f"\n\n⚠ Interrupted! Progress saved.")
-        print(f"   Run again to resume from entry {len(entries)}")
+        print(f"   Run again to resume from entry {load_progress().get(f'map{map_num}', {}).get('processed', 0)}")
         return False
     except Exception as e:
         print(f"❌ Error: {e}")
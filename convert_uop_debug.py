@@ -6,6 +6,8 @@ from pathlib import Path
 import struct
 import zlib
 
+from uop_bwt import decompress_flag3
+
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
 OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
@@ -113,6 +115,8 @@ try:
                 
                 if entry['compression'] == 1:
                     data = zlib.decompress(data)
+                elif entry['compression'] == 3:  # zlib+bwt
+                    data = decompress_flag3(data)
                 
                 mul_data.extend(data)
                 print(f"  Entry {i+1}: {len(data)} bytes")
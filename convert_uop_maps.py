@@ -5,10 +5,10 @@ Run this manually: python convert_uop_maps.py
 """
 
 from pathlib import Path
-import struct
-import zlib
 import sys
 
+from uop_reader import UOPArchive
+
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
 OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
@@ -29,62 +29,20 @@ def convert_single_map(map_num):
     print(f"{'='*60}")
     
     try:
-        # Read UOP structure
-        with open(uop_file, 'rb') as f:
-            magic = f.read(4)
-            if magic != b'MYP\x00':
-                raise ValueError("Not a valid UOP file")
-            
-            f.read(4)  # version
-            f.read(4)  # signature
-            next_table = struct.unpack('<Q', f.read(8))[0]
-            f.read(4)  # block_size
-            file_count = struct.unpack('<I', f.read(4))[0]
+        with UOPArchive(uop_file) as archive:
+            # Chunks are ordered by their hashed entry name
+            rows = archive.map_rows(map_num)
+            print(f"Found {len(rows)} entries in UOP file")
             
-            entries = []
-            while next_table != 0:
-                f.seek(next_table)
-                files_in_block = struct.unpack('<I', f.read(4))[0]
-                next_table = struct.unpack('<Q', f.read(8))[0]
-                
-                for _ in range(files_in_block):
-                    offset = struct.unpack('<Q', f.read(8))[0]
-                    if offset == 0:
-                        f.seek(30, 1)
-                        continue
-                    
-                    header_size = struct.unpack('<I', f.read(4))[0]
-                    comp_size = struct.unpack('<I', f.read(4))[0]
-                    decomp_size = struct.unpack('<I', f.read(4))[0]
-                    f.read(8)  # file_hash
-                    f.read(4)  # crc
-                    compression = struct.unpack('<H', f.read(2))[0]
-                    
-                    entries.append({
-                        'offset': offset + header_size,
-                        'compressed_size': comp_size,
-                        'decompressed_size': decomp_size,
-                        'compression': compression
-                    })
-        
-        print(f"Found {len(entries)} entries in UOP file")
-        
-        # Extract and combine all entries
-        mul_data = bytearray()
-        with open(uop_file, 'rb') as f:
-            for i, entry in enumerate(entries):
-                f.seek(entry['offset'])
-                data = f.read(entry['compressed_size'])
-                
-                if entry['compression'] == 1:
-                    data = zlib.decompress(data)
-                
-                mul_data.extend(data)
+            # Extract and combine all entries
+            mul_data = bytearray()
+            for i, row in enumerate(rows):
+                mul_data.extend(archive.read_index(row))
                 
                 # Progress update every 100 entries
-                if (i + 1) % 100 == 0 or (i + 1) == len(entries):
+                if (i + 1) % 100 == 0 or (i + 1) == len(rows):
                     mb = len(mul_data) / 1024 / 1024
-                    print(f"  Progress: {i + 1}/{len(entries)} entries ({mb:.1f} MB)", end='\r')
+                    print(f"  Progress: {i + 1}/{len(rows)} entries ({mb:.1f} MB)", end='\r')
         
         print()  # New line after progress
         
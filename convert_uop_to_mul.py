@@ -1,93 +1,60 @@
 """
 Convert UO LegacyMUL UOP files to classic MUL format
 Extracts map data from map#LegacyMUL.uop files and writes map#.mul files
+
+Run: python convert_uop_to_mul.py [--sequential] [--workers N] [--full]
+By default every map converts concurrently: each output is preallocated and
+chunks are decompressed on a thread pool and written straight to their
+final offset, so memory stays flat regardless of map size.
+
+Re-runs are incremental: a manifest of UOP data hashes (see uop_manifest.py)
+limits the work to chunks that changed, and the touched blocks are reported.
+Pass --full to rebuild everything.
 """
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
-import struct
-import zlib
+import os
+import sys
+
+import numpy as np
+
+from uop_manifest import UOPManifest, format_ranges
+from uop_reader import MAP_CHUNK_SIZE, MAP_ENTRY, UOPArchive, pread, pwrite
 
 UO_PATH = Path('Ultima Online Classic')
 OUTPUT_PATH = Path('assets/mul')
 OUTPUT_PATH.mkdir(parents=True, exist_ok=True)
 
-def read_uop_file(uop_path):
-    """Read UOP file and extract all entries"""
-    entries = []
-    
-    with open(uop_path, 'rb') as f:
-        # Read header
-        magic = f.read(4)
-        if magic != b'MYP\x00':
-            raise ValueError(f"Not a valid UOP file: {uop_path}")
-        
-        version = struct.unpack('<I', f.read(4))[0]
-        signature = struct.unpack('<I', f.read(4))[0]
-        next_table = struct.unpack('<Q', f.read(8))[0]
-        block_size = struct.unpack('<I', f.read(4))[0]
-        file_count = struct.unpack('<I', f.read(4))[0]
-        
-        # Read all file entries
-        while next_table != 0:
-            f.seek(next_table)
-            files_in_block = struct.unpack('<I', f.read(4))[0]
-            next_table = struct.unpack('<Q', f.read(8))[0]
-            
-            for _ in range(files_in_block):
-                offset = struct.unpack('<Q', f.read(8))[0]
-                
-                if offset == 0:
-                    # Skip empty entry
-                    f.seek(30, 1)
-                    continue
-                
-                header_size = struct.unpack('<I', f.read(4))[0]
-                compressed_size = struct.unpack('<I', f.read(4))[0]
-                decompressed_size = struct.unpack('<I', f.read(4))[0]
-                file_hash = struct.unpack('<Q', f.read(8))[0]
-                crc = struct.unpack('<I', f.read(4))[0]
-                compression = struct.unpack('<H', f.read(2))[0]
-                
-                entries.append({
-                    'offset': offset + header_size,
-                    'compressed_size': compressed_size,
-                    'decompressed_size': decompressed_size,
-                    'compression': compression
-                })
-    
-    return entries
-
-def extract_uop_to_mul(uop_path, output_mul_path):
+def extract_uop_to_mul(uop_path, output_mul_path, map_num):
     """Extract UOP file and write as MUL file"""
     print(f"Converting {uop_path.name} -> {output_mul_path.name}...")
     
-    entries = read_uop_file(uop_path)
-    print(f"  Found {len(entries)} entries")
-    
-    # Extract and concatenate all entries
-    mul_data = bytearray()
-    
-    with open(uop_path, 'rb') as f:
-        for i, entry in enumerate(entries):
-            f.seek(entry['offset'])
-            data = f.read(entry['compressed_size'])
-            
-            # Decompress if needed
-            if entry['compression'] == 1:  # zlib
-                try:
-                    data = zlib.decompress(data)
-                except Exception as e:
-                    print(f"  Warning: Failed to decompress entry {i}: {e}")
-                    continue
+    with UOPArchive(uop_path) as archive:
+        # Chunks are ordered by their hashed entry name, not by table position
+        rows = archive.map_rows(map_num)
+        print(f"  Found {len(archive)} entries ({len(rows)} map chunks)")
+        
+        # Extract and concatenate all entries
+        mul_data = bytearray()
+        
+        for i, row in enumerate(rows):
+            try:
+                data = archive.read_index(row)
+            except Exception as e:
+                print(f"  Warning: Failed to decompress entry {i}: {e}")
+                continue
             
             # Ensure we have the expected size
-            if len(data) != entry['decompressed_size']:
-                print(f"  Warning: Entry {i} size mismatch: expected {entry['decompressed_size']}, got {len(data)}")
+            expected = int(archive.entries['decompressed_size'][row])
+            if len(data) != expected:
+                print(f"  Warning: Entry {i} size mismatch: expected {expected}, got {len(data)}")
             
             mul_data.extend(data)
             
             if (i + 1) % 100 == 0:
-                print(f"  Processed {i + 1}/{len(entries)} entries...")
+                print(f"  Processed {i + 1}/{len(rows)} entries...")
     
     # Write MUL file
     with open(output_mul_path, 'wb') as f:
@@ -96,6 +63,156 @@ def extract_uop_to_mul(uop_path, output_mul_path):
     print(f"  ✓ Wrote {len(mul_data)} bytes to {output_mul_path.name}")
     return len(mul_data)
 
+MAP_BLOCK_SIZE = 196  # 4-byte header + 64 tiles x 3 bytes
+
+def _write_chunk(archive, row, fd, offset, compare=False):
+    """Decompress one map chunk and write it at its final offset.
+    
+    With `compare`, the chunk's previous contents are diffed first and the
+    global indices of the 196-byte blocks that actually changed are returned.
+    """
+    data = archive.read_index(row)
+    expected = int(archive.entries['decompressed_size'][row])
+    if len(data) != expected:
+        print(f"  Warning: Chunk at {offset} size mismatch: expected {expected}, got {len(data)}")
+    
+    changed_blocks = None
+    if compare:
+        usable = len(data) - len(data) % MAP_BLOCK_SIZE
+        new_blocks = np.frombuffer(data, dtype=np.uint8, count=usable).reshape(-1, MAP_BLOCK_SIZE)
+        old = pread(fd, usable, offset)
+        old_blocks = np.zeros_like(new_blocks)
+        old_blocks.reshape(-1)[:len(old)] = np.frombuffer(old, dtype=np.uint8)
+        differs = np.flatnonzero((new_blocks != old_blocks).any(axis=1))
+        changed_blocks = (differs + offset // MAP_BLOCK_SIZE).tolist()
+    
+    pwrite(fd, data, offset)
+    return len(data), changed_blocks
+
+def convert_map_parallel(uop_path, output_mul_path, map_num, pool, window=16, incremental=True):
+    """Convert one map with positioned writes into a preallocated MUL file.
+    
+    Chunk i of the map is named build/map#legacymul/<i>.dat and lands at
+    i * MAP_CHUNK_SIZE, so chunks can be decompressed and written in any
+    order. At most `window` decompressed chunks are in flight at once.
+    
+    With `incremental`, an existing output plus its manifest means only the
+    chunks whose UOP data hash changed are rewritten in place; the block
+    indices that differ are reported and returned.
+    """
+    print(f"Converting {uop_path.name} -> {output_mul_path.name}...")
+    
+    manifest = UOPManifest(uop_path, output_mul_path)
+    
+    with UOPArchive(uop_path) as archive:
+        rows = archive.rows_for(MAP_ENTRY, None, map_num)
+        indices = np.flatnonzero(rows >= 0)
+        if len(indices) == 0:
+            raise ValueError(f"No map{map_num} chunks found in {uop_path.name}")
+        
+        rows = rows[indices]
+        offsets = indices.astype(np.int64) * MAP_CHUNK_SIZE
+        sizes = archive.entries['decompressed_size'][rows].astype(np.int64)
+        total_size = int((offsets + sizes).max())
+        print(f"  Found {len(archive)} entries ({len(rows)} map chunks, {total_size / 1024 / 1024:.1f} MB)")
+        
+        incremental = (incremental and len(manifest) > 0 and output_mul_path.exists()
+                       and output_mul_path.stat().st_size == total_size)
+        if incremental:
+            todo = np.isin(rows, manifest.changed_rows(archive, rows))
+            print(f"  Incremental: {int(todo.sum())}/{len(rows)} chunks changed since last build")
+        else:
+            todo = np.ones(len(rows), dtype=bool)
+        
+        flags = os.O_RDWR | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+        if not incremental:
+            flags |= os.O_TRUNC
+        fd = os.open(output_mul_path, flags, 0o644)
+        pending = deque()
+        written = 0
+        changed_blocks = []
+        
+        def collect(future):
+            nonlocal written
+            size, blocks = future.result()
+            written += size
+            if blocks:
+                changed_blocks.extend(blocks)
+        
+        try:
+            os.ftruncate(fd, total_size)
+            
+            for row, offset in zip(rows[todo].tolist(), offsets[todo].tolist()):
+                pending.append(pool.submit(_write_chunk, archive, row, fd, offset, incremental))
+                if len(pending) >= window:
+                    collect(pending.popleft())
+            
+            while pending:
+                collect(pending.popleft())
+        finally:
+            # Never close the descriptor under a worker that is still writing
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            os.close(fd)
+        
+        # Only remember content once it is safely in the output
+        manifest.forget(manifest.removed_hashes(archive))
+        manifest.record(archive)
+        manifest.save()
+    
+    print(f"  ✓ Wrote {written} bytes to {output_mul_path.name}")
+    if incremental:
+        changed_blocks.sort()
+        print(f"  Changed blocks ({len(changed_blocks)}): {format_ranges(changed_blocks) or 'none'}")
+    return changed_blocks if incremental else None
+
+def find_map_jobs():
+    """List (uop_file, output_file, map_num, label) for every map present"""
+    jobs = []
+    
+    # Map files (map0LegacyMUL.uop -> map0.mul, etc.) and the "x" versions
+    for suffix in ('', 'x'):
+        for map_num in range(6):  # Maps 0-5
+            uop_file = UO_PATH / f"map{map_num}{suffix}LegacyMUL.uop"
+            
+            if not uop_file.exists():
+                if not suffix:
+                    print(f"⚠ {uop_file.name} not found, skipping...")
+                continue
+            
+            output_file = OUTPUT_PATH / f"map{map_num}{suffix}.mul"
+            jobs.append((uop_file, output_file, map_num, f"map{map_num}{suffix}"))
+    
+    return jobs
+
+def main_parallel(workers, incremental=True):
+    """Convert all maps concurrently on a shared chunk worker pool"""
+    print(f"Converting UO LegacyMUL UOP files to classic MUL format ({workers} workers)...\n")
+    
+    jobs = find_map_jobs()
+    if not jobs:
+        print("\n⚠ No map files found")
+        return
+    
+    with ThreadPoolExecutor(max_workers=workers) as chunk_pool, \
+         ThreadPoolExecutor(max_workers=len(jobs)) as map_pool:
+        futures = [
+            (label, map_pool.submit(convert_map_parallel, uop_file, output_file, map_num, chunk_pool,
+                                   workers * 2, incremental))
+            for uop_file, output_file, map_num, label in jobs
+        ]
+        
+        for label, future in futures:
+            try:
+                future.result()
+                print(f"  ✓ Successfully converted {label}")
+            except Exception as e:
+                print(f"  ✗ Error converting {label}: {e}")
+    
+    print("\n✓ Conversion complete!")
+    print(f"  Output directory: {OUTPUT_PATH.absolute()}")
+
 def main():
     """Convert all map LegacyMUL UOP files to MUL format"""
     print("Converting UO LegacyMUL UOP files to classic MUL format...\n")
@@ -111,7 +228,7 @@ def main():
         output_file = OUTPUT_PATH / f"map{map_num}.mul"
         
         try:
-            size = extract_uop_to_mul(uop_file, output_file)
+            size = extract_uop_to_mul(uop_file, output_file, map_num)
             print(f"  ✓ Successfully converted map{map_num}\n")
         except Exception as e:
             print(f"  ✗ Error converting map{map_num}: {e}\n")
@@ -126,7 +243,7 @@ def main():
         output_file = OUTPUT_PATH / f"map{map_num}x.mul"
         
         try:
-            extract_uop_to_mul(uop_file, output_file)
+            extract_uop_to_mul(uop_file, output_file, map_num)
             print(f"  ✓ Successfully converted map{map_num}x\n")
         except Exception as e:
             print(f"  ✗ Error converting map{map_num}x: {e}\n")
@@ -135,7 +252,13 @@ def main():
     print(f"  Output directory: {OUTPUT_PATH.absolute()}")
 
 if __name__ == '__main__':
-    main()
+    if '--sequential' in sys.argv:
+        main()
+    else:
+        workers = os.cpu_count() or 4
+        if '--workers' in sys.argv:
+            workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        main_parallel(workers, incremental='--full' not in sys.argv)
 
 
 
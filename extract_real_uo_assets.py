@@ -4,167 +4,44 @@ Extracts actual sprites from Ultima Online .uop files
 """
 
 import struct
-import zlib
 from pathlib import Path
 from PIL import Image
 import io
 
-UO_PATH = Path(r"C:\Program Files (x86)\Electronic Arts\Ultima Online Classic")
-OUTPUT_PATH = Path(r"C:\Users\micha\Projects\utlima-onmind\assets")
-
-# Color palette for 16-bit colors
-def unpack_rgb555(color):
-    """Convert 555 RGB to RGB888"""
-    r = ((color >> 10) & 0x1F) << 3
-    g = ((color >> 5) & 0x1F) << 3
-    b = (color & 0x1F) << 3
-    return (r, g, b)
+import numpy as np
 
-def unpack_rgb565(color):
-    """Convert 565 RGB to RGB888"""
-    r = ((color >> 11) & 0x1F) << 3
-    g = ((color >> 5) & 0x3F) << 2
-    b = (color & 0x1F) << 3
-    return (r, g, b)
+from art_decoder import (DECODER_VERSION, LAND_ENTRY_SIZE, art_entries, decode_land_tiles,
+                         decode_static_arts, entry_sizes, to_rgba)
+from asset_cache import AssetCache
+from uop_reader import UOPArchive
 
+UO_PATH = Path(r"C:\Program Files (x86)\Electronic Arts\Ultima Online Classic")
+OUTPUT_PATH = Path(r"C:\Users\micha\Projects\utlima-onmind\assets")
 
-class UOPFile:
-    """Parse UOP file format"""
-    
-    def __init__(self, filepath):
-        self.filepath = filepath
-        self.entries = []
-        self.parse()
-    
-    def parse(self):
-        """Parse UOP file structure"""
-        with open(self.filepath, 'rb') as f:
-            # Read header
-            magic = f.read(4)
-            if magic != b'MYP\x00':
-                raise ValueError(f"Not a valid UOP file: {self.filepath}")
-            
-            version = struct.unpack('<I', f.read(4))[0]
-            signature = struct.unpack('<I', f.read(4))[0]
-            next_table = struct.unpack('<Q', f.read(8))[0]
-            block_size = struct.unpack('<I', f.read(4))[0]
-            file_count = struct.unpack('<I', f.read(4))[0]
-            
-            # Read file entries
-            while next_table != 0:
-                f.seek(next_table)
-                files_in_block = struct.unpack('<I', f.read(4))[0]
-                next_table = struct.unpack('<Q', f.read(8))[0]
-                
-                for i in range(files_in_block):
-                    offset = struct.unpack('<Q', f.read(8))[0]
-                    
-                    if offset == 0:
-                        f.seek(30, 1)  # Skip empty entry
-                        continue
-                    
-                    header_size = struct.unpack('<I', f.read(4))[0]
-                    compressed_size = struct.unpack('<I', f.read(4))[0]
-                    decompressed_size = struct.unpack('<I', f.read(4))[0]
-                    file_hash = struct.unpack('<Q', f.read(8))[0]
-                    crc = struct.unpack('<I', f.read(4))[0]
-                    compression = struct.unpack('<H', f.read(2))[0]
-                    
-                    self.entries.append({
-                        'offset': offset + header_size,
-                        'compressed_size': compressed_size,
-                        'decompressed_size': decompressed_size,
-                        'compression': compression
-                    })
-    
-    def read_entry(self, index):
-        """Read entry data"""
-        if index >= len(self.entries):
-            return None
-        
-        entry = self.entries[index]
-        
-        with open(self.filepath, 'rb') as f:
-            f.seek(entry['offset'])
-            data = f.read(entry['compressed_size'])
-            
-            if entry['compression'] == 1:  # zlib
-                try:
-                    data = zlib.decompress(data)
-                except:
-                    return None
-        
-        return data
+def extract_art_items(art_uop, item_ids, cache):
+    """Extract items from artLegacyMUL.uop, yielding (item_id, image or None) in order"""
+    # Static items live after the 0x4000 land tiles, keyed by entry name
+    entries = art_entries(art_uop, [0x4000 + item_id for item_id in item_ids])
+    try:
+        canvases = cache.get_or_decode_many(art_uop, entries, 'static_art', DECODER_VERSION, decode_static_arts)
+    except Exception as e:
+        print(f"Error extracting art items {item_ids}: {e}")
+        canvases = [None] * len(entries)
+    for item_id, canvas in zip(item_ids, canvases):
+        yield item_id, None if canvas is None else Image.fromarray(to_rgba(canvas), 'RGBA')
 
 
-def extract_art_item(art_uop, item_id):
-    """Extract item from artLegacyMUL.uop"""
+def extract_land_tiles(art_uop, tile_ids, cache):
+    """Extract 44x44 land tiles (art IDs 0x0000-0x3FFF), yielding (tile_id, image or None) in order"""
+    entries = art_entries(art_uop, tile_ids)
+    entries[entry_sizes(art_uop, entries) < LAND_ENTRY_SIZE] = -1
     try:
-        data = art_uop.read_entry(item_id)
-        if not data or len(data) < 8:
-            return None
-        
-        # Parse art data
-        offset = 0
-        flag = struct.unpack('<I', data[offset:offset+4])[0]
-        offset += 4
-        
-        width = struct.unpack('<H', data[offset:offset+2])[0]
-        offset += 2
-        height = struct.unpack('<H', data[offset:offset+2])[0]
-        offset += 2
-        
-        if width == 0 or height == 0 or width > 1024 or height > 1024:
-            return None
-        
-        # Create image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        pixels = img.load()
-        
-        # Read lookup table
-        lookup = []
-        for y in range(height):
-            if offset + 4 > len(data):
-                return None
-            lookup_offset = struct.unpack('<I', data[offset:offset+4])[0]
-            offset += 4
-            lookup.append(lookup_offset)
-        
-        # Read pixel data
-        for y in range(height):
-            if lookup[y] >= len(data):
-                continue
-            
-            data_offset = lookup[y]
-            x = 0
-            
-            while x < width and data_offset + 2 <= len(data):
-                run = struct.unpack('<H', data[data_offset:data_offset+2])[0]
-                data_offset += 2
-                
-                xoff = (run >> 12) & 0xF
-                xrun = run & 0xFFF
-                
-                x += xoff
-                
-                for i in range(xrun):
-                    if x >= width or data_offset + 2 > len(data):
-                        break
-                    
-                    color = struct.unpack('<H', data[data_offset:data_offset+2])[0]
-                    data_offset += 2
-                    
-                    if color != 0:  # 0 is transparent
-                        r, g, b = unpack_rgb555(color)
-                        pixels[x, y] = (r, g, b, 255)
-                    
-                    x += 1
-        
-        return img
-        
+        tiles = cache.get_or_decode_many(art_uop, entries, 'land_tile', DECODER_VERSION, decode_land_tiles)
     except Exception as e:
-        print(f"Error extracting art item {item_id}: {e}")
-        return None
+        print(f"Error extracting land tiles {tile_ids}: {e}")
+        tiles = [None] * len(entries)
+    for tile_id, tile in zip(tile_ids, tiles):
+        yield tile_id, None if tile is None else Image.fromarray(tile, 'RGBA')
 
 
 def extract_animation_frame(anim_uop, body_id, action, direction, frame):
@@ -174,7 +51,7 @@ def extract_animation_frame(anim_uop, body_id, action, direction, frame):
         index = (body_id * 1000) + (action * 100) + (direction * 10) + frame
         index = min(index, len(anim_uop.entries) - 1)
         
-        data = anim_uop.read_entry(index % len(anim_uop.entries))
+        data = anim_uop.read_index(index % len(anim_uop.entries))
         if not data or len(data) < 16:
             return None
         
@@ -192,9 +69,8 @@ def extract_animation_frame(anim_uop, body_id, action, direction, frame):
         if width == 0 or height == 0 or width > 512 or height > 512:
             return None
         
-        # Create image
-        img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-        pixels = img.load()
+        # RGB555 canvas, converted to RGBA at the end (0 stays transparent)
+        canvas = np.zeros((height, width), dtype=np.uint16)
         
         # Skip header table
         header_size = height * 4
@@ -214,14 +90,13 @@ def extract_animation_frame(anim_uop, body_id, action, direction, frame):
                 if color == 0:  # End of line marker
                     break
                 
-                r, g, b = unpack_rgb555(color)
                 if x < width and y < height:
-                    pixels[x, y] = (r, g, b, 255)
+                    canvas[y, x] = color
                 
                 x += 1
             y += 1
         
-        return img
+        return Image.fromarray(to_rgba(canvas), 'RGBA')
         
     except Exception as e:
         print(f"Error extracting animation: {e}")
@@ -243,11 +118,12 @@ def main():
         print(f"ERROR: Art file not found: {art_file}")
         return
     
-    art_uop = UOPFile(art_file)
+    art_uop = UOPArchive(art_file)
     print(f"[OK] Loaded artLegacyMUL.uop ({len(art_uop.entries)} entries)")
+    cache = AssetCache()
     
     if anim_file1.exists():
-        anim_uop = UOPFile(anim_file1)
+        anim_uop = UOPArchive(anim_file1)
         print(f"[OK] Loaded AnimationFrame1.uop ({len(anim_uop.entries)} entries)")
     else:
         anim_uop = None
@@ -278,8 +154,7 @@ def main():
     print("Extracting halberd...")
     halberd_ids_to_try = [5182, 5183, 5184, 5185, 100, 200, 300, 500, 1000]
     
-    for item_id in halberd_ids_to_try:
-        halberd_img = extract_art_item(art_uop, item_id)
+    for item_id, halberd_img in extract_art_items(art_uop, halberd_ids_to_try, cache):
         if halberd_img and halberd_img.width > 10 and halberd_img.height > 10:
             output_file = OUTPUT_PATH / 'sprites' / 'weapons' / 'halberd.png'
             halberd_img.save(output_file)
@@ -292,16 +167,16 @@ def main():
     print("Extracting grass tile...")
     grass_ids_to_try = [0, 1, 2, 3, 4, 5, 10, 20, 50, 100, 200]
     
-    for item_id in grass_ids_to_try:
-        grass_img = extract_art_item(art_uop, item_id)
-        if grass_img and 40 <= grass_img.width <= 48 and 40 <= grass_img.height <= 48:
+    for tile_id, grass_img in extract_land_tiles(art_uop, grass_ids_to_try, cache):
+        if grass_img:
             output_file = OUTPUT_PATH / 'tiles' / 'grass.png'
             grass_img.save(output_file)
-            print(f"[OK] Grass tile saved from ID {item_id} ({grass_img.width}x{grass_img.height})")
+            print(f"[OK] Grass tile saved from ID {tile_id} ({grass_img.width}x{grass_img.height})")
             break
     else:
         print("[SKIP] Could not extract grass tile, keeping placeholder")
     
+    print(f"[OK] Decoded art {cache.report()}")
     print()
     print("=" * 60)
     print("[DONE] Real UO asset extraction complete!")
@@ -0,0 +1,265 @@
+"""
+Tree Prefab Extractor (whole facet)
+Python counterpart of scripts/extract_tree_prefabs.js that scans every tree
+static on the facet instead of one 256×256 region. Contiguous tree statics
+(8-connected tiles) are labelled with a vectorized union-find, strips of the
+facet are labelled in parallel processes, and identical prefabs are merged by
+the hash of their normalized shape.
+
+Run: python extract_tree_prefabs.py [map_number] [--workers N] [--strip-width TILES] [--size WIDTHxHEIGHT]
+Output: assets/prefabs/trees/tree_prefab_###.json + tree_prefabs_manifest.json
+        (same format prefabLoader.js consumes; most common shapes first)
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from map_array import MAP_SIZES
+from statics_index import StaticsIndex
+
+MUL_PATH = Path('assets/mul')
+OUTPUT_PATH = Path('assets/prefabs/trees')
+
+MIN_CLUSTER_SIZE = 2  # Ignore single-tile statics
+MAX_CLUSTER_AREA = 16  # Skip clusters that sprawl too far (likely multiple trees)
+STACK_Z_INCREMENT = 4  # Extra Z per stacked sprite on same tile
+DEFAULT_STRIP_WIDTH = 512
+
+# Tree graphic IDs derived from biomeStaticPlacer definitions (as in the JS extractor)
+TREE_GRAPHICS = np.array([
+    0x0CCA, 0x0CCB, 0x0CCC, 0x0CCD, 0x0CCE,
+    0x0CD0, 0x0CD3, 0x0CD6, 0x0CD8, 0x0CDA,
+    0x0CE0, 0x0CE3, 0x0CE6, 0x0D41, 0x0D45,
+    0x0D46, 0x0D48, 0x0D49, 0x0D4A, 0x0D4B,
+    0x0D4C,
+], dtype=np.uint16)
+
+# Half of the 8-neighbourhood; the other half is covered by symmetry
+NEIGHBOUR_OFFSETS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def label_components(x, y):
+    """Connected-component label per static, grouping 8-connected tiles.
+
+    Statics on the same tile share a node. Edges between occupied tiles are
+    found with one sorted search per direction, then merged by vectorized
+    union-find (hook larger root onto smaller, then full path compression)
+    until no edge spans two components.
+    """
+    if len(x) == 0:
+        return np.zeros(0, dtype=np.int64)
+    x = x.astype(np.int64)
+    y = y.astype(np.int64)
+    span = int(y.max()) + 2  # key stride leaves room for y + 1
+    tiles, node_of_static = np.unique(x * span + (y + 1), return_inverse=True)
+    tile_x, tile_y = tiles // span, tiles % span - 1
+
+    sources, targets = [], []
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        ny = tile_y + dy
+        keys = (tile_x + dx) * span + (ny + 1)
+        found = np.searchsorted(tiles, keys)
+        found = np.minimum(found, len(tiles) - 1)
+        hit = (tiles[found] == keys) & (ny >= 0)
+        sources.append(np.flatnonzero(hit))
+        targets.append(found[hit])
+    u = np.concatenate(sources)
+    v = np.concatenate(targets)
+
+    parent = np.arange(len(tiles))
+    while True:
+        pu, pv = parent[u], parent[v]
+        split = pu != pv
+        if not split.any():
+            break
+        np.minimum.at(parent, np.maximum(pu, pv)[split], np.minimum(pu, pv)[split])
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent[node_of_static.reshape(-1)]
+
+
+def canonical_prefabs(labels, x, y, z, graphic):
+    """Normalized prefabs of every cluster passing the size/area filters.
+
+    Returns {shape hash: [prefab, Counter of base Z]}. Parts are relative to
+    the cluster's min x/y/z, sorted by (dx, dy, dz, graphic), and sprites
+    stacked on one tile are lifted STACK_Z_INCREMENT apart, exactly as the JS
+    extractor does, so the same shape always produces the same parts.
+    """
+    prefabs = {}
+    if len(labels) == 0:
+        return prefabs
+
+    order = np.argsort(labels, kind='stable')
+    labels, x, y, z, graphic = labels[order], x[order], y[order], z[order], graphic[order]
+    starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+    sizes = np.diff(np.r_[starts, len(labels)])
+
+    min_x = np.minimum.reduceat(x, starts)
+    min_y = np.minimum.reduceat(y, starts)
+    min_z = np.minimum.reduceat(z.astype(np.int64), starts)
+    width = np.maximum.reduceat(x, starts) - min_x + 1
+    height = np.maximum.reduceat(y, starts) - min_y + 1
+    keep = (sizes >= MIN_CLUSTER_SIZE) & (width * height <= MAX_CLUSTER_AREA)
+
+    cluster = np.repeat(np.arange(len(starts)), sizes)
+    dx = (x - min_x[cluster]).astype(np.int64)
+    dy = (y - min_y[cluster]).astype(np.int64)
+    dz = z.astype(np.int64) - min_z[cluster]
+    graphic = graphic.astype(np.int64)
+
+    # Sort parts within each cluster, then rank sprites stacked on one tile
+    order = np.lexsort((graphic, dz, dy, dx, cluster))
+    cluster, dx, dy, dz, graphic = cluster[order], dx[order], dy[order], dz[order], graphic[order]
+    new_tile = np.r_[True, (cluster[1:] != cluster[:-1]) | (dx[1:] != dx[:-1]) | (dy[1:] != dy[:-1])]
+    tile_start = np.maximum.accumulate(np.where(new_tile, np.arange(len(dx)), 0))
+    dz = dz + (np.arange(len(dx)) - tile_start) * STACK_Z_INCREMENT
+
+    parts = np.stack([graphic, dx, dy, dz], axis=1).astype('<i4')
+    for c in np.flatnonzero(keep).tolist():
+        rows = parts[starts[c]:starts[c] + sizes[c]]
+        shape_hash = hashlib.sha1(rows.tobytes()).hexdigest()
+        if shape_hash not in prefabs:
+            prefab = {
+                'width': int(width[c]),
+                'height': int(height[c]),
+                'parts': [{'graphic': g, 'dx': a, 'dy': b, 'dz': d} for g, a, b, d in rows.tolist()],
+            }
+            prefabs[shape_hash] = [prefab, Counter()]
+        prefabs[shape_hash][1][int(min_z[c])] += 1
+    return prefabs
+
+
+def merge_prefabs(into, prefabs):
+    """Add the occurrences of `prefabs` into `into`"""
+    for shape_hash, (prefab, base_z) in prefabs.items():
+        if shape_hash in into:
+            into[shape_hash][1].update(base_z)
+        else:
+            into[shape_hash] = [prefab, base_z]
+
+
+def process_strip(strip):
+    """Label one strip; clusters touching an inner strip edge are handed back unlabelled"""
+    x0, x1, map_width, x, y, z, graphic = strip
+    labels = label_components(x, y)
+
+    # Components on the seam columns may continue in the neighbouring strip
+    on_seam = ((x == x0) & (x0 > 0)) | ((x == x1 - 1) & (x1 < map_width))
+    deferred = np.isin(labels, labels[on_seam])
+    done = ~deferred
+    prefabs = canonical_prefabs(labels[done], x[done], y[done], z[done], graphic[done])
+    return prefabs, (x[deferred], y[deferred], z[deferred], graphic[deferred])
+
+
+def extract_prefabs(statics, workers=None, strip_width=DEFAULT_STRIP_WIDTH):
+    """{shape hash: [prefab, Counter of base Z]} for all tree clusters of a facet"""
+    items = statics.query(0, 0, statics.width, statics.height)
+    items = items[np.isin(items['graphic'], TREE_GRAPHICS)]
+    print(f"Found {len(items)} tree statics")
+
+    x = items['world_x'].astype(np.int64)
+    order = np.argsort(x, kind='stable')
+    items, x = items[order], x[order]
+
+    strips = []
+    for x0 in range(0, statics.width, strip_width):
+        x1 = min(statics.width, x0 + strip_width)
+        lo, hi = np.searchsorted(x, [x0, x1])
+        part = items[lo:hi]
+        strips.append((x0, x1, statics.width, x[lo:hi], part['world_y'].astype(np.int64),
+                       part['z'], part['graphic']))
+
+    prefabs = {}
+    seams = []
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (strip_prefabs, deferred) in enumerate(pool.map(process_strip, strips), 1):
+            merge_prefabs(prefabs, strip_prefabs)
+            seams.append(deferred)
+            print(f"  Strip {i}/{len(strips)}", end='\r')
+    print()
+
+    # Stitch clusters cut by strip edges in one pass over just those statics
+    x, y, z, graphic = (np.concatenate(column) for column in zip(*seams))
+    merge_prefabs(prefabs, canonical_prefabs(label_components(x, y), x, y, z, graphic))
+    return prefabs
+
+
+def write_prefabs(prefabs, output_dir=OUTPUT_PATH):
+    """Write prefab JSON files and the manifest, most common shapes first.
+
+    A shape's baseZ is the altitude it occurs at most often (lowest on ties),
+    so the output does not depend on scan order or strip width.
+    Returns [(prefab, occurrences)] in manifest order.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in output_dir.glob('*.json'):
+        old.unlink()
+
+    ranked = sorted(prefabs.items(), key=lambda item: (-sum(item[1][1].values()), item[0]))
+    names = []
+    written = []
+    for index, (_, (prefab, base_z)) in enumerate(ranked, 1):
+        name = f"tree_prefab_{index:03d}"
+        payload = {
+            'name': name,
+            'width': prefab['width'],
+            'height': prefab['height'],
+            'baseZ': min(base_z, key=lambda z: (-base_z[z], z)),
+            'parts': prefab['parts'],
+        }
+        with open(output_dir / f"{name}.json", 'w') as f:
+            json.dump(payload, f, indent=2)
+        names.append(name)
+        written.append((payload, sum(base_z.values())))
+
+    with open(output_dir / 'tree_prefabs_manifest.json', 'w') as f:
+        json.dump({'prefabs': names}, f, indent=2)
+    return written
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    strip_width = DEFAULT_STRIP_WIDTH
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    if '--strip-width' in args:
+        i = args.index('--strip-width')
+        strip_width = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    map_num = int(args[0]) if args else 0
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    statics = StaticsIndex.from_mul(MUL_PATH / f"staidx{map_num}.mul",
+                                    MUL_PATH / f"statics{map_num}.mul", width, height)
+    prefabs = extract_prefabs(statics, workers, strip_width)
+    ranked = write_prefabs(prefabs)
+
+    total = sum(count for _, count in ranked)
+    print(f"✅ {len(ranked)} unique prefabs from {total} clusters -> {OUTPUT_PATH}")
+    for prefab, count in ranked[:10]:
+        print(f"  {prefab['name']}: {count}× ({prefab['width']}×{prefab['height']}, "
+              f"{len(prefab['parts'])} parts)")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,98 +3,23 @@ UO Asset Extractor
 Extracts sprites, animations, and tiles from Ultima Online .uop files
 """
 
-import struct
-import zlib
 from pathlib import Path
 from PIL import Image
 import io
 
+from uop_reader import UOPArchive, art_entry_name
+
 UO_PATH = r"C:\Program Files (x86)\Electronic Arts\Ultima Online Classic"
 OUTPUT_PATH = r"C:\Users\micha\Projects\utlima-onmind\assets"
 
-class UOPReader:
-    """Read UOP file format"""
-    
-    def __init__(self, filepath):
-        self.filepath = filepath
-        self.file = open(filepath, 'rb')
-        self.read_header()
-    
-    def read_header(self):
-        """Read UOP header"""
-        self.file.seek(0)
-        magic = self.file.read(4)
-        if magic != b'MYP\x00':
-            raise ValueError("Not a valid UOP file")
-        
-        self.version = struct.unpack('<I', self.file.read(4))[0]
-        self.signature = struct.unpack('<I', self.file.read(4))[0]
-        self.next_table = struct.unpack('<Q', self.file.read(8))[0]
-        self.block_size = struct.unpack('<I', self.file.read(4))[0]
-        self.file_count = struct.unpack('<I', self.file.read(4))[0]
-    
-    def read_entries(self):
-        """Read all entries from UOP file"""
-        entries = []
-        next_table = self.next_table
-        
-        while next_table != 0:
-            self.file.seek(next_table)
-            file_count = struct.unpack('<I', self.file.read(4))[0]
-            next_table = struct.unpack('<Q', self.file.read(8))[0]
-            
-            for _ in range(file_count):
-                offset = struct.unpack('<Q', self.file.read(8))[0]
-                if offset == 0:
-                    self.file.seek(30, 1)  # Skip empty entry
-                    continue
-                
-                header_size = struct.unpack('<I', self.file.read(4))[0]
-                compressed_size = struct.unpack('<I', self.file.read(4))[0]
-                decompressed_size = struct.unpack('<I', self.file.read(4))[0]
-                file_hash = struct.unpack('<Q', self.file.read(8))[0]
-                crc = struct.unpack('<I', self.file.read(4))[0]
-                compression = struct.unpack('<H', self.file.read(2))[0]
-                
-                entries.append({
-                    'offset': offset,
-                    'compressed_size': compressed_size,
-                    'decompressed_size': decompressed_size,
-                    'compression': compression,
-                    'hash': file_hash
-                })
-        
-        return entries
-    
-    def read_entry_data(self, entry):
-        """Read and decompress entry data"""
-        self.file.seek(entry['offset'])
-        data = self.file.read(entry['compressed_size'])
-        
-        if entry['compression'] == 1:  # zlib compression
-            try:
-                data = zlib.decompress(data)
-            except:
-                pass
-        
-        return data
-    
-    def close(self):
-        self.file.close()
-
-
 def extract_animation_frame(uop_file, entry_index):
     """Extract an animation frame from AnimationFrame UOP"""
     try:
-        reader = UOPReader(uop_file)
-        entries = reader.read_entries()
-        
-        if entry_index >= len(entries):
-            reader.close()
-            return None
-        
-        data = reader.read_entry_data(entries[entry_index])
-        reader.close()
+        with UOPArchive(uop_file) as reader:
+            if entry_index >= len(reader):
+                return None
+            
+            data = bytes(reader.read_index(entry_index))
         
         # Parse animation data
         if len(data) < 8:
@@ -109,25 +34,18 @@ def extract_animation_frame(uop_file, entry_index):
         return None
 
 
-def extract_art_item(art_file, item_id):
-    """Extract item art from artLegacyMUL.uop"""
+def extract_art_items(art_file, item_ids):
+    """Extract item art from artLegacyMUL.uop as {item_id: bytes or None}"""
     try:
-        reader = UOPReader(art_file)
-        entries = reader.read_entries()
-        
-        # Art entries are indexed
-        if item_id >= len(entries):
-            reader.close()
-            return None
-        
-        data = reader.read_entry_data(entries[item_id])
-        reader.close()
-        
-        return data
+        # Art entries are keyed by name; statics follow the 0x4000 land tiles
+        names = {art_entry_name(0x4000 + item_id): item_id for item_id in item_ids}
+        with UOPArchive(art_file) as reader:
+            return {names[name]: None if data is None else bytes(data)
+                    for name, data in reader.read_many(names)}
         
     except Exception as e:
         print(f"Error extracting art: {e}")
-        return None
+        return {}
 
 
 def create_better_placeholders():
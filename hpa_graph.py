@@ -0,0 +1,613 @@
+"""
+Hierarchical Pathfinding Graph (HPA*)
+Precomputes an abstract graph over the walk grid baked by walk_grid.py so a
+long path is an A* over a few hundred cluster entrances plus short in-cluster
+searches, instead of a flat A* over 29M tiles.
+
+The grid is split into square clusters. Entrances are the passable runs along
+each cluster border (one transition in the middle of a short run, one at each
+end of a run of MIN_WIDE_ENTRANCE tiles or more), plus the diagonal steps
+across a border (or a corner) that no straight detour can replace, e.g. where
+the straight step climbs more than MAX_STEP. Every transition tile becomes an
+abstract node. In-cluster costs between the nodes of a cluster are
+computed by relaxing all clusters of a column at once as NumPy arrays, one
+column per worker process.
+
+Run: python hpa_graph.py [map_number] [--cluster-size N] [--workers N] [--benchmark QUERIES]
+     python hpa_graph.py --self-check   (HPA* vs flat A* reachability on a random grid)
+Output: assets/hpa/map#.hpa.bin (see below)
+
+Movement model: 8 directions, cost 10 straight / 14 diagonal, a step may
+climb or drop at most MAX_STEP Z units, and diagonals may not cut past an
+impassable tile. Multi-level tiles use their lowest level (read_surface_grid).
+
+Graph file (little-endian):
+    char[4]  magic 'UOHP'
+    uint16   version, uint16 cluster size
+    uint32   width, height (tiles)
+    uint16   clusters x, clusters y
+    uint32   node count, edge count
+    uint32   cluster_nodes[clusters + 1]   region index: nodes of cluster c (c = cy * clusters_x + cx)
+    uint16   node_x[node count], node_y[node count]
+    uint32   edge_offsets[node count + 1]  edges of each node (CSR)
+    uint32   edge_target[edge count]
+    uint16   edge_cost[edge count]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import heapq
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+from array_utils import gather_ranges
+from walk_grid import NO_LEVEL, WALKGRID_PATH, read_surface_grid
+
+HPA_PATH = Path('assets/hpa')
+
+HPA_MAGIC = b'UOHP'
+HPA_VERSION = 1
+HPA_HEADER = struct.Struct('<4sHHIIHHII')
+
+DEFAULT_CLUSTER_SIZE = 32
+MIN_WIDE_ENTRANCE = 6
+MAX_STEP = 8  # As WalkGridStreamer's default stepHeight
+STRAIGHT_COST = 10
+DIAGONAL_COST = 14
+UNREACHABLE = 1 << 28
+
+# (bit, dx, dy, cost) per direction, same bits as mine_transitions.NEIGHBOURS
+DIRECTIONS = (
+    (0x01, 0, -1, STRAIGHT_COST), (0x02, 1, 0, STRAIGHT_COST),
+    (0x04, 0, 1, STRAIGHT_COST), (0x08, -1, 0, STRAIGHT_COST),
+    (0x10, 1, -1, DIAGONAL_COST), (0x20, 1, 1, DIAGONAL_COST),
+    (0x40, -1, 1, DIAGONAL_COST), (0x80, -1, -1, DIAGONAL_COST),
+)
+
+
+def _shifted(array, dx, dy, fill):
+    """array[y + dy, x + dx] over the last two axes, `fill` outside"""
+    result = np.full_like(array, fill)
+    height, width = array.shape[-2:]
+    result[..., max(0, -dy):height - max(0, dy), max(0, -dx):width - max(0, dx)] = \
+        array[..., max(0, dy):height - max(0, -dy), max(0, dx):width - max(0, -dx)]
+    return result
+
+
+def move_masks(surface):
+    """Per tile, a bit per direction that can be walked from it (DIRECTIONS bits).
+
+    Moves are symmetric: if a -> b is allowed, so is b -> a.
+    """
+    passable = surface != NO_LEVEL
+    z = surface.astype(np.int32)
+    moves = np.zeros(surface.shape, dtype=np.uint8)
+    for bit, dx, dy, _ in DIRECTIONS:
+        target_ok = _shifted(passable, dx, dy, False)
+        climb = np.abs(_shifted(z, dx, dy, 0) - z) <= MAX_STEP
+        allowed = passable & target_ok & climb
+        if dx and dy:
+            # No cutting corners: both tiles beside the diagonal must be passable
+            allowed &= _shifted(passable, dx, 0, False) & _shifted(passable, 0, dy, False)
+        moves |= np.where(allowed, bit, 0).astype(np.uint8)
+    return moves
+
+
+def clip_moves(moves):
+    """Copy of a window of move_masks() without the moves that leave the window"""
+    inside = np.ones(moves.shape, dtype=bool)
+    clipped = moves.copy()
+    for bit, dx, dy, _ in DIRECTIONS:
+        clipped[~_shifted(inside, dx, dy, False)] &= ~np.uint8(bit)
+    return clipped
+
+
+def step_costs(moves):
+    """(8, ..., h, w) int32 cost of leaving each tile in each direction (UNREACHABLE if blocked)"""
+    return np.stack([np.where(moves & bit, cost, UNREACHABLE).astype(np.int32)
+                     for bit, _, _, cost in DIRECTIONS])
+
+
+def relax(costs, dist):
+    """Shortest-path costs, in place, over the last two axes of `dist`.
+
+    Sweeps every direction until nothing improves; `costs` comes from
+    step_costs() and broadcasts against `dist`. Moves never leave the window.
+    """
+    height, width = dist.shape[-2:]
+    while True:
+        changed = False
+        for d, (_, dx, dy, _) in enumerate(DIRECTIONS):
+            # Tiles at t receive from t - (dx, dy)
+            target = (..., slice(max(0, dy), height + min(0, dy)), slice(max(0, dx), width + min(0, dx)))
+            source = (..., slice(max(0, -dy), height - max(0, dy)), slice(max(0, -dx), width - max(0, dx)))
+            candidate = dist[source] + costs[d][source]
+            better = candidate < dist[target]
+            if better.any():
+                np.minimum(dist[target], candidate, out=dist[target])
+                changed = True
+        if not changed:
+            return dist
+
+
+def trace_back(moves, dist, goal):
+    """Tiles from the relaxation origin to `goal` (local coords), following decreasing cost"""
+    x, y = goal
+    if dist[y, x] >= UNREACHABLE:
+        return None
+    path = [(x, y)]
+    height, width = dist.shape
+    while dist[y, x] > 0:
+        for bit, dx, dy, cost in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if (moves[y, x] & bit and 0 <= nx < width and 0 <= ny < height
+                    and dist[ny, nx] + cost == dist[y, x]):
+                x, y = nx, ny
+                break
+        path.append((x, y))
+    path.reverse()
+    return path
+
+
+def find_transitions(moves, cluster_size):
+    """(tiles a, tiles b, step costs) of the entrance transitions between adjacent clusters"""
+    height, width = moves.shape
+    flat_moves = moves.reshape(-1)
+    # (tiles before the boundary, crossing bit, step to the other side, step along the
+    # line): east crossings on cluster column boundaries, south crossings on row boundaries
+    lines = [(np.arange(height) * width + x - 1, 0x02, 1, 0x04)
+             for x in range(cluster_size, width, cluster_size)]
+    lines += [((y - 1) * width + np.arange(width), 0x04, width, 0x02)
+              for y in range(cluster_size, height, cluster_size)]
+
+    side_a, side_b, costs = [], [], []
+    for tiles, bit, stride, along_bit in lines:
+        open_ = (flat_moves[tiles] & bit) != 0
+        # A run continues while both sides can walk to the next crossing, and
+        # breaks where the neighbouring clusters change along the line
+        joined = ((flat_moves[tiles] & along_bit) != 0) & ((flat_moves[tiles + stride] & along_bit) != 0)
+        joined = open_ & joined & np.r_[open_[1:], False]
+        cut = (np.arange(len(tiles)) % cluster_size) == 0
+        starts = np.flatnonzero(open_ & (cut | ~np.r_[False, joined[:-1]]))
+        ends = np.flatnonzero(open_ & (np.r_[cut[1:], True] | ~joined)) + 1
+        length = ends - starts
+        narrow = length < MIN_WIDE_ENTRANCE
+        picks = np.concatenate([(starts + (length - 1) // 2)[narrow], starts[~narrow], ends[~narrow] - 1])
+        side_a.append(tiles[picks])
+        side_b.append(tiles[picks] + stride)
+        costs.append(np.full(len(picks), STRAIGHT_COST, dtype=np.int64))
+
+    # Diagonal crossings (on either line, or through a corner where four
+    # clusters meet). Only the ones the straight entrances cannot stand in
+    # for become transitions: a diagonal a -> c is covered when one of the
+    # two-step detours a -> m -> c is walkable, as every straight crossing
+    # belongs to a run whose transition its cluster can reach along the line.
+    y, x = np.arange(height)[:, None], np.arange(width)[None, :]
+    for bit, dx, dy, _ in DIRECTIONS:
+        if dx != 1 or dy == 0:
+            continue  # NE and SE cover every diagonal pair once
+        vertical_bit = 0x04 if dy > 0 else 0x01
+        crosses = ((x + 1) % cluster_size == 0) | ((y if dy < 0 else y + 1) % cluster_size == 0)
+        # Detour east then vertically, or vertically then east
+        via_east = (moves & 0x02).astype(bool) & (_shifted(moves, 1, 0, 0) & vertical_bit).astype(bool)
+        via_vertical = (moves & vertical_bit).astype(bool) & (_shifted(moves, 0, dy, 0) & 0x02).astype(bool)
+        tiles = np.flatnonzero((moves & bit).astype(bool) & crosses & ~via_east & ~via_vertical)
+        side_a.append(tiles)
+        side_b.append(tiles + dy * width + 1)
+        costs.append(np.full(len(tiles), DIAGONAL_COST, dtype=np.int64))
+    return (np.concatenate(side_a).astype(np.int64), np.concatenate(side_b).astype(np.int64),
+            np.concatenate(costs))
+
+
+def cluster_column_edges(task):
+    """Intra-cluster edges of one column of clusters: (source tiles, target tiles, costs).
+
+    All clusters of the column are relaxed together in a
+    (cluster, node, y, x) array padded to the column's largest node count.
+    """
+    x0, cluster_size, column_moves, node_x, node_y = task
+    height, width = column_moves.shape
+    rows = -(-height // cluster_size)
+    padded = np.zeros((rows * cluster_size, cluster_size), dtype=np.uint8)
+    padded[:height, :width] = column_moves
+    moves = padded.reshape(rows, cluster_size, cluster_size)
+
+    cluster = node_y // cluster_size
+    order = np.lexsort((node_x, node_y))
+    node_x, node_y, cluster = node_x[order], node_y[order], cluster[order]
+    per_cluster = np.bincount(cluster, minlength=rows)
+    if len(node_x) == 0:
+        return [np.zeros(0, dtype=np.int64)] * 3
+    first = np.cumsum(per_cluster) - per_cluster
+    slot = np.arange(len(node_x)) - first[cluster]
+
+    dist = np.full((rows, per_cluster.max(), cluster_size, cluster_size), UNREACHABLE, dtype=np.int32)
+    local_x, local_y = node_x - x0, node_y % cluster_size
+    dist[cluster, slot, local_y, local_x] = 0
+    relax(step_costs(moves)[:, :, None], dist)
+
+    # Cost from every node to every other node of its cluster
+    pairs_source = np.repeat(np.arange(len(node_x)), per_cluster[cluster])
+    pairs_target = gather_ranges(first[cluster], per_cluster[cluster])
+    cost = dist[cluster[pairs_source], slot[pairs_source], local_y[pairs_target], local_x[pairs_target]]
+    keep = (pairs_source != pairs_target) & (cost < UNREACHABLE)
+    source_tile = node_y[pairs_source[keep]].astype(np.int64) * 0x10000 + node_x[pairs_source[keep]]
+    target_tile = node_y[pairs_target[keep]].astype(np.int64) * 0x10000 + node_x[pairs_target[keep]]
+    return source_tile, target_tile, cost[keep].astype(np.int64)
+
+
+class HPAGraph:
+    """Abstract graph: nodes are entrance tiles, edges carry path costs"""
+
+    def __init__(self, width, height, cluster_size, cluster_nodes, node_x, node_y,
+                 edge_offsets, edge_target, edge_cost):
+        self.width = width
+        self.height = height
+        self.cluster_size = cluster_size
+        self.clusters_x = -(-width // cluster_size)
+        self.clusters_y = -(-height // cluster_size)
+        self.cluster_nodes = np.asarray(cluster_nodes, dtype=np.int64)
+        self.node_x = np.asarray(node_x, dtype=np.int64)
+        self.node_y = np.asarray(node_y, dtype=np.int64)
+        self.edge_offsets = np.asarray(edge_offsets, dtype=np.int64)
+        self.edge_target = np.asarray(edge_target, dtype=np.int64)
+        self.edge_cost = np.asarray(edge_cost, dtype=np.int64)
+        self.moves = None
+
+    @classmethod
+    def build(cls, surface, cluster_size=DEFAULT_CLUSTER_SIZE, workers=None):
+        """Build the graph from a read_surface_grid() raster"""
+        height, width = surface.shape
+        moves = move_masks(surface)
+        side_a, side_b, crossing_cost = find_transitions(moves, cluster_size)
+        node_tiles = np.unique(np.concatenate([side_a, side_b]))
+        node_x, node_y = node_tiles % width, node_tiles // width
+        print(f"  {len(side_a)} entrance transitions, {len(node_tiles)} nodes")
+
+        # Nodes in cluster order, so each cluster's nodes are one range (the region index)
+        clusters_x = -(-width // cluster_size)
+        node_cluster = (node_y // cluster_size) * clusters_x + node_x // cluster_size
+        order = np.lexsort((node_x, node_y, node_cluster))
+        node_x, node_y, node_cluster = node_x[order], node_y[order], node_cluster[order]
+        cluster_count = clusters_x * -(-height // cluster_size)
+        cluster_nodes = np.zeros(cluster_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(node_cluster, minlength=cluster_count), out=cluster_nodes[1:])
+
+        node_key = node_y * 0x10000 + node_x
+        tasks = []
+        for x0 in range(0, width, cluster_size):
+            in_column = (node_x >= x0) & (node_x < x0 + cluster_size)
+            tasks.append((x0, cluster_size, moves[:, x0:x0 + cluster_size],
+                          node_x[in_column], node_y[in_column]))
+
+        sources, targets, costs = [], [], []
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for i, (source, target, cost) in enumerate(pool.map(cluster_column_edges, tasks), 1):
+                sources.append(source)
+                targets.append(target)
+                costs.append(cost)
+                print(f"  Cluster column {i}/{len(tasks)}", end='\r')
+        print()
+
+        # Inter-cluster edges: one step across each transition, both ways
+        a_key = (side_a // width) * 0x10000 + side_a % width
+        b_key = (side_b // width) * 0x10000 + side_b % width
+        sources += [a_key, b_key]
+        targets += [b_key, a_key]
+        costs += [crossing_cost, crossing_cost]
+        # Nodes are in cluster order, not key order
+        by_key = np.argsort(node_key)
+        source = by_key[np.searchsorted(node_key, np.concatenate(sources), sorter=by_key)]
+        target = by_key[np.searchsorted(node_key, np.concatenate(targets), sorter=by_key)]
+        cost = np.concatenate(costs)
+
+        order = np.lexsort((target, source))
+        source, target, cost = source[order], target[order], cost[order]
+        edge_offsets = np.zeros(len(node_key) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(source, minlength=len(node_key)), out=edge_offsets[1:])
+        graph = cls(width, height, cluster_size, cluster_nodes, node_x, node_y, edge_offsets, target, cost)
+        graph.moves = moves
+        return graph
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, version, cluster_size, width, height, clusters_x, clusters_y, node_count, edge_count = \
+                HPA_HEADER.unpack(f.read(HPA_HEADER.size))
+            if magic != HPA_MAGIC or version != HPA_VERSION:
+                raise ValueError(f"Not an HPA graph: {path}")
+            cluster_nodes = np.fromfile(f, dtype='<u4', count=clusters_x * clusters_y + 1)
+            node_x = np.fromfile(f, dtype='<u2', count=node_count)
+            node_y = np.fromfile(f, dtype='<u2', count=node_count)
+            edge_offsets = np.fromfile(f, dtype='<u4', count=node_count + 1)
+            edge_target = np.fromfile(f, dtype='<u4', count=edge_count)
+            edge_cost = np.fromfile(f, dtype='<u2', count=edge_count)
+        return cls(width, height, cluster_size, cluster_nodes, node_x, node_y,
+                   edge_offsets, edge_target, edge_cost)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(HPA_HEADER.pack(HPA_MAGIC, HPA_VERSION, self.cluster_size, self.width, self.height,
+                                    self.clusters_x, self.clusters_y, len(self.node_x), len(self.edge_target)))
+            f.write(self.cluster_nodes.astype('<u4').tobytes())
+            f.write(self.node_x.astype('<u2').tobytes())
+            f.write(self.node_y.astype('<u2').tobytes())
+            f.write(self.edge_offsets.astype('<u4').tobytes())
+            f.write(self.edge_target.astype('<u4').tobytes())
+            f.write(self.edge_cost.astype('<u2').tobytes())
+
+    def attach(self, surface):
+        """Provide the walk grid used to connect query endpoints and refine paths"""
+        self.moves = move_masks(surface)
+
+    def cluster_of(self, x, y):
+        return (y // self.cluster_size) * self.clusters_x + x // self.cluster_size
+
+    def _cluster_bounds(self, cluster):
+        x0 = (cluster % self.clusters_x) * self.cluster_size
+        y0 = (cluster // self.clusters_x) * self.cluster_size
+        return x0, y0, min(self.width, x0 + self.cluster_size), min(self.height, y0 + self.cluster_size)
+
+    def _cluster_field(self, x, y):
+        """(bounds, local moves, cost field) of a relaxation from (x, y) inside its cluster"""
+        x0, y0, x1, y1 = bounds = self._cluster_bounds(self.cluster_of(x, y))
+        moves = self.moves[y0:y1, x0:x1]
+        dist = np.full(moves.shape, UNREACHABLE, dtype=np.int32)
+        dist[y - y0, x - x0] = 0
+        return bounds, moves, relax(step_costs(moves), dist)
+
+    def find_path(self, start, goal):
+        """(cost, [(x, y), ...]) from start to goal, or None if unreachable.
+
+        Reference query: endpoints are connected to the nodes of their
+        clusters by an in-cluster search, A* runs on the abstract graph with
+        the octile heuristic, and each abstract step is refined back to tiles.
+        """
+        (sx, sy), (gx, gy) = start, goal
+        if (sx, sy) == (gx, gy):
+            return 0, [start]
+        if not self.moves[sy, sx] or not self.moves[gy, gx]:
+            return None
+
+        start_bounds, start_moves, start_field = self._cluster_field(sx, sy)
+        x0, y0, x1, y1 = start_bounds
+        if x0 <= gx < x1 and y0 <= gy < y1 and start_field[gy - y0, gx - x0] < UNREACHABLE:
+            local = trace_back(start_moves, start_field, (gx - x0, gy - y0))
+            return int(start_field[gy - y0, gx - x0]), [(x + x0, y + y0) for x, y in local]
+
+        goal_bounds, goal_moves, goal_field = self._cluster_field(gx, gy)
+        goal_cluster = self.cluster_of(gx, gy)
+        goal_nodes = range(self.cluster_nodes[goal_cluster], self.cluster_nodes[goal_cluster + 1])
+        to_goal = {}
+        gx0, gy0 = goal_bounds[:2]
+        for node in goal_nodes:
+            cost = goal_field[self.node_y[node] - gy0, self.node_x[node] - gx0]
+            if cost < UNREACHABLE:
+                to_goal[node] = int(cost)
+
+        def heuristic(x, y):
+            dx, dy = abs(x - gx), abs(y - gy)
+            return STRAIGHT_COST * max(dx, dy) + (DIAGONAL_COST - STRAIGHT_COST) * min(dx, dy)
+
+        GOAL = -1
+        best = {}
+        parent = {}
+        queue = []
+        start_cluster = self.cluster_of(sx, sy)
+        for node in range(self.cluster_nodes[start_cluster], self.cluster_nodes[start_cluster + 1]):
+            cost = start_field[self.node_y[node] - y0, self.node_x[node] - x0]
+            if cost < UNREACHABLE:
+                best[node] = int(cost)
+                parent[node] = None
+                heapq.heappush(queue, (int(cost) + heuristic(self.node_x[node], self.node_y[node]),
+                                       int(cost), node))
+        while queue:
+            _, cost, node = heapq.heappop(queue)
+            if node == GOAL:
+                break
+            if cost > best.get(node, UNREACHABLE):
+                continue
+            if node in to_goal and cost + to_goal[node] < best.get(GOAL, UNREACHABLE):
+                best[GOAL] = cost + to_goal[node]
+                parent[GOAL] = node
+                heapq.heappush(queue, (best[GOAL], best[GOAL], GOAL))
+            for edge in range(self.edge_offsets[node], self.edge_offsets[node + 1]):
+                target = int(self.edge_target[edge])
+                new_cost = cost + int(self.edge_cost[edge])
+                if new_cost < best.get(target, UNREACHABLE):
+                    best[target] = new_cost
+                    parent[target] = node
+                    heapq.heappush(queue, (new_cost + heuristic(self.node_x[target], self.node_y[target]),
+                                           new_cost, target))
+        if GOAL not in best:
+            return None
+
+        nodes = []
+        node = parent[GOAL]
+        while node is not None:
+            nodes.append(node)
+            node = parent[node]
+        nodes.reverse()
+
+        # Refine: start -> first node from the start field, node -> node by an
+        # A* inside their cluster or a single step, last node -> goal from the goal field
+        first = (int(self.node_x[nodes[0]]), int(self.node_y[nodes[0]]))
+        path = [(x + x0, y + y0) for x, y in trace_back(start_moves, start_field, (first[0] - x0, first[1] - y0))]
+        for a, b in zip(nodes, nodes[1:]):
+            bx, by = int(self.node_x[b]), int(self.node_y[b])
+            ax, ay = int(self.node_x[a]), int(self.node_y[a])
+            if self.cluster_of(ax, ay) != self.cluster_of(bx, by):
+                path.append((bx, by))
+                continue
+            cx0, cy0, cx1, cy1 = self._cluster_bounds(self.cluster_of(ax, ay))
+            _, local = astar(clip_moves(self.moves[cy0:cy1, cx0:cx1]), (ax - cx0, ay - cy0), (bx - cx0, by - cy0))
+            path += [(x + cx0, y + cy0) for x, y in local[1:]]
+        tail = trace_back(goal_moves, goal_field, (path[-1][0] - gx0, path[-1][1] - gy0))
+        path += [(x + gx0, y + gy0) for x, y in reversed(tail[:-1])]
+        return best[GOAL], path
+
+
+def astar(moves, start, goal):
+    """Flat A* over the whole grid with the same costs: (cost, path) or None"""
+    height, width = moves.shape
+    flat_moves = moves.reshape(-1)
+    (sx, sy), (gx, gy) = start, goal
+    goal_index = gy * width + gx
+    offsets = [(bit, dy * width + dx, cost) for bit, dx, dy, cost in DIRECTIONS]
+
+    def heuristic(index):
+        dx, dy = abs(index % width - gx), abs(index // width - gy)
+        return STRAIGHT_COST * max(dx, dy) + (DIAGONAL_COST - STRAIGHT_COST) * min(dx, dy)
+
+    start_index = sy * width + sx
+    best = {start_index: 0}
+    parent = {start_index: None}
+    queue = [(heuristic(start_index), 0, start_index)]
+    while queue:
+        _, cost, index = heapq.heappop(queue)
+        if index == goal_index:
+            path = []
+            while index is not None:
+                path.append((index % width, index // width))
+                index = parent[index]
+            return cost, path[::-1]
+        if cost > best[index]:
+            continue
+        tile_moves = int(flat_moves[index])
+        for bit, offset, step in offsets:
+            if tile_moves & bit:
+                target = index + offset
+                new_cost = cost + step
+                if new_cost < best.get(target, UNREACHABLE):
+                    best[target] = new_cost
+                    parent[target] = index
+                    heapq.heappush(queue, (new_cost + heuristic(target), new_cost, target))
+    return None
+
+
+def benchmark(graph, queries, max_distance=256, seed=0):
+    """Compare HPA* with flat A* on random pairs of passable tiles"""
+    rng = np.random.default_rng(seed)
+    passable_y, passable_x = np.nonzero(graph.moves)
+    if len(passable_x) == 0:
+        print("No passable tiles")
+        return
+    hpa_time = flat_time = 0.0
+    solved = unreachable = mismatched = 0
+    ratios = []
+    for _ in range(queries):
+        i = rng.integers(len(passable_x))
+        sx, sy = int(passable_x[i]), int(passable_y[i])
+        gx = int(np.clip(sx + rng.integers(-max_distance, max_distance + 1), 0, graph.width - 1))
+        gy = int(np.clip(sy + rng.integers(-max_distance, max_distance + 1), 0, graph.height - 1))
+        if not graph.moves[gy, gx]:
+            continue
+
+        started = time.perf_counter()
+        hpa = graph.find_path((sx, sy), (gx, gy))
+        hpa_time += time.perf_counter() - started
+        started = time.perf_counter()
+        flat = astar(graph.moves, (sx, sy), (gx, gy))
+        flat_time += time.perf_counter() - started
+
+        if flat is None:
+            unreachable += 1
+            mismatched += hpa is not None
+            continue
+        if hpa is None:
+            mismatched += 1
+            continue
+        solved += 1
+        ratios.append(hpa[0] / flat[0] if flat[0] else 1.0)
+
+    timed = solved + unreachable
+    if not timed:
+        print("No queries between passable tiles")
+        return
+    print(f"{'❌' if mismatched else '✅'} {timed} queries ({solved} solved, {unreachable} unreachable, "
+          f"{mismatched} mismatched)")
+    print(f"   HPA*:   {hpa_time / timed * 1000:.1f} ms/query")
+    print(f"   Flat A*: {flat_time / timed * 1000:.1f} ms/query ({flat_time / max(hpa_time, 1e-9):.1f}× slower)")
+    if ratios:
+        print(f"   Path cost vs optimal: mean {np.mean(ratios):.3f}, max {np.max(ratios):.3f}")
+
+
+def self_check(queries=160, seed=0, shape=(170, 150), cluster_size=DEFAULT_CLUSTER_SIZE):
+    """Compare HPA* reachability with flat A* on a random rough grid; returns the mismatch count.
+
+    Heights 0-20 with a quarter of the tiles blocked make many straight border
+    steps too steep, so routes depend on the diagonal entrances.
+    """
+    rng = np.random.default_rng(seed)
+    surface = rng.integers(0, 21, shape).astype(np.int16)
+    surface[rng.random(shape) < 0.25] = NO_LEVEL
+    graph = HPAGraph.build(surface, cluster_size, workers=1)
+    passable_y, passable_x = np.nonzero(graph.moves)
+    mismatched = 0
+    for _ in range(queries):
+        i, j = rng.integers(len(passable_x), size=2)
+        start = (int(passable_x[i]), int(passable_y[i]))
+        goal = (int(passable_x[j]), int(passable_y[j]))
+        hpa = graph.find_path(start, goal)
+        flat = astar(graph.moves, start, goal)
+        if (hpa is None) != (flat is None):
+            mismatched += 1
+            print(f"  ❌ {start} -> {goal}: HPA* {hpa and hpa[0]}, flat A* {flat and flat[0]}")
+        elif hpa is not None and (hpa[1][0] != start or hpa[1][-1] != goal or hpa[0] < flat[0]):
+            mismatched += 1
+            print(f"  ❌ {start} -> {goal}: invalid HPA* path (cost {hpa[0]}, optimal {flat[0]})")
+    if mismatched:
+        print(f"❌ {mismatched}/{queries} queries disagree with flat A*")
+    else:
+        print(f"✅ {queries} queries agree with flat A*")
+    return mismatched
+
+
+def main():
+    args = sys.argv[1:]
+    if '--self-check' in args:
+        sys.exit(1 if self_check() else 0)
+    cluster_size = DEFAULT_CLUSTER_SIZE
+    if '--cluster-size' in args:
+        i = args.index('--cluster-size')
+        cluster_size = int(args[i + 1])
+        del args[i:i + 2]
+    workers = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    queries = 0
+    if '--benchmark' in args:
+        i = args.index('--benchmark')
+        queries = int(args[i + 1])
+        del args[i:i + 2]
+    map_num = int(args[0]) if args else 0
+
+    walkgrid_dir = WALKGRID_PATH / f"map{map_num}"
+    if not (walkgrid_dir / 'index.json').exists():
+        print(f"❌ {walkgrid_dir} not found (run walk_grid.py first)")
+        sys.exit(1)
+    surface = read_surface_grid(walkgrid_dir)
+    height, width = surface.shape
+
+    print(f"Building HPA* graph for map {map_num} ({width}×{height}, {cluster_size}×{cluster_size} clusters)")
+    started = time.time()
+    graph = HPAGraph.build(surface, cluster_size, workers)
+    HPA_PATH.mkdir(parents=True, exist_ok=True)
+    output_file = HPA_PATH / f"map{map_num}.hpa.bin"
+    graph.save(output_file)
+    print(f"✅ {len(graph.node_x)} nodes, {len(graph.edge_target)} edges in {time.time() - started:.1f}s, "
+          f"{output_file.stat().st_size / 1024 / 1024:.1f} MB -> {output_file}")
+
+    if queries:
+        benchmark(graph, queries)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+/**
+ * Arena Bundle Loader
+ * Loads a bundle written by arena_export.py: the land, statics, art, texmaps
+ * and tiledata flags of a few small rectangles of a facet in one file, with
+ * tile IDs renumbered into a compact local ID space. Parsing is a handful of
+ * typed-array views over the fetched buffer.
+ *
+ * Lookups take world coordinates and original IDs, so getTileAt() and
+ * getStaticsForRegion() return the same shapes as UOMapLoader and
+ * UOStaticLoader. Art and texmap entries are returned raw (as stored in
+ * art.mul / texmaps.mul) for the existing decoders.
+ *
+ * Bundle format (little-endian, sections 8-byte aligned):
+ * - 'UOAB', u16 version, u16 map, u16 arenaCount, u16 reserved, u32 landCount, u32 staticCount, u32 texmapCount
+ * - u16 landIds[L], u16 landTextures[L], u16 staticIds[S], u16 texmapIds[T]
+ * - u32 landFlags[L], u32 staticFlags[S], u8 staticHeights[S]
+ * - arenas: { u16 x, y, width, height, u32 firstStatic, u32 staticCount }[arenaCount]
+ * - per arena: u16 land[height * width] (local IDs), i8 z[height * width]
+ * - statics: { u16 localGraphic, u16 x, u16 y, i8 z, u8 reserved, u16 hue }[]
+ * - u32 blobOffsets[L + S + T + 1], then land art, static art and texmap blobs
+ */
+
+const ARENA_MAGIC = 0x42414F55; // 'UOAB'
+const ARENA_HEADER_SIZE = 24;
+const ARENA_ENTRY_SIZE = 16;
+const ARENA_STATIC_SIZE = 10;
+
+export class ArenaBundleLoader {
+    constructor() {
+        this.buffer = null;
+        this.mapNumber = 0;
+        this.arenas = [];
+        this.landIds = null;
+        this.landTextures = null;
+        this.staticIds = null;
+        this.texmapIds = null;
+        this.landFlags = null;
+        this.staticFlags = null;
+        this.staticHeights = null;
+        this.statics = null;       // DataView over the static records
+        this.blobOffsets = null;
+        this.blobStart = 0;
+        this.landLocal = new Map();   // original land ID -> local ID
+        this.staticLocal = new Map(); // original graphic -> local ID
+        this.texmapLocal = new Map(); // original texture ID -> local ID
+    }
+
+    /**
+     * Fetch and parse a bundle
+     * @param {string} url - Bundle path (e.g., 'assets/arenas/duel.arena.bin')
+     * @returns {Promise<boolean>} Success status
+     */
+    async load(url) {
+        try {
+            const response = await fetch(url);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const started = performance.now();
+            this.parse(await response.arrayBuffer());
+            console.log(`[ArenaBundleLoader] ✅ ${url}: ${this.arenas.length} arena(s), ${this.landIds.length} land / ${this.staticIds.length} static IDs in ${(performance.now() - started).toFixed(1)}ms`);
+            return true;
+        } catch (error) {
+            console.error(`[ArenaBundleLoader] Failed to load ${url}:`, error);
+            return false;
+        }
+    }
+
+    parse(buffer) {
+        const view = new DataView(buffer);
+        if (view.getUint32(0, true) !== ARENA_MAGIC) {
+            throw new Error('Invalid arena bundle');
+        }
+        this.buffer = buffer;
+        this.mapNumber = view.getUint16(6, true);
+        const arenaCount = view.getUint16(8, true);
+        const landCount = view.getUint32(12, true);
+        const staticCount = view.getUint32(16, true);
+        const texmapCount = view.getUint32(20, true);
+
+        let offset = ARENA_HEADER_SIZE;
+        const section = (ArrayType, count) => {
+            const array = new ArrayType(buffer, offset, count);
+            offset += array.byteLength;
+            offset += (8 - offset % 8) % 8;
+            return array;
+        };
+        this.landIds = section(Uint16Array, landCount);
+        this.landTextures = section(Uint16Array, landCount);
+        this.staticIds = section(Uint16Array, staticCount);
+        this.texmapIds = section(Uint16Array, texmapCount);
+        this.landFlags = section(Uint32Array, landCount);
+        this.staticFlags = section(Uint32Array, staticCount);
+        this.staticHeights = section(Uint8Array, staticCount);
+
+        const entries = new DataView(buffer, offset, arenaCount * ARENA_ENTRY_SIZE);
+        offset += arenaCount * ARENA_ENTRY_SIZE;
+        offset += (8 - offset % 8) % 8;
+        this.arenas = [];
+        let totalStatics = 0;
+        for (let i = 0; i < arenaCount; i++) {
+            const base = i * ARENA_ENTRY_SIZE;
+            const arena = {
+                x: entries.getUint16(base, true),
+                y: entries.getUint16(base + 2, true),
+                width: entries.getUint16(base + 4, true),
+                height: entries.getUint16(base + 6, true),
+                firstStatic: entries.getUint32(base + 8, true),
+                staticCount: entries.getUint32(base + 12, true)
+            };
+            this.arenas.push(arena);
+            totalStatics += arena.staticCount;
+        }
+        for (const arena of this.arenas) {
+            arena.land = section(Uint16Array, arena.width * arena.height);
+            arena.z = section(Int8Array, arena.width * arena.height);
+        }
+        this.statics = new DataView(buffer, offset, totalStatics * ARENA_STATIC_SIZE);
+        offset += totalStatics * ARENA_STATIC_SIZE;
+        offset += (8 - offset % 8) % 8;
+        this.blobOffsets = section(Uint32Array, landCount + staticCount + texmapCount + 1);
+        this.blobStart = offset;
+
+        this.landLocal = new Map(Array.from(this.landIds, (id, local) => [id, local]));
+        this.staticLocal = new Map(Array.from(this.staticIds, (id, local) => [id, local]));
+        this.texmapLocal = new Map(Array.from(this.texmapIds, (id, local) => [id, local]));
+    }
+
+    arenaAt(x, y) {
+        for (const arena of this.arenas) {
+            if (x >= arena.x && x < arena.x + arena.width && y >= arena.y && y < arena.y + arena.height) {
+                return arena;
+            }
+        }
+        return null;
+    }
+
+    /**
+     * Land tile at world coordinates, in the shape of UOMapLoader.getTileAt()
+     * @returns {Object|null} { tileId, z, zRaw, hexId } or null outside every arena
+     */
+    getTileAt(x, y) {
+        const arena = this.arenaAt(x, y);
+        if (!arena) return null;
+        const index = (y - arena.y) * arena.width + (x - arena.x);
+        const tileId = this.landIds[arena.land[index]];
+        const z = arena.z[index];
+        return {
+            tileId: tileId,
+            z: z,
+            zRaw: z & 0xFF,
+            hexId: `0x${tileId.toString(16).toUpperCase().padStart(4, '0')}`
+        };
+    }
+
+    /**
+     * Statics inside a world rectangle, in the shape of UOStaticLoader.getStaticsForRegion()
+     */
+    getStaticsForRegion(startX, startY, width, height) {
+        const statics = [];
+        for (const arena of this.arenas) {
+            if (arena.x >= startX + width || arena.x + arena.width <= startX ||
+                arena.y >= startY + height || arena.y + arena.height <= startY) {
+                continue;
+            }
+            for (let i = arena.firstStatic; i < arena.firstStatic + arena.staticCount; i++) {
+                const base = i * ARENA_STATIC_SIZE;
+                const worldX = this.statics.getUint16(base + 2, true);
+                const worldY = this.statics.getUint16(base + 4, true);
+                if (worldX < startX || worldX >= startX + width || worldY < startY || worldY >= startY + height) {
+                    continue;
+                }
+                const graphic = this.staticIds[this.statics.getUint16(base, true)];
+                statics.push({
+                    graphic: graphic,
+                    hexId: `0x${graphic.toString(16).toUpperCase().padStart(4, '0')}`,
+                    x: worldX % 8,
+                    y: worldY % 8,
+                    z: this.statics.getInt8(base + 6),
+                    hue: this.statics.getUint16(base + 8, true),
+                    worldX: worldX,
+                    worldY: worldY
+                });
+            }
+        }
+        return statics;
+    }
+
+    blob(index) {
+        const start = this.blobOffsets[index];
+        const end = this.blobOffsets[index + 1];
+        return end > start ? new Uint8Array(this.buffer, this.blobStart + start, end - start) : null;
+    }
+
+    /** Raw art.mul entry of a land tile (original ID), or null */
+    getLandArt(tileId) {
+        const local = this.landLocal.get(tileId);
+        return local === undefined ? null : this.blob(local);
+    }
+
+    /** Raw art.mul entry of a static (original graphic), or null */
+    getStaticArt(graphic) {
+        const local = this.staticLocal.get(graphic);
+        return local === undefined ? null : this.blob(this.landIds.length + local);
+    }
+
+    /** Raw texmaps.mul entry (original texture ID), or null */
+    getTexmap(textureId) {
+        const local = this.texmapLocal.get(textureId);
+        return local === undefined ? null : this.blob(this.landIds.length + this.staticIds.length + local);
+    }
+
+    /** Original texture ID of a land tile's texmap, or null if it has none */
+    getLandTexture(tileId) {
+        const local = this.landLocal.get(tileId);
+        if (local === undefined || this.landTextures[local] === 0xFFFF) return null;
+        return this.texmapIds[this.landTextures[local]];
+    }
+
+    /** TileData flags (low 32 bits) of a land tile */
+    getLandFlags(tileId) {
+        const local = this.landLocal.get(tileId);
+        return local === undefined ? 0 : this.landFlags[local];
+    }
+
+    /** TileData flags (low 32 bits) and height of a static */
+    getStaticData(graphic) {
+        const local = this.staticLocal.get(graphic);
+        if (local === undefined) return null;
+        return { flags: this.staticFlags[local], height: this.staticHeights[local] };
+    }
+
+    /**
+     * Map metadata in the shape of UOMapLoader.getMapInfo()
+     */
+    getMapInfo() {
+        return {
+            width: Math.max(0, ...this.arenas.map(arena => arena.x + arena.width)),
+            height: Math.max(0, ...this.arenas.map(arena => arena.y + arena.height)),
+            loaded: this.buffer !== null,
+            dataSize: this.buffer ? this.buffer.byteLength : 0,
+            arenas: this.arenas.length
+        };
+    }
+}
+
+export default ArenaBundleLoader;
@@ -0,0 +1,117 @@
+/**
+ * Land Atlas Loader
+ * Loads the land tile atlases built by land_atlas.py: land_atlas.json plus a
+ * few PNGs, instead of fetching every assets/tiles/0xXXXX.bmp on startup.
+ *
+ * getTileRect() gives the atlas image, pixel rectangle and UVs of a tile for
+ * drawing straight from the atlas. getTileImage() cuts a tile out into its
+ * own 44×44 canvas (cached), so it can be passed as the imageLoader of
+ * WebGLTerrainRenderer.render() in place of the per-tile images.
+ *
+ * Manifest format:
+ * { version, tileSize, padding, atlasSize, atlases: [file, ...], tiles: { "0xXXXX": [atlas, x, y] } }
+ */
+
+export class LandAtlasLoader {
+    constructor() {
+        this.basePath = '';
+        this.tileSize = 44;
+        this.atlases = [];          // HTMLImageElement per atlas
+        this.tiles = new Map();     // tile ID -> [atlas, x, y]
+        this.tileImages = new Map(); // tile ID -> cut-out canvas
+    }
+
+    /**
+     * Fetch the manifest and every atlas image
+     * @param {string} basePath - Atlas directory (e.g., 'assets/tiles/atlas')
+     * @returns {Promise<boolean>} Success status
+     */
+    async load(basePath = 'assets/tiles/atlas') {
+        this.basePath = basePath.replace(/\/$/, '');
+        try {
+            const started = performance.now();
+            const response = await fetch(`${this.basePath}/land_atlas.json`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const manifest = await response.json();
+            this.tileSize = manifest.tileSize;
+            this.tiles = new Map(Object.entries(manifest.tiles).map(([hexId, slot]) => [parseInt(hexId, 16), slot]));
+            this.atlases = await Promise.all(manifest.atlases.map(file => this.loadImage(`${this.basePath}/${file}`)));
+            console.log(`[LandAtlasLoader] ✅ ${this.tiles.size} land tiles in ${this.atlases.length} atlas(es) in ${(performance.now() - started).toFixed(0)}ms`);
+            return true;
+        } catch (error) {
+            console.error(`[LandAtlasLoader] Failed to load ${this.basePath}/land_atlas.json:`, error);
+            return false;
+        }
+    }
+
+    loadImage(url) {
+        return new Promise((resolve, reject) => {
+            const img = new Image();
+            img.onload = () => resolve(img);
+            img.onerror = () => reject(new Error(`Failed to load: ${url}`));
+            img.src = url;
+        });
+    }
+
+    hasTile(tileId) {
+        return this.tiles.has(tileId);
+    }
+
+    /**
+     * Where a land tile sits in the atlases
+     * @returns {Object|null} { image, atlas, x, y, width, height, u0, v0, u1, v1 } or null if not packed
+     */
+    getTileRect(tileId) {
+        const slot = this.tiles.get(tileId);
+        if (!slot) return null;
+        const [atlas, x, y] = slot;
+        const image = this.atlases[atlas];
+        const size = this.tileSize;
+        return {
+            image,
+            atlas,
+            x,
+            y,
+            width: size,
+            height: size,
+            u0: x / image.width,
+            v0: y / image.height,
+            u1: (x + size) / image.width,
+            v1: (y + size) / image.height
+        };
+    }
+
+    /**
+     * A land tile as its own canvas (for code that expects one image per tile)
+     * @returns {HTMLCanvasElement|null}
+     */
+    getTileImage(tileId) {
+        if (this.tileImages.has(tileId)) {
+            return this.tileImages.get(tileId);
+        }
+        const rect = this.getTileRect(tileId);
+        if (!rect) return null;
+        const canvas = document.createElement('canvas');
+        canvas.width = rect.width;
+        canvas.height = rect.height;
+        canvas.getContext('2d').drawImage(rect.image, rect.x, rect.y, rect.width, rect.height,
+            0, 0, rect.width, rect.height);
+        this.tileImages.set(tileId, canvas);
+        return canvas;
+    }
+
+    /**
+     * Draw a land tile from the atlas onto a 2D context
+     */
+    drawTile(ctx, tileId, x, y) {
+        const rect = this.getTileRect(tileId);
+        if (!rect) return false;
+        ctx.drawImage(rect.image, rect.x, rect.y, rect.width, rect.height, x, y, rect.width, rect.height);
+        return true;
+    }
+}
+
+export const landAtlasLoader = new LandAtlasLoader();
+export default landAtlasLoader;
@@ -0,0 +1,191 @@
+/**
+ * Map Region Streamer
+ * Streams terrain from the region files written by map_tiler.py instead of
+ * holding the whole map#.mul in memory. Call update() with the camera tile
+ * position every frame (or on move): regions within loadRadius are fetched,
+ * regions beyond evictRadius are dropped.
+ *
+ * Region file format (little-endian):
+ * - 'UORG', u16 version, u16 regionX, u16 regionY, u16 width, u16 height, u16 reserved
+ * - u16 tileIds[height * width] (row-major), then i8 z[height * width]
+ *
+ * getTileAt() matches UOMapLoader.getTileAt(), returning null for tiles in
+ * regions that are not loaded yet.
+ */
+
+const REGION_MAGIC = 0x47524F55; // 'UORG'
+const REGION_HEADER_SIZE = 16;
+
+export class MapRegionStreamer {
+    /**
+     * @param {string} basePath - Region directory (e.g., 'assets/regions/map0')
+     * @param {Object} options - { loadRadius, evictRadius } in tiles around the camera
+     */
+    constructor(basePath, options = {}) {
+        this.basePath = basePath.replace(/\/$/, '');
+        this.loadRadius = options.loadRadius ?? 192;
+        this.evictRadius = options.evictRadius ?? this.loadRadius + 256;
+        this.directory = null;
+        this.mapWidth = 0;
+        this.mapHeight = 0;
+        this.regionSize = 0;
+        this.regions = new Map();  // "rx,ry" -> { tileIds, z, width, height }
+        this.pending = new Map();  // "rx,ry" -> Promise
+        this.onRegionLoaded = null; // optional callback(rx, ry)
+    }
+
+    /**
+     * Fetch index.json (the region directory)
+     * @returns {Promise<boolean>} Success status
+     */
+    async load() {
+        try {
+            const response = await fetch(`${this.basePath}/index.json`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            this.directory = await response.json();
+            this.mapWidth = this.directory.width;
+            this.mapHeight = this.directory.height;
+            this.regionSize = this.directory.regionSize;
+            console.log(`[MapRegionStreamer] ✅ ${this.basePath}: ${this.directory.columns}×${this.directory.rows} regions of ${this.regionSize} tiles`);
+            return true;
+        } catch (error) {
+            console.error(`[MapRegionStreamer] Failed to load ${this.basePath}/index.json:`, error);
+            return false;
+        }
+    }
+
+    regionUrl(rx, ry) {
+        return `${this.basePath}/${this.directory.file.replace('{x}', rx).replace('{y}', ry)}`;
+    }
+
+    /**
+     * Fetch one region (deduplicated while in flight)
+     */
+    loadRegion(rx, ry) {
+        const key = `${rx},${ry}`;
+        if (this.regions.has(key)) return Promise.resolve(this.regions.get(key));
+        if (this.pending.has(key)) return this.pending.get(key);
+
+        const promise = fetch(this.regionUrl(rx, ry))
+            .then(async response => {
+                if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                const region = this.parseRegion(await response.arrayBuffer());
+                this.regions.set(key, region);
+                if (this.onRegionLoaded) this.onRegionLoaded(rx, ry);
+                return region;
+            })
+            .catch(error => {
+                console.error(`[MapRegionStreamer] Failed to load region ${key}:`, error);
+                return null;
+            })
+            .finally(() => this.pending.delete(key));
+        this.pending.set(key, promise);
+        return promise;
+    }
+
+    parseRegion(buffer) {
+        const view = new DataView(buffer);
+        if (view.getUint32(0, true) !== REGION_MAGIC) {
+            throw new Error('Invalid region file');
+        }
+        const width = view.getUint16(10, true);
+        const height = view.getUint16(12, true);
+        const count = width * height;
+        return {
+            width,
+            height,
+            tileIds: new Uint16Array(buffer, REGION_HEADER_SIZE, count),
+            z: new Int8Array(buffer, REGION_HEADER_SIZE + count * 2, count)
+        };
+    }
+
+    /**
+     * Stream around the camera: fetch regions within loadRadius, evict beyond evictRadius
+     * @param {number} cameraX - Camera tile X
+     * @param {number} cameraY - Camera tile Y
+     * @returns {Promise} Resolves when the regions requested by this call are loaded
+     */
+    update(cameraX, cameraY) {
+        if (!this.directory) return Promise.resolve();
+
+        const size = this.regionSize;
+        const rx0 = Math.max(0, Math.floor((cameraX - this.loadRadius) / size));
+        const ry0 = Math.max(0, Math.floor((cameraY - this.loadRadius) / size));
+        const rx1 = Math.min(this.directory.columns - 1, Math.floor((cameraX + this.loadRadius) / size));
+        const ry1 = Math.min(this.directory.rows - 1, Math.floor((cameraY + this.loadRadius) / size));
+
+        // Nearest regions first so the area under the camera appears first
+        const wanted = [];
+        for (let rx = rx0; rx <= rx1; rx++) {
+            for (let ry = ry0; ry <= ry1; ry++) {
+                const dx = (rx + 0.5) * size - cameraX;
+                const dy = (ry + 0.5) * size - cameraY;
+                wanted.push({ rx, ry, distance: dx * dx + dy * dy });
+            }
+        }
+        wanted.sort((a, b) => a.distance - b.distance);
+
+        this.evictFar(cameraX, cameraY);
+        return Promise.all(wanted.map(({ rx, ry }) => this.loadRegion(rx, ry)));
+    }
+
+    /**
+     * Drop regions whose nearest edge is farther than evictRadius from the camera
+     */
+    evictFar(cameraX, cameraY) {
+        const size = this.regionSize;
+        for (const [key, region] of this.regions) {
+            const [rx, ry] = key.split(',').map(Number);
+            const dx = Math.max(rx * size - cameraX, 0, cameraX - (rx * size + region.width));
+            const dy = Math.max(ry * size - cameraY, 0, cameraY - (ry * size + region.height));
+            if (dx > this.evictRadius || dy > this.evictRadius) {
+                this.regions.delete(key);
+            }
+        }
+    }
+
+    /**
+     * Get tile data at specific coordinates
+     * @returns {Object|null} { tileId, z, zRaw, hexId } or null if out of bounds / not loaded
+     */
+    getTileAt(x, y) {
+        if (!this.directory || x < 0 || x >= this.mapWidth || y < 0 || y >= this.mapHeight) {
+            return null;
+        }
+        const rx = Math.floor(x / this.regionSize);
+        const ry = Math.floor(y / this.regionSize);
+        const region = this.regions.get(`${rx},${ry}`);
+        if (!region) return null;
+
+        const index = (y - ry * this.regionSize) * region.width + (x - rx * this.regionSize);
+        const tileId = region.tileIds[index];
+        const z = region.z[index];
+        return {
+            tileId: tileId,
+            z: z,
+            zRaw: z & 0xFF,
+            hexId: `0x${tileId.toString(16).toUpperCase().padStart(4, '0')}`
+        };
+    }
+
+    /**
+     * Map metadata in the shape of UOMapLoader.getMapInfo()
+     */
+    getMapInfo() {
+        let dataSize = 0;
+        for (const region of this.regions.values()) {
+            dataSize += region.tileIds.byteLength + region.z.byteLength;
+        }
+        return {
+            width: this.mapWidth,
+            height: this.mapHeight,
+            loaded: this.directory !== null,
+            dataSize,
+            loadedRegions: this.regions.size
+        };
+    }
+}
+
+export default MapRegionStreamer;
@@ -0,0 +1,218 @@
+/**
+ * Shard Pack Loader
+ * Reads packs written by pack_shards.py: a small index.bin plus shard_###.bin
+ * files. Only the entries that are asked for are downloaded, with HTTP Range
+ * requests where the server supports them and whole-shard fetches otherwise.
+ *
+ * Index format (little-endian):
+ * - 'UOSP', u16 version, u16 kind (1 = art, 2 = map blocks)
+ * - u32 entry count, u32 shard count, u32 record size (0 = variable)
+ * - u32 shardStarts[shardCount + 1] (global byte offsets)
+ * - u32 entryStarts[count + 1] (only when record size is 0)
+ */
+
+export const PACK_KIND_ART = 1;
+export const PACK_KIND_MAP = 2;
+
+const PACK_MAGIC = 0x50534F55; // 'UOSP'
+const PACK_HEADER_SIZE = 20;
+
+export class ShardPackLoader {
+    constructor(basePath) {
+        this.basePath = basePath.replace(/\/$/, '');
+        this.kind = 0;
+        this.count = 0;
+        this.recordSize = 0;
+        this.shardStarts = null;
+        this.entryStarts = null;
+        this.shardCache = new Map();   // shard -> Promise<Uint8Array> (whole-shard fallback)
+        this.entryCache = new Map();   // id -> Uint8Array
+        this.rangeSupported = null;    // unknown until the first range request
+        this.bytesFetched = 0;
+    }
+
+    /**
+     * Fetch and parse index.bin
+     * @returns {Promise<boolean>} Success status
+     */
+    async load() {
+        try {
+            const response = await fetch(`${this.basePath}/index.bin`);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const buffer = await response.arrayBuffer();
+            const view = new DataView(buffer);
+
+            if (view.getUint32(0, true) !== PACK_MAGIC) {
+                throw new Error('Invalid shard pack index');
+            }
+            this.kind = view.getUint16(6, true);
+            this.count = view.getUint32(8, true);
+            const shardCount = view.getUint32(12, true);
+            this.recordSize = view.getUint32(16, true);
+
+            // Copy out of the header-offset buffer so the arrays are 4-byte aligned
+            this.shardStarts = new Uint32Array(buffer.slice(PACK_HEADER_SIZE, PACK_HEADER_SIZE + (shardCount + 1) * 4));
+            if (this.recordSize === 0) {
+                const start = PACK_HEADER_SIZE + (shardCount + 1) * 4;
+                this.entryStarts = new Uint32Array(buffer.slice(start, start + (this.count + 1) * 4));
+            }
+
+            console.log(`[ShardPackLoader] ✅ ${this.basePath}: ${this.count} entries in ${shardCount} shards`);
+            return true;
+        } catch (error) {
+            console.error(`[ShardPackLoader] Failed to load ${this.basePath}/index.bin:`, error);
+            return false;
+        }
+    }
+
+    /**
+     * Locate an entry: { shard, start, end } with start/end relative to the shard,
+     * or null if the entry is missing or empty
+     */
+    locate(id) {
+        if (!this.shardStarts || id < 0 || id >= this.count) return null;
+
+        let start, end;
+        if (this.recordSize) {
+            start = id * this.recordSize;
+            end = start + this.recordSize;
+        } else {
+            start = this.entryStarts[id];
+            end = this.entryStarts[id + 1];
+        }
+        if (start === end) return null;
+
+        // Binary search for the last shard starting at or before `start`
+        let lo = 0, hi = this.shardStarts.length - 2;
+        while (lo < hi) {
+            const mid = (lo + hi + 1) >> 1;
+            if (this.shardStarts[mid] <= start) lo = mid; else hi = mid - 1;
+        }
+        const base = this.shardStarts[lo];
+        return { shard: lo, start: start - base, end: end - base };
+    }
+
+    shardUrl(shard) {
+        return `${this.basePath}/shard_${String(shard).padStart(3, '0')}.bin`;
+    }
+
+    /**
+     * Fetch a whole shard once and keep it
+     */
+    fetchShard(shard) {
+        if (!this.shardCache.has(shard)) {
+            const pending = fetch(this.shardUrl(shard)).then(async response => {
+                if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+                const data = new Uint8Array(await response.arrayBuffer());
+                this.bytesFetched += data.length;
+                return data;
+            });
+            pending.catch(() => this.shardCache.delete(shard));
+            this.shardCache.set(shard, pending);
+        }
+        return this.shardCache.get(shard);
+    }
+
+    /**
+     * Fetch bytes [start, end) of a shard, by Range request when possible
+     */
+    async fetchRange(shard, start, end) {
+        if (this.rangeSupported !== false && !this.shardCache.has(shard)) {
+            const response = await fetch(this.shardUrl(shard), {
+                headers: { Range: `bytes=${start}-${end - 1}` }
+            });
+            if (response.status === 206) {
+                this.rangeSupported = true;
+                const data = new Uint8Array(await response.arrayBuffer());
+                this.bytesFetched += data.length;
+                return data;
+            }
+            if (!response.ok) throw new Error(`HTTP error! status: ${response.status}`);
+
+            // Server ignored the Range header and sent the whole shard; keep it
+            console.warn('[ShardPackLoader] Range requests not supported, fetching whole shards');
+            this.rangeSupported = false;
+            const data = new Uint8Array(await response.arrayBuffer());
+            this.bytesFetched += data.length;
+            this.shardCache.set(shard, Promise.resolve(data));
+            return data.subarray(start, end);
+        }
+        return (await this.fetchShard(shard)).subarray(start, end);
+    }
+
+    /**
+     * Get one entry's bytes
+     * @param {number} id - Art index or map block index
+     * @returns {Promise<Uint8Array|null>}
+     */
+    async getEntry(id) {
+        if (this.entryCache.has(id)) return this.entryCache.get(id);
+
+        const location = this.locate(id);
+        if (!location) return null;
+
+        const data = await this.fetchRange(location.shard, location.start, location.end);
+        this.entryCache.set(id, data);
+        return data;
+    }
+
+    /**
+     * Get many entries, coalescing neighbours in the same shard into one request
+     * @param {Iterable<number>} ids
+     * @returns {Promise<Map<number, Uint8Array>>} Present entries by id
+     */
+    async getEntries(ids) {
+        const result = new Map();
+        const wanted = [];
+        for (const id of new Set(ids)) {
+            if (this.entryCache.has(id)) {
+                result.set(id, this.entryCache.get(id));
+                continue;
+            }
+            const location = this.locate(id);
+            if (location) wanted.push({ id, ...location });
+        }
+        wanted.sort((a, b) => a.shard - b.shard || a.start - b.start);
+
+        // Merge entries whose gap is small enough that one request is cheaper
+        const maxGap = 4096;
+        const spans = [];
+        for (const entry of wanted) {
+            const last = spans[spans.length - 1];
+            if (last && last.shard === entry.shard && entry.start - last.end <= maxGap) {
+                last.end = Math.max(last.end, entry.end);
+                last.entries.push(entry);
+            } else {
+                spans.push({ shard: entry.shard, start: entry.start, end: entry.end, entries: [entry] });
+            }
+        }
+
+        const fetchSpan = async span => {
+            const data = await this.fetchRange(span.shard, span.start, span.end);
+            for (const entry of span.entries) {
+                const bytes = data.subarray(entry.start - span.start, entry.end - span.start);
+                this.entryCache.set(entry.id, bytes);
+                result.set(entry.id, bytes);
+            }
+        };
+
+        // Probe Range support with one request before fanning out, so a server
+        // without it is not asked for the same whole shard many times over
+        if (this.rangeSupported === null && spans.length > 0) {
+            await fetchSpan(spans.shift());
+        }
+        await Promise.all(spans.map(fetchSpan));
+        return result;
+    }
+
+    /**
+     * Drop cached entries (e.g. map blocks far from the camera)
+     */
+    evict(ids) {
+        for (const id of ids) this.entryCache.delete(id);
+    }
+}
+
+export default ShardPackLoader;
@@ -0,0 +1,119 @@
+/**
+ * Static Atlas Loader
+ * Loads static art pages packed by static_atlas.py (NAME.json + NAME_#.png).
+ * Every static on a page shares one texture, so the renderer can sort
+ * statics by page and draw each page in a single batch instead of binding
+ * one texture per graphic.
+ *
+ * Sprites are trimmed to their opaque pixels; getSprite() returns where the
+ * trimmed rectangle sits inside the original art so statics keep their
+ * anchor (art is drawn bottom-centred on the tile, as UO does).
+ *
+ * Manifest format:
+ * { version, padding, pages: [{ file, width, height }],
+ *   sprites: { "0xXXXX": [page, x, y, width, height, offsetX, offsetY, artWidth, artHeight] } }
+ */
+
+export class StaticAtlasLoader {
+    constructor() {
+        this.basePath = '';
+        this.pages = [];           // { image, width, height }
+        this.sprites = new Map();  // graphic -> manifest row
+        this.textures = [];        // WebGL texture per page (createTextures)
+    }
+
+    /**
+     * Fetch an atlas manifest and its pages
+     * @param {string} manifestUrl - e.g. 'assets/sprites/atlas/statics.json'
+     * @returns {Promise<boolean>} Success status
+     */
+    async load(manifestUrl) {
+        this.basePath = manifestUrl.substring(0, manifestUrl.lastIndexOf('/') + 1);
+        try {
+            const started = performance.now();
+            const response = await fetch(manifestUrl);
+            if (!response.ok) {
+                throw new Error(`HTTP error! status: ${response.status}`);
+            }
+            const manifest = await response.json();
+            this.sprites = new Map(Object.entries(manifest.sprites).map(([hexId, row]) => [parseInt(hexId, 16), row]));
+            const images = await Promise.all(manifest.pages.map(page => this.loadImage(this.basePath + page.file)));
+            this.pages = manifest.pages.map((page, i) => ({ image: images[i], width: page.width, height: page.height }));
+            console.log(`[StaticAtlasLoader] ✅ ${this.sprites.size} statics on ${this.pages.length} page(s) in ${(performance.now() - started).toFixed(0)}ms`);
+            return true;
+        } catch (error) {
+            console.error(`[StaticAtlasLoader] Failed to load ${manifestUrl}:`, error);
+            return false;
+        }
+    }
+
+    loadImage(url) {
+        return new Promise((resolve, reject) => {
+            const img = new Image();
+            img.onload = () => resolve(img);
+            img.onerror = () => reject(new Error(`Failed to load: ${url}`));
+            img.src = url;
+        });
+    }
+
+    hasSprite(graphic) {
+        return this.sprites.has(graphic);
+    }
+
+    /**
+     * Atlas placement of a static graphic
+     * @returns {Object|null} { page, x, y, width, height, offsetX, offsetY, artWidth, artHeight, u0, v0, u1, v1 }
+     */
+    getSprite(graphic) {
+        const row = this.sprites.get(graphic);
+        if (!row) return null;
+        const [page, x, y, width, height, offsetX, offsetY, artWidth, artHeight] = row;
+        const { width: pageWidth, height: pageHeight } = this.pages[page];
+        return {
+            page,
+            x,
+            y,
+            width,
+            height,
+            offsetX,
+            offsetY,
+            artWidth,
+            artHeight,
+            u0: x / pageWidth,
+            v0: y / pageHeight,
+            u1: (x + width) / pageWidth,
+            v1: (y + height) / pageHeight
+        };
+    }
+
+    /**
+     * Upload every page once (one texture per page)
+     * @returns {Array<WebGLTexture>}
+     */
+    createTextures(gl) {
+        this.textures = this.pages.map(page => {
+            const texture = gl.createTexture();
+            gl.bindTexture(gl.TEXTURE_2D, texture);
+            gl.texImage2D(gl.TEXTURE_2D, 0, gl.RGBA, gl.RGBA, gl.UNSIGNED_BYTE, page.image);
+            gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_MIN_FILTER, gl.NEAREST);
+            gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_MAG_FILTER, gl.NEAREST);
+            gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_WRAP_S, gl.CLAMP_TO_EDGE);
+            gl.texParameteri(gl.TEXTURE_2D, gl.TEXTURE_WRAP_T, gl.CLAMP_TO_EDGE);
+            return texture;
+        });
+        return this.textures;
+    }
+
+    /**
+     * Draw a static with its art's top-left corner at (x, y) onto a 2D context
+     */
+    drawSprite(ctx, graphic, x, y) {
+        const sprite = this.getSprite(graphic);
+        if (!sprite) return false;
+        ctx.drawImage(this.pages[sprite.page].image, sprite.x, sprite.y, sprite.width, sprite.height,
+            x + sprite.offsetX, y + sprite.offsetY, sprite.width, sprite.height);
+        return true;
+    }
+}
+
+export default StaticAtlasLoader;
@@ -0,0 +1,116 @@
+/**
+ * Terrain Mesh Streamer
+ * Streams the land corner heights, stretched flags and normals baked by
+ * terrain_mesh.py around the camera. A region's vertex section is laid out
+ * for direct upload (gl.bufferData) with the attribute layout in
+ * VERTEX_LAYOUT, so the renderer no longer derives cornerHeights or normals
+ * per frame. Region loading and eviction are shared with MapRegionStreamer
+ * (same index.json layout).
+ *
+ * Region file format (little-endian):
+ * - 'UOTM', u16 version, u16 regionX, u16 regionY, u16 width, u16 height, u16 reserved
+ * - tiles[height * width]: { u8 flags, i8 averageZ, i8 minZ, u8 reserved }
+ * - vertices[height * width * 4]: { i8 z, i8 normal[3] (× 127) } in TOP, RIGHT, LEFT, BOTTOM order
+ */
+
+import { MapRegionStreamer } from './mapRegionStreamer.js';
+
+const MESH_MAGIC = 0x4D544F55; // 'UOTM'
+const MESH_HEADER_SIZE = 16;
+const TILE_RECORD_SIZE = 4;
+const VERTEX_SIZE = 4;
+
+export const TILE_STRETCHED = 0x01;
+
+/**
+ * vertexAttribPointer() arguments for a region's vertex buffer:
+ * gl.vertexAttribPointer(location, size, gl.BYTE, normalized, stride, offset)
+ */
+export const VERTEX_LAYOUT = {
+    stride: VERTEX_SIZE,
+    z: { size: 1, normalized: false, offset: 0 },
+    normal: { size: 3, normalized: true, offset: 1 }
+};
+
+export class TerrainMeshStreamer extends MapRegionStreamer {
+    parseRegion(buffer) {
+        const view = new DataView(buffer);
+        if (view.getUint32(0, true) !== MESH_MAGIC) {
+            throw new Error('Invalid terrain mesh region');
+        }
+        const width = view.getUint16(10, true);
+        const height = view.getUint16(12, true);
+        const count = width * height;
+        const vertexStart = MESH_HEADER_SIZE + count * TILE_RECORD_SIZE;
+        return {
+            width,
+            height,
+            tileFlags: new Uint8Array(buffer, MESH_HEADER_SIZE, count * TILE_RECORD_SIZE),
+            tileZ: new Int8Array(buffer, MESH_HEADER_SIZE, count * TILE_RECORD_SIZE),
+            vertices: new Int8Array(buffer, vertexStart, count * 4 * VERTEX_SIZE)
+        };
+    }
+
+    regionAt(x, y) {
+        if (!this.directory || x < 0 || x >= this.mapWidth || y < 0 || y >= this.mapHeight) {
+            return null;
+        }
+        const rx = Math.floor(x / this.regionSize);
+        const ry = Math.floor(y / this.regionSize);
+        const region = this.regions.get(`${rx},${ry}`);
+        if (!region) return null;
+        return { region, index: (y - ry * this.regionSize) * region.width + (x - rx * this.regionSize) };
+    }
+
+    /**
+     * Baked land data of a tile
+     * @returns {Object|null} { stretched, averageZ, minZ, z: [top, right, left, bottom], normals: [[x, y, z] × 4] } or null if not loaded
+     */
+    getTile(x, y) {
+        const found = this.regionAt(x, y);
+        if (!found) return null;
+        const { region, index } = found;
+        const base = index * 4 * VERTEX_SIZE;
+        const z = [];
+        const normals = [];
+        for (let v = 0; v < 4; v++) {
+            const offset = base + v * VERTEX_SIZE;
+            z.push(region.vertices[offset]);
+            normals.push([
+                region.vertices[offset + 1] / 127,
+                region.vertices[offset + 2] / 127,
+                region.vertices[offset + 3] / 127
+            ]);
+        }
+        return {
+            stretched: (region.tileFlags[index * TILE_RECORD_SIZE] & TILE_STRETCHED) !== 0,
+            averageZ: region.tileZ[index * TILE_RECORD_SIZE + 1],
+            minZ: region.tileZ[index * TILE_RECORD_SIZE + 2],
+            z,
+            normals
+        };
+    }
+
+    /**
+     * Corner heights of a window in the shape WebGLTerrainRenderer.render() takes
+     * (height + 1 rows of width + 1 corners; corner (x, y) is the Z of tile (x, y))
+     * @returns {Array} 2D array, 0 where the region is not loaded
+     */
+    getCornerHeights(startX, startY, width, height) {
+        const corners = [];
+        for (let y = 0; y <= height; y++) {
+            const row = new Array(width + 1).fill(0);
+            for (let x = 0; x <= width; x++) {
+                const tileX = Math.min(startX + x, this.mapWidth - 1);
+                const tileY = Math.min(startY + y, this.mapHeight - 1);
+                const found = this.regionAt(tileX, tileY);
+                // The TOP vertex always carries the tile's own Z
+                if (found) row[x] = found.region.vertices[found.index * 4 * VERTEX_SIZE];
+            }
+            corners.push(row);
+        }
+        return corners;
+    }
+}
+
+export default TerrainMeshStreamer;
@@ -1,6 +1,9 @@
+import { ShardPackLoader } from './shardPackLoader.js';
+
 /**
  * UO Art Loader
- * Loads static object graphics from artLegacyMUL.uop or art.mul
+ * Loads static object graphics from artLegacyMUL.uop, art.mul or a shard pack
+ * built by pack_shards.py (fetches only the art IDs that are requested)
  * 
  * UOP Format: Modern compressed container format
  * Art Format: 16-bit color graphics with run-length encoding
@@ -14,6 +17,21 @@ export class UOArtLoader {
         this.fileTable = null;
         this.textureCache = new Map();
         this.isUOP = false;
+        this.pack = null;
+    }
+
+    /**
+     * Load art from a shard pack (e.g. 'assets/packs/art')
+     * Only the index is downloaded up front; entries are fetched on demand.
+     */
+    async loadFromShardPack(basePath) {
+        console.log(`[UOArtLoader] Loading art shard pack: ${basePath}`);
+        const pack = new ShardPackLoader(basePath);
+        if (!await pack.load()) {
+            return false;
+        }
+        this.pack = pack;
+        return true;
     }
 
     /**
@@ -167,7 +185,14 @@ export class UOArtLoader {
         
         console.log(`[UOArtLoader] Looking up graphic ${graphicId} → file index ${fileIndex}`);
         
-        const texture = await this.extractArt(fileIndex);
+        let texture;
+        if (this.pack) {
+            // Pack entries are stored decompressed
+            const data = await this.pack.getEntry(fileIndex);
+            texture = data ? this.parseArtData(data) : null;
+        } else {
+            texture = await this.extractArt(fileIndex);
+        }
         if (texture) {
             console.log(`[UOArtLoader] ✅ Got texture for graphic ${graphicId}`);
             this.textureCache.set(graphicId, texture);
@@ -446,6 +471,10 @@ export class UOArtLoader {
      */
     async preloadTextures(graphicIds) {
         const results = {};
+        if (this.pack) {
+            // Fetch all missing entries in as few range requests as possible
+            await this.pack.getEntries(Array.from(graphicIds).filter(id => !this.textureCache.has(id)).map(id => 0x4000 + id));
+        }
         for (const id of graphicIds) {
             const tex = await this.getStaticTexture(id);
             if (tex) {
@@ -1,3 +1,5 @@
+import { ShardPackLoader } from './shardPackLoader.js';
+
 /**
  * UO Map Loader - Reads map#.mul files and extracts terrain data
  * 
@@ -10,6 +12,9 @@
  * Map dimensions:
  * - map0 (Britannia): 7168 × 4096 tiles
  * - Organized in blocks of 8×8 tiles
+ *
+ * Instead of the whole file, a shard pack (pack_shards.py map #) can be used:
+ * loadRegion() fetches just the blocks in view, getTileAt() reads from them.
  */
 
 export class UOMapLoader {
@@ -19,6 +24,81 @@ export class UOMapLoader {
         this.mapHeight = 0;
         this.blockSize = 196; // 4 bytes header + 64 tiles × 3 bytes
         this.tilesPerBlock = 8;
+        this.pack = null;
+        this.blocks = new Map(); // blockIndex -> Uint8Array (shard pack mode)
+    }
+
+    /**
+     * Use a map shard pack instead of the whole map file
+     * @param {string} basePath - Pack directory (e.g., 'assets/packs/map0')
+     * @param {number} mapWidth - Map width in tiles
+     * @param {number} mapHeight - Map height in tiles
+     * @returns {Promise<boolean>} Success status
+     */
+    async loadMapPack(basePath, mapWidth = 7168, mapHeight = 4096) {
+        const pack = new ShardPackLoader(basePath);
+        if (!await pack.load()) {
+            return false;
+        }
+        if (pack.recordSize !== this.blockSize) {
+            console.error(`[UOMapLoader] ${basePath} is not a map block pack`);
+            return false;
+        }
+        this.pack = pack;
+        this.mapData = null;
+        this.blocks.clear();
+        this.mapWidth = mapWidth;
+        this.mapHeight = mapHeight;
+        return true;
+    }
+
+    /**
+     * Fetch the blocks covering a tile rectangle (shard pack mode)
+     * Blocks outside the rectangle are kept until evictOutside() drops them.
+     * @returns {Promise<number>} Number of blocks fetched
+     */
+    async loadRegion(startX, startY, width, height) {
+        if (!this.pack) return 0;
+
+        const blocksPerColumn = Math.ceil(this.mapHeight / this.tilesPerBlock);
+        const x0 = Math.max(0, Math.floor(startX / this.tilesPerBlock));
+        const y0 = Math.max(0, Math.floor(startY / this.tilesPerBlock));
+        const x1 = Math.min(Math.ceil(this.mapWidth / this.tilesPerBlock), Math.ceil((startX + width) / this.tilesPerBlock));
+        const y1 = Math.min(blocksPerColumn, Math.ceil((startY + height) / this.tilesPerBlock));
+
+        // Column-major order keeps each column's blocks contiguous in the pack
+        const wanted = [];
+        for (let bx = x0; bx < x1; bx++) {
+            for (let by = y0; by < y1; by++) {
+                const blockIndex = bx * blocksPerColumn + by;
+                if (!this.blocks.has(blockIndex)) wanted.push(blockIndex);
+            }
+        }
+        if (wanted.length === 0) return 0;
+
+        const fetched = await this.pack.getEntries(wanted);
+        for (const [blockIndex, data] of fetched) {
+            this.blocks.set(blockIndex, data);
+        }
+        return fetched.size;
+    }
+
+    /**
+     * Drop loaded blocks outside a tile rectangle (shard pack mode)
+     */
+    evictOutside(startX, startY, width, height) {
+        const blocksPerColumn = Math.ceil(this.mapHeight / this.tilesPerBlock);
+        const x0 = Math.floor(startX / this.tilesPerBlock), x1 = Math.ceil((startX + width) / this.tilesPerBlock);
+        const y0 = Math.floor(startY / this.tilesPerBlock), y1 = Math.ceil((startY + height) / this.tilesPerBlock);
+        const evicted = [];
+        for (const blockIndex of this.blocks.keys()) {
+            const bx = Math.floor(blockIndex / blocksPerColumn);
+            const by = blockIndex % blocksPerColumn;
+            if (bx < x0 || bx >= x1 || by < y0 || by >= y1) evicted.push(blockIndex);
+        }
+        for (const blockIndex of evicted) this.blocks.delete(blockIndex);
+        this.pack?.evict(evicted);
+        return evicted.length;
     }
 
     /**
@@ -70,6 +150,9 @@ export class UOMapLoader {
      * @returns {Object|null} { tileId: number, z: number } or null if out of bounds
      */
     getTileAt(x, y) {
+        if (this.pack) {
+            return this.getPackedTileAt(x, y);
+        }
         if (!this.mapData || x < 0 || x >= this.mapWidth || y < 0 || y >= this.mapHeight) {
             return null;
         }
@@ -129,6 +212,31 @@ export class UOMapLoader {
         };
     }
 
+    /**
+     * getTileAt() for shard pack mode; null until the block is loaded by loadRegion()
+     */
+    getPackedTileAt(x, y) {
+        if (x < 0 || x >= this.mapWidth || y < 0 || y >= this.mapHeight) {
+            return null;
+        }
+        const blocksPerColumn = Math.ceil(this.mapHeight / this.tilesPerBlock);
+        const blockIndex = Math.floor(x / this.tilesPerBlock) * blocksPerColumn + Math.floor(y / this.tilesPerBlock);
+        const block = this.blocks.get(blockIndex);
+        if (!block) {
+            return null;
+        }
+
+        const tileOffset = 4 + ((y % this.tilesPerBlock) * this.tilesPerBlock + (x % this.tilesPerBlock)) * 3;
+        const tileId = block[tileOffset] | (block[tileOffset + 1] << 8);
+        const zByte = block[tileOffset + 2];
+        return {
+            tileId: tileId,
+            z: zByte > 127 ? zByte - 256 : zByte,
+            zRaw: zByte,
+            hexId: `0x${tileId.toString(16).toUpperCase().padStart(4, '0')}`
+        };
+    }
+
     /**
      * Extract a region of the map
      * @param {number} startX - Starting X coordinate
@@ -178,8 +286,8 @@ export class UOMapLoader {
         return {
             width: this.mapWidth,
             height: this.mapHeight,
-            loaded: this.mapData !== null,
-            dataSize: this.mapData ? this.mapData.length : 0
+            loaded: this.mapData !== null || this.pack !== null,
+            dataSize: this.mapData ? this.mapData.length : this.blocks.size * this.blockSize
         };
     }
 }
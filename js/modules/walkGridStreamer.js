@@ -0,0 +1,107 @@
+/**
+ * Walk Grid Streamer
+ * Streams the standable Z levels baked by walk_grid.py around the camera, so
+ * movement validation and pathfinding are array lookups instead of scans over
+ * every static on a tile. Region loading and eviction are shared with
+ * MapRegionStreamer (same index.json layout).
+ *
+ * Region file format (little-endian):
+ * - 'UOWK', u16 version, u16 regionX, u16 regionY, u16 width, u16 height, u16 reserved, u32 levelCount
+ * - u8 counts[height * width] (row-major, 0 = impassable)
+ * - i8 levelZ[levelCount], u8 levelFlags[levelCount] (per tile, lowest level first)
+ */
+
+import { MapRegionStreamer } from './mapRegionStreamer.js';
+
+const WALK_MAGIC = 0x4B574F55; // 'UOWK'
+const WALK_HEADER_SIZE = 20;
+
+export const LEVEL_FLAGS = {
+    LAND: 0x01,
+    SURFACE: 0x02,
+    BRIDGE: 0x04,
+    WET: 0x08
+};
+
+export class WalkGridStreamer extends MapRegionStreamer {
+    /**
+     * @param {string} basePath - Walk grid directory (e.g., 'assets/walkgrid/map0')
+     * @param {Object} options - { loadRadius, evictRadius, stepHeight }
+     */
+    constructor(basePath, options = {}) {
+        super(basePath, options);
+        // The server climbs 2 units from the top of the tile it stands on; the
+        // grid only keeps averaged land Z, so allow more for slopes
+        this.stepHeight = options.stepHeight ?? 8;
+    }
+
+    parseRegion(buffer) {
+        const view = new DataView(buffer);
+        if (view.getUint32(0, true) !== WALK_MAGIC) {
+            throw new Error('Invalid walk grid region');
+        }
+        const width = view.getUint16(10, true);
+        const height = view.getUint16(12, true);
+        const levelCount = view.getUint32(16, true);
+        const count = width * height;
+        const counts = new Uint8Array(buffer, WALK_HEADER_SIZE, count);
+
+        // Prefix sums turn a tile index into its first level
+        const offsets = new Uint32Array(count + 1);
+        for (let i = 0; i < count; i++) {
+            offsets[i + 1] = offsets[i] + counts[i];
+        }
+        return {
+            width,
+            height,
+            counts,
+            offsets,
+            levelZ: new Int8Array(buffer, WALK_HEADER_SIZE + count, levelCount),
+            levelFlags: new Uint8Array(buffer, WALK_HEADER_SIZE + count + levelCount, levelCount)
+        };
+    }
+
+    /**
+     * Standable levels of a tile
+     * @returns {Array|null} [{ z, flags }] lowest first, [] if impassable, null if not loaded
+     */
+    getLevels(x, y) {
+        if (!this.directory || x < 0 || x >= this.mapWidth || y < 0 || y >= this.mapHeight) {
+            return null;
+        }
+        const rx = Math.floor(x / this.regionSize);
+        const ry = Math.floor(y / this.regionSize);
+        const region = this.regions.get(`${rx},${ry}`);
+        if (!region) return null;
+
+        const index = (y - ry * this.regionSize) * region.width + (x - rx * this.regionSize);
+        const levels = [];
+        for (let i = region.offsets[index]; i < region.offsets[index + 1]; i++) {
+            levels.push({ z: region.levelZ[i], flags: region.levelFlags[i] });
+        }
+        return levels;
+    }
+
+    /**
+     * Z a mobile at currentZ would stand at after stepping onto (x, y): the
+     * highest level at most stepHeight above currentZ (levels below are drops)
+     * @returns {number|null} New Z, or null if the tile cannot be entered
+     */
+    getStandZ(x, y, currentZ) {
+        const levels = this.getLevels(x, y);
+        if (!levels || levels.length === 0) return null;
+
+        let best = null;
+        for (const level of levels) {
+            if (level.z <= currentZ + this.stepHeight) best = level.z;
+        }
+        return best;
+    }
+
+    isPassable(x, y) {
+        const levels = this.getLevels(x, y);
+        return levels !== null && levels.length > 0;
+    }
+}
+
+export default WalkGridStreamer;
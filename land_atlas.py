@@ -0,0 +1,177 @@
+"""
+Land Tile Atlas Builder
+Decodes the 44×44 land tiles straight from art.mul / artLegacyMUL.uop and
+packs them into a few atlas PNGs with a UV manifest. This replaces the
+UOFiddler "Export to BMP" + rename_tiles_to_hex.py round trip, and the client
+(js/modules/landAtlasLoader.js) loads a handful of images instead of one
+request per tile.
+
+Run: python land_atlas.py [--maps 0,1,...] [--atlas-size N] [--size WIDTHxHEIGHT] [--no-cache]
+Output: assets/tiles/atlas/land_#.png + land_atlas.json
+
+--maps keeps only the land IDs that appear on those facets (assets/mul,
+mapdif/verdata patches included); by default every land tile with art is packed.
+Decoded tiles go through the shared asset_cache.py cache unless --no-cache is
+given.
+
+Atlas layout: tiles sit in a grid of (44 + 2 * PADDING) pixel cells, left to
+right, top to bottom, in land ID order; the transparent gutter keeps linear
+filtering from bleeding between neighbours.
+
+land_atlas.json:
+    {
+      "version": 1, "tileSize": 44, "padding": 1, "atlasSize": 2048,
+      "atlases": ["land_0.png", ...],
+      "tiles": {"0x0003": [atlas, x, y], ...}    top-left pixel of the 44×44 tile
+    }
+"""
+
+from pathlib import Path
+import json
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from art_decoder import (DECODER_VERSION, LAND_ENTRY_SIZE, LAND_TILE_SIZE, UO_PATH, art_entries,
+                         decode_land_tiles, entry_sizes, open_art_archive)
+from asset_cache import AssetCache, read_entries
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+
+MUL_PATH = Path('assets/mul')
+ATLAS_PATH = Path('assets/tiles/atlas')
+
+ATLAS_VERSION = 1
+LAND_TILE_COUNT = 0x4000
+PADDING = 1
+DEFAULT_ATLAS_SIZE = 2048
+
+
+def used_land_ids(map_nums, map_size=None):
+    """Sorted land IDs that appear on any of the facets"""
+    used = np.zeros(LAND_TILE_COUNT, dtype=bool)
+    for map_num in map_nums:
+        map_file = MUL_PATH / f"map{map_num}.mul"
+        if not map_file.exists():
+            print(f"  ⚠️ {map_file} not found, skipped")
+            continue
+        width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+        patches = MapPatches.load(MUL_PATH, map_num, width, height)
+        with MapArray(map_file, width, height, patches) as facet:
+            ids = facet.tile_ids.materialize().reshape(-1)
+        used |= np.bincount(ids[ids < LAND_TILE_COUNT], minlength=LAND_TILE_COUNT) > 0
+    return np.flatnonzero(used)
+
+
+def decode_tiles(archive, entries, cache=None):
+    """(count, 44, 44, 4) RGBA of land tile entries, through an AssetCache if given"""
+    if cache is None:
+        return decode_land_tiles(read_entries(archive, entries))
+    tiles = cache.get_or_decode_many(archive, entries, 'land_tile', DECODER_VERSION, decode_land_tiles)
+    return np.array(tiles, dtype=np.uint8).reshape(-1, LAND_TILE_SIZE, LAND_TILE_SIZE, 4)
+
+
+def build_atlas(map_nums=None, atlas_size=DEFAULT_ATLAS_SIZE, map_size=None, cache=None):
+    """Write the land atlases and land_atlas.json (tiles decoded through an AssetCache if given)"""
+    cell = LAND_TILE_SIZE + 2 * PADDING
+    columns = atlas_size // cell
+    per_atlas = columns * columns
+    if per_atlas == 0:
+        raise ValueError(f"Atlas size {atlas_size} is smaller than one {cell}px cell")
+
+    candidates = used_land_ids(map_nums, map_size) if map_nums else np.arange(LAND_TILE_COUNT)
+    archive = open_art_archive()
+    if archive is None:
+        print(f"  ⚠️ No artLegacyMUL.uop or art.mul in {UO_PATH}, art left out")
+        tile_ids = entries = np.zeros(0, dtype=np.int64)
+    else:
+        entries = art_entries(archive, candidates)
+        present = entry_sizes(archive, entries) >= LAND_ENTRY_SIZE
+        tile_ids, entries = candidates[present], entries[present]
+    print(f"  {len(tile_ids)} land tiles with art out of {len(candidates)} candidates")
+    try:
+        return _write_atlases(archive, tile_ids, entries, atlas_size, cache)
+    finally:
+        if archive is not None:
+            archive.close()
+
+
+def _write_atlases(archive, tile_ids, entries, atlas_size, cache):
+    cell = LAND_TILE_SIZE + 2 * PADDING
+    columns = atlas_size // cell
+    per_atlas = columns * columns
+
+    ATLAS_PATH.mkdir(parents=True, exist_ok=True)
+    for old in ATLAS_PATH.glob('land_*.png'):
+        old.unlink()
+
+    manifest = {
+        'version': ATLAS_VERSION,
+        'tileSize': LAND_TILE_SIZE,
+        'padding': PADDING,
+        'atlasSize': atlas_size,
+        'atlases': [],
+        'tiles': {},
+    }
+    for atlas_num, start in enumerate(range(0, len(tile_ids), per_atlas)):
+        batch = tile_ids[start:start + per_atlas]
+        tiles = decode_tiles(archive, entries[start:start + per_atlas], cache)
+        rows = -(-len(batch) // columns)
+
+        # Scatter the tiles into the cell grid in one assignment
+        grid = np.zeros((rows * columns, cell, cell, 4), dtype=np.uint8)
+        grid[:len(batch), PADDING:PADDING + LAND_TILE_SIZE, PADDING:PADDING + LAND_TILE_SIZE] = tiles
+        atlas = grid.reshape(rows, columns, cell, cell, 4).transpose(0, 2, 1, 3, 4) \
+            .reshape(rows * cell, columns * cell, 4)
+
+        name = f"land_{atlas_num}.png"
+        Image.fromarray(np.ascontiguousarray(atlas), 'RGBA').save(ATLAS_PATH / name)
+        manifest['atlases'].append(name)
+        slots = np.arange(len(batch))
+        xs = (slots % columns) * cell + PADDING
+        ys = (slots // columns) * cell + PADDING
+        for tile_id, x, y in zip(batch.tolist(), xs.tolist(), ys.tolist()):
+            manifest['tiles'][f"0x{tile_id:04X}"] = [atlas_num, x, y]
+        print(f"  {name}: {len(batch)} tiles, {atlas.shape[1]}×{atlas.shape[0]}", end='\r')
+
+    with open(ATLAS_PATH / 'land_atlas.json', 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def main():
+    args = sys.argv[1:]
+    map_nums = None
+    if '--maps' in args:
+        i = args.index('--maps')
+        map_nums = [int(v) for v in args[i + 1].split(',')]
+        del args[i:i + 2]
+    atlas_size = DEFAULT_ATLAS_SIZE
+    if '--atlas-size' in args:
+        i = args.index('--atlas-size')
+        atlas_size = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
+
+    print(f"Building land tile atlas{f' for maps {map_nums}' if map_nums else ''} -> {ATLAS_PATH}")
+    started = time.time()
+    cache = AssetCache() if use_cache else None
+    manifest = build_atlas(map_nums, atlas_size, map_size, cache)
+    total = sum((ATLAS_PATH / name).stat().st_size for name in manifest['atlases'])
+    print(f"\n✅ {len(manifest['tiles'])} tiles in {len(manifest['atlases'])} atlas(es), "
+          f"{total / 1024 / 1024:.1f} MB in {time.time() - started:.1f}s")
+    if cache is not None:
+        print(f"   {cache.report()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+NumPy view of map#.mul
+Memory-maps a map file as a (blocks x, blocks y) array of 196-byte blocks with
+a structured dtype and exposes the terrain as tile-ID and Z rasters indexed
+[y, x]. Only the blocks a query touches are paged in.
+
+Usage:
+    with MapArray('assets/mul/map0.mul') as facet:
+        tile_id = facet.tile_ids[1500, 1000]          # y, x
+        ids, z = facet.region(1000, 1500, 64, 64)      # x, y, width, height
+        heights = facet.z[1400:1600, 900:1100]
+"""
+
+from pathlib import Path
+import re
+
+import numpy as np
+
+# One land tile: graphic ID + signed altitude (3 bytes, packed)
+MAP_CELL_DTYPE = np.dtype([
+    ('id', '<u2'),
+    ('z', 'i1'),
+])
+
+# One 196-byte block: 4-byte header + 8×8 tiles stored row-major
+MAP_BLOCK_DTYPE = np.dtype([
+    ('header', '<u4'),
+    ('cells', MAP_CELL_DTYPE, (8, 8)),
+])
+
+# Known facet sizes in tiles
+MAP_SIZES = {
+    0: (7168, 4096),
+    1: (7168, 4096),
+    2: (2304, 1600),
+    3: (2560, 2048),
+    4: (1448, 1448),
+    5: (1280, 4096),
+}
+
+
+def _block_range(index, size):
+    """Normalize one raster axis index to (block start, block stop, local index)"""
+    if isinstance(index, slice):
+        indices = range(*index.indices(size))
+        if not indices:
+            return 0, 0, slice(0, 0)
+        low, high = min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1
+        b0 = low // 8
+        if indices.step == 1:
+            return b0, -(-high // 8), slice(low - b0 * 8, high - b0 * 8)
+        return b0, -(-high // 8), np.asarray(indices) - b0 * 8
+
+    index = int(index)
+    if index < 0:
+        index += size
+    if not 0 <= index < size:
+        raise IndexError(f"index {index} out of range for size {size}")
+    return index // 8, index // 8 + 1, index % 8
+
+
+class MapRaster:
+    """Lazy [y, x] raster over one field of a MapArray.
+
+    Indexing with ints and slices reads only the covered blocks; the 4-D
+    zero-copy view (block y, tile y, block x, tile x) is in `blocks`.
+    """
+
+    def __init__(self, map_array, field):
+        self.map_array = map_array
+        self.field = field
+        self.blocks = map_array.blocks['cells'][field].transpose(1, 2, 0, 3)
+        self.shape = (map_array.height, map_array.width)
+        self.dtype = self.blocks.dtype
+
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key, slice(None))
+        if len(key) != 2:
+            raise IndexError("MapRaster takes [y, x]")
+        by0, by1, local_y = _block_range(key[0], self.shape[0])
+        bx0, bx1, local_x = _block_range(key[1], self.shape[1])
+
+        window = self.blocks[by0:by1, :, bx0:bx1, :]
+        patches = self.map_array.patches
+        if patches is not None and (patches.land_override[bx0:bx1, by0:by1] >= 0).any():
+            cells = self.map_array.blocks['cells'][bx0:bx1, by0:by1].copy()
+            window = patches.patch_cells(cells, bx0, by0)[self.field].transpose(1, 2, 0, 3)
+        window = np.asarray(window).reshape((by1 - by0) * 8, (bx1 - bx0) * 8)
+        # Index the axes one at a time so array indices act as an outer product
+        return window[:, local_x][local_y]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self[:, :]
+        return data if dtype is None else data.astype(dtype)
+
+    def materialize(self):
+        """Whole facet as a contiguous [y, x] array"""
+        return self[:, :]
+
+
+class MapArray:
+    """Memory-mapped map#.mul with [y, x] tile-ID and Z rasters.
+
+    With a map_patches.MapPatches, reads return the patched blocks (`blocks`
+    itself stays the raw file); without one, reads never consult it.
+    """
+
+    def __init__(self, filepath, width=None, height=None, patches=None):
+        self.filepath = Path(filepath)
+        self.patches = patches
+        if width is None or height is None:
+            match = re.search(r'map(\d+)', self.filepath.name.lower())
+            map_num = int(match.group(1)) if match else 0
+            width, height = MAP_SIZES.get(map_num, MAP_SIZES[0])
+        self.width = width
+        self.height = height
+        self.blocks_x = width // 8
+        self.blocks_y = height // 8
+
+        expected = self.blocks_x * self.blocks_y * MAP_BLOCK_DTYPE.itemsize
+        size = self.filepath.stat().st_size
+        if size < expected:
+            raise ValueError(f"{self.filepath} is {size} bytes, expected {expected} for {width}×{height}")
+
+        # Blocks are stored column-major: block (bx, by) is record bx * blocks_y + by
+        self.blocks = np.memmap(self.filepath, dtype=MAP_BLOCK_DTYPE, mode='r',
+                                shape=(self.blocks_x, self.blocks_y))
+        self.tile_ids = MapRaster(self, 'id')
+        self.z = MapRaster(self, 'z')
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Drop the mapping (views handed out earlier keep it alive)"""
+        self.blocks = None
+        self.tile_ids = None
+        self.z = None
+
+    def block(self, bx, by):
+        """(8, 8) cell array of one block, indexed [tile y, tile x]"""
+        if self.patches is not None:
+            row = self.patches.land_override[bx, by]
+            if row >= 0:
+                return self.patches.land_blocks['cells'][row]
+        return self.blocks['cells'][bx, by]
+
+    def tile(self, x, y):
+        """(tile_id, z) of one tile"""
+        cell = self.block(x // 8, y // 8)[y % 8, x % 8]
+        return int(cell['id']), int(cell['z'])
+
+    def region(self, x, y, width, height):
+        """(tile_ids, z) rasters of a rectangle, clipped to the facet"""
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + width), min(self.height, y + height)
+        if x1 <= x0 or y1 <= y0:
+            empty = np.zeros((0, 0), dtype=np.uint16)
+            return empty, empty.astype(np.int8)
+
+        by0, by1 = y0 // 8, -(-y1 // 8)
+        bx0, bx1 = x0 // 8, -(-x1 // 8)
+        cells = self.blocks['cells'][bx0:bx1, by0:by1]
+        if self.patches is not None and (self.patches.land_override[bx0:bx1, by0:by1] >= 0).any():
+            cells = self.patches.patch_cells(cells.copy(), bx0, by0)
+        # (bx, by, ty, tx) -> (by, ty, bx, tx) -> (height, width), one copy
+        cells = np.ascontiguousarray(cells.transpose(1, 2, 0, 3))
+        cells = cells.reshape((by1 - by0) * 8, (bx1 - bx0) * 8)
+        cells = cells[y0 - by0 * 8:y1 - by0 * 8, x0 - bx0 * 8:x1 - bx0 * 8]
+        return np.ascontiguousarray(cells['id']), np.ascontiguousarray(cells['z'])
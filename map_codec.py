@@ -0,0 +1,304 @@
+"""
+Compact Map Encoding
+Re-encodes map#.mul into independently compressed regions with tile IDs and
+Z in separate columns, several times smaller than the raw 196-byte blocks,
+for shipping facets to browsers.
+
+Per region (32×32 blocks = 256×256 tiles by default, the map_tiler.py grid):
+    - tile IDs: a palette of the region's distinct IDs, then the row-major
+      palette indices run-length coded (run values and run lengths as
+      separate columns)
+    - Z: delta-coded against the left neighbour (first column: against the
+      tile above), wrapping int8, so flat and sloped ground is mostly 0 / ±1
+    - the columns are framed with zlib (default) or lzma
+A region index gives the byte range of every region, so any block is one
+seek plus one region decode.
+
+Run: python map_codec.py [map_number] [--region-blocks N] [--codec zlib|lzma] [--size WIDTHxHEIGHT] [--benchmark]
+Output: assets/compact/map#.uomc
+
+File format (little-endian):
+    char[4]  magic 'UOMC'
+    uint16   version, uint16 map number
+    uint32   width, height (tiles)
+    uint16   region size (tiles), uint16 codec (1 = zlib, 2 = lzma)
+    uint16   columns, rows (regions)
+    uint32   region_offsets[columns * rows + 1]   region r = ry * columns + rx
+    frames   one compressed payload per region:
+        uint16 palette count, uint8 index width (1 or 2 bytes), uint8 reserved, uint32 run count
+        uint16 palette[palette count]
+        index  run_values[run count]      palette indices
+        uint16 run_lengths[run count]     length - 1
+        int8   z_deltas[height][width]
+"""
+
+from pathlib import Path
+import lzma
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+
+MUL_PATH = Path('assets/mul')
+COMPACT_PATH = Path('assets/compact')
+
+CODEC_MAGIC = b'UOMC'
+CODEC_VERSION = 1
+CODEC_HEADER = struct.Struct('<4sHHIIHHHH')
+FRAME_HEADER = struct.Struct('<HBBI')
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+CODECS = {'zlib': CODEC_ZLIB, 'lzma': CODEC_LZMA}
+DEFAULT_REGION_BLOCKS = 32
+MAX_RUN = 0x10000  # Run lengths are stored as u16 length - 1
+MAP_BLOCK_SIZE = 196
+
+
+def delta_encode_z(z):
+    """Wrapping int8 deltas: left neighbour, first column against the tile above"""
+    z = z.astype(np.int16)
+    deltas = np.empty_like(z)
+    deltas[:, 1:] = z[:, 1:] - z[:, :-1]
+    deltas[1:, 0] = z[1:, 0] - z[:-1, 0]
+    deltas[0, 0] = z[0, 0]
+    return deltas.astype(np.int8)
+
+
+def delta_decode_z(deltas):
+    """Inverse of delta_encode_z (cumulative sums wrap back into int8)"""
+    sums = deltas.astype(np.int64)
+    sums[:, 0] = np.cumsum(sums[:, 0])
+    return np.cumsum(sums, axis=1).astype(np.int8)
+
+
+def run_length_encode(values):
+    """(run values, run lengths) of a 1-D array, runs capped at MAX_RUN"""
+    if len(values) == 0:
+        return values[:0], np.zeros(0, dtype=np.int64)
+    # Cut where the value changes and every MAX_RUN elements inside long runs
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]])
+    lengths = np.diff(np.r_[starts, len(values)])
+    pieces = -(-lengths // MAX_RUN)
+    if (pieces > 1).any():
+        starts = np.repeat(starts, pieces) + \
+            (np.arange(pieces.sum()) - np.repeat(np.cumsum(pieces) - pieces, pieces)) * MAX_RUN
+        lengths = np.diff(np.r_[starts, len(values)])
+    return values[starts], lengths
+
+
+def encode_region(tile_ids, z, codec=CODEC_ZLIB):
+    """Compressed frame of one region"""
+    palette, indices = np.unique(tile_ids.reshape(-1), return_inverse=True)
+    index_dtype = '<u1' if len(palette) <= 0x100 else '<u2'
+    run_values, run_lengths = run_length_encode(indices)
+    payload = b''.join([
+        FRAME_HEADER.pack(len(palette), np.dtype(index_dtype).itemsize, 0, len(run_values)),
+        palette.astype('<u2').tobytes(),
+        run_values.astype(index_dtype).tobytes(),
+        (run_lengths - 1).astype('<u2').tobytes(),
+        delta_encode_z(z).tobytes(),
+    ])
+    return zlib.compress(payload, 9) if codec == CODEC_ZLIB else lzma.compress(payload, preset=6)
+
+
+def decode_region(frame, width, height, codec=CODEC_ZLIB):
+    """(tile_ids, z) [y, x] rasters of one compressed frame"""
+    payload = zlib.decompress(frame) if codec == CODEC_ZLIB else lzma.decompress(frame)
+    palette_count, index_width, _, run_count = FRAME_HEADER.unpack_from(payload)
+    offset = FRAME_HEADER.size
+    palette = np.frombuffer(payload, dtype='<u2', count=palette_count, offset=offset)
+    offset += palette.nbytes
+    run_values = np.frombuffer(payload, dtype='<u1' if index_width == 1 else '<u2',
+                               count=run_count, offset=offset)
+    offset += run_values.nbytes
+    run_lengths = np.frombuffer(payload, dtype='<u2', count=run_count, offset=offset).astype(np.int64) + 1
+    offset += run_lengths.size * 2
+    deltas = np.frombuffer(payload, dtype=np.int8, count=width * height, offset=offset)
+
+    tile_ids = np.repeat(palette[run_values], run_lengths).reshape(height, width)
+    return tile_ids, delta_decode_z(deltas.reshape(height, width))
+
+
+class CompactMap:
+    """Random access reader of a .uomc file (regions are decoded on demand)"""
+
+    def __init__(self, path):
+        self.filepath = Path(path)
+        with open(self.filepath, 'rb') as f:
+            magic, version, self.map_num, self.width, self.height, self.region_size, self.codec, \
+                self.columns, self.rows = CODEC_HEADER.unpack(f.read(CODEC_HEADER.size))
+            if magic != CODEC_MAGIC or version != CODEC_VERSION:
+                raise ValueError(f"Not a compact map: {path}")
+            self.region_offsets = np.fromfile(f, dtype='<u4', count=self.columns * self.rows + 1)
+            self.data_start = f.tell()
+        self._cached_key = None
+        self._cached = None
+
+    def region_shape(self, rx, ry):
+        """(height, width) of a region; edge regions may be smaller"""
+        return (min(self.region_size, self.height - ry * self.region_size),
+                min(self.region_size, self.width - rx * self.region_size))
+
+    def read_frame(self, rx, ry):
+        r = ry * self.columns + rx
+        start, end = int(self.region_offsets[r]), int(self.region_offsets[r + 1])
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.data_start + start)
+            return f.read(end - start)
+
+    def region(self, rx, ry):
+        """(tile_ids, z) of one region; the last decoded region is kept"""
+        if self._cached_key != (rx, ry):
+            height, width = self.region_shape(rx, ry)
+            self._cached = decode_region(self.read_frame(rx, ry), width, height, self.codec)
+            self._cached_key = (rx, ry)
+        return self._cached
+
+    def block(self, bx, by):
+        """(tile_ids, z) (8, 8) arrays of one block, indexed [tile y, tile x]"""
+        blocks_per_region = self.region_size // 8
+        tile_ids, z = self.region(bx // blocks_per_region, by // blocks_per_region)
+        x0, y0 = (bx % blocks_per_region) * 8, (by % blocks_per_region) * 8
+        return tile_ids[y0:y0 + 8, x0:x0 + 8], z[y0:y0 + 8, x0:x0 + 8]
+
+    def tile(self, x, y):
+        """(tile_id, z) of one tile"""
+        tile_ids, z = self.block(x // 8, y // 8)
+        return int(tile_ids[y % 8, x % 8]), int(z[y % 8, x % 8])
+
+
+def encode_map(map_num, region_blocks=DEFAULT_REGION_BLOCKS, codec=CODEC_ZLIB, map_size=None):
+    """Write assets/compact/map#.uomc; returns its path"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    if not map_file.exists():
+        raise FileNotFoundError(f"{map_file} not found (convert the UOP first)")
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    patches = MapPatches.load(MUL_PATH, map_num, map_width, map_height)
+    facet = MapArray(map_file, map_width, map_height, patches)
+
+    region_size = region_blocks * 8
+    columns = -(-facet.blocks_x // region_blocks)
+    rows = -(-facet.blocks_y // region_blocks)
+    codec_name = next(name for name, value in CODECS.items() if value == codec)
+    print(f"Encoding {map_file} ({map_width}×{map_height}) as {columns}×{rows} {codec_name} regions "
+          f"of {region_size}×{region_size} tiles")
+
+    frames = []
+    for ry in range(rows):
+        for rx in range(columns):
+            tile_ids, z = facet.region(rx * region_size, ry * region_size, region_size, region_size)
+            frames.append(encode_region(tile_ids, z, codec))
+        print(f"  Row {ry + 1}/{rows}", end='\r')
+    print()
+    facet.close()
+
+    COMPACT_PATH.mkdir(parents=True, exist_ok=True)
+    output_file = COMPACT_PATH / f"map{map_num}.uomc"
+    offsets = np.zeros(len(frames) + 1, dtype='<u4')
+    np.cumsum([len(frame) for frame in frames], out=offsets[1:])
+    with open(output_file, 'wb') as f:
+        f.write(CODEC_HEADER.pack(CODEC_MAGIC, CODEC_VERSION, map_num, map_width, map_height,
+                                  region_size, codec, columns, rows))
+        f.write(offsets.tobytes())
+        for frame in frames:
+            f.write(frame)
+
+    raw_size = facet.blocks_x * facet.blocks_y * MAP_BLOCK_SIZE
+    size = output_file.stat().st_size
+    print(f"✅ {raw_size / 1024 / 1024:.1f} MB -> {size / 1024 / 1024:.2f} MB "
+          f"({raw_size / size:.1f}× smaller) -> {output_file}")
+    return output_file
+
+
+def benchmark(map_num, compact_file, map_size=None, samples=2000, seed=0):
+    """Size and decode speed against the raw MUL blocks (plain and zlib-framed per region)"""
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    compact = CompactMap(compact_file)
+    facet = MapArray(MUL_PATH / f"map{map_num}.mul", map_width, map_height,
+                     MapPatches.load(MUL_PATH, map_num, map_width, map_height))
+    size = compact.region_size
+
+    # Baseline: the same regions as raw 196-byte blocks, zlib-compressed per region
+    blocks_per_region = size // 8
+    raw_frames = []
+    for ry in range(compact.rows):
+        for rx in range(compact.columns):
+            blocks = facet.blocks[rx * blocks_per_region:(rx + 1) * blocks_per_region,
+                                  ry * blocks_per_region:(ry + 1) * blocks_per_region]
+            raw_frames.append(zlib.compress(np.ascontiguousarray(blocks).tobytes(), 9))
+    raw_size = facet.blocks.size * MAP_BLOCK_SIZE
+    raw_zlib_size = sum(len(frame) for frame in raw_frames)
+    compact_size = compact.filepath.stat().st_size
+
+    # Whole-facet decode, verifying every region against the MUL
+    decode_time = 0.0
+    mismatched = 0
+    for ry in range(compact.rows):
+        for rx in range(compact.columns):
+            compact._cached_key = None
+            started = time.perf_counter()
+            tile_ids, z = compact.region(rx, ry)
+            decode_time += time.perf_counter() - started
+            expected_ids, expected_z = facet.region(rx * size, ry * size, size, size)
+            mismatched += not (np.array_equal(tile_ids, expected_ids) and np.array_equal(z, expected_z))
+    started = time.perf_counter()
+    for frame in raw_frames:
+        zlib.decompress(frame)
+    raw_decode_time = time.perf_counter() - started
+
+    # Random block access: one region decode per access (no cache hits)
+    rng = np.random.default_rng(seed)
+    bx = rng.integers(0, facet.blocks_x, samples)
+    by = rng.integers(0, facet.blocks_y, samples)
+    started = time.perf_counter()
+    for x, y in zip(bx, by):
+        compact._cached_key = None
+        compact.block(int(x), int(y))
+    access_time = time.perf_counter() - started
+    facet.close()
+
+    region_count = compact.columns * compact.rows
+    print(f"{'✅' if not mismatched else '❌'} {region_count} regions decoded, {mismatched} mismatched")
+    print(f"   Raw MUL:          {raw_size / 1024 / 1024:8.2f} MB")
+    print(f"   MUL + zlib:       {raw_zlib_size / 1024 / 1024:8.2f} MB ({raw_size / raw_zlib_size:.1f}×), "
+          f"inflate {raw_decode_time * 1000 / region_count:.2f} ms/region")
+    print(f"   Compact:          {compact_size / 1024 / 1024:8.2f} MB ({raw_size / compact_size:.1f}×), "
+          f"decode {decode_time * 1000 / region_count:.2f} ms/region "
+          f"({raw_size / 1024 / 1024 / decode_time:.0f} MB/s of MUL)")
+    print(f"   Random block:     {access_time * 1e6 / samples:.0f} µs/access (uncached region decode)")
+
+
+def main():
+    args = sys.argv[1:]
+    region_blocks = DEFAULT_REGION_BLOCKS
+    if '--region-blocks' in args:
+        i = args.index('--region-blocks')
+        region_blocks = int(args[i + 1])
+        del args[i:i + 2]
+    codec = CODEC_ZLIB
+    if '--codec' in args:
+        i = args.index('--codec')
+        codec = CODECS[args[i + 1]]
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    run_benchmark = '--benchmark' in args
+    if run_benchmark:
+        args.remove('--benchmark')
+    map_num = int(args[0]) if args else 0
+
+    output_file = encode_map(map_num, region_blocks, codec, map_size)
+    if run_benchmark:
+        benchmark(map_num, output_file, map_size)
+
+
+if __name__ == '__main__':
+    main()
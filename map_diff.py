@@ -0,0 +1,279 @@
+"""
+Block-level Map Diff / Patch
+Compares two versions of map#.mul + staidx#.mul/statics#.mul block by block
+and writes a patch holding only the changed 8×8 blocks, so a client update
+re-ships a few regions instead of whole facets.
+
+Every block is reduced to a 64-bit hash in one vectorized pass per file
+(land cells word by word; statics record by record, order included), and
+blocks whose hashes differ are compared and exported.
+
+Run:
+    python map_diff.py OLD_MUL_DIR NEW_MUL_DIR [map_number] [--size WIDTHxHEIGHT] [--region-blocks N]
+    python map_diff.py --apply PATCH_FILE [MUL_DIR] [--output-dir DIR]
+Output: assets/patches/map#.patch.bin, plus the changed map_tiler.py regions on stdout
+
+Patch file (little-endian):
+    char[4]  magic 'UOPD'
+    uint16   version, uint16 map number
+    uint32   width, height (tiles)
+    uint32   land block count, statics block count
+    land blocks[]     uint32 block index, 196-byte map#.mul block
+    statics blocks[]  uint32 block index, uint32 record count, 7-byte statics#.mul records
+Block indices are in map order (bx * blocks_y + by). Applying a patch
+overwrites land blocks in place and appends patched statics blocks to
+statics#.mul, repointing their staidx#.mul entries (as the client's own
+patch files do), so unchanged data is never rewritten.
+"""
+
+from pathlib import Path
+import shutil
+import struct
+import sys
+import time
+
+import numpy as np
+
+from array_utils import gather_ranges
+from map_array import MAP_BLOCK_DTYPE, MAP_SIZES, MapArray
+from mul_reader import MUL_INDEX_DTYPE, MUL_NO_ENTRY
+from statics_index import STATIC_RECORD_DTYPE, StaticsIndex
+
+MUL_PATH = Path('assets/mul')
+PATCH_PATH = Path('assets/patches')
+
+PATCH_MAGIC = b'UOPD'
+PATCH_VERSION = 1
+PATCH_HEADER = struct.Struct('<4sHHIIII')
+DEFAULT_REGION_BLOCKS = 32  # As map_tiler.py
+HASH_CHUNK_BLOCKS = 1 << 16
+
+
+def _mix(values):
+    """splitmix64 finalizer over a uint64 array (wrapping arithmetic)"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def land_block_hashes(facet):
+    """uint64 hash of every block's 64 cells, in map order (headers are ignored)"""
+    flat = facet.blocks.reshape(-1)
+    hashes = np.empty(len(flat), dtype=np.uint64)
+    for start in range(0, len(flat), HASH_CHUNK_BLOCKS):
+        # 192 bytes of cells = 24 little-endian words per block
+        raw = np.ascontiguousarray(flat[start:start + HASH_CHUNK_BLOCKS]).view(np.uint8)
+        words = np.ascontiguousarray(raw.reshape(-1, MAP_BLOCK_DTYPE.itemsize)[:, 4:]).view('<u8')
+        h = np.zeros(len(words), dtype=np.uint64)
+        for column in words.T:
+            h = _mix(h ^ column)
+        hashes[start:start + len(words)] = h
+    return hashes
+
+
+def statics_block_hashes(statics):
+    """uint64 hash of every block's statics, in map order; empty blocks hash to 0"""
+    records = statics.records
+    counts = np.diff(statics.offsets)
+    key = (records['graphic'].astype(np.uint64)
+           | records['x'].astype(np.uint64) << np.uint64(16)
+           | records['y'].astype(np.uint64) << np.uint64(24)
+           | records['z'].view(np.uint8).astype(np.uint64) << np.uint64(32)
+           | records['hue'].astype(np.uint64) << np.uint64(40))
+    # Position in the block takes part, so reordered statics count as a change
+    position = gather_ranges(np.zeros(len(counts), dtype=np.int64), counts).astype(np.uint64)
+    mixed = _mix(key ^ _mix(position))
+
+    hashes = np.zeros(len(counts), dtype=np.uint64)
+    filled = counts > 0
+    if filled.any():
+        sums = np.add.reduceat(mixed, statics.offsets[:-1][filled])
+        hashes[filled] = _mix(sums ^ counts[filled].astype(np.uint64))
+    return hashes
+
+
+def _load(mul_dir, map_num, width, height):
+    """(MapArray, StaticsIndex or None) of one client version"""
+    mul_dir = Path(mul_dir)
+    facet = MapArray(mul_dir / f"map{map_num}.mul", width, height)
+    staidx_file = mul_dir / f"staidx{map_num}.mul"
+    statics_file = mul_dir / f"statics{map_num}.mul"
+    statics = None
+    if staidx_file.exists() and statics_file.exists():
+        statics = StaticsIndex.from_mul(staidx_file, statics_file, width, height)
+    return facet, statics
+
+
+def diff_maps(old_dir, new_dir, map_num, map_size=None):
+    """(land blocks, statics blocks) changed between two versions, as map-order indices"""
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    old_facet, old_statics = _load(old_dir, map_num, width, height)
+    new_facet, new_statics = _load(new_dir, map_num, width, height)
+
+    land = np.flatnonzero(land_block_hashes(old_facet) != land_block_hashes(new_facet))
+    # Confirm hash hits byte for byte (only the changed blocks are read twice)
+    old_cells = old_facet.blocks.reshape(-1)['cells'][land].reshape(len(land), 64)
+    new_cells = new_facet.blocks.reshape(-1)['cells'][land].reshape(len(land), 64)
+    land = land[(old_cells != new_cells).any(axis=1)]
+
+    if old_statics is None and new_statics is None:
+        statics = np.zeros(0, dtype=np.int64)
+    else:
+        # A missing statics file is a facet without statics
+        empty = np.zeros(old_facet.blocks.size, dtype=np.uint64)
+        old_hashes = empty if old_statics is None else statics_block_hashes(old_statics)
+        new_hashes = empty if new_statics is None else statics_block_hashes(new_statics)
+        statics = np.flatnonzero(old_hashes != new_hashes)
+    old_facet.close()
+    new_facet.close()
+    return land, statics
+
+
+def changed_regions(blocks, blocks_y, region_blocks=DEFAULT_REGION_BLOCKS):
+    """Sorted (rx, ry) pairs of the map_tiler.py regions touched by map-order block indices"""
+    bx, by = blocks // blocks_y, blocks % blocks_y
+    regions = np.unique(np.stack([bx // region_blocks, by // region_blocks], axis=1), axis=0)
+    return [tuple(int(v) for v in region) for region in regions]
+
+
+def write_patch(path, new_dir, map_num, land_blocks, statics_blocks, map_size=None):
+    """Write the changed blocks of the new version as a patch file"""
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    facet, statics = _load(new_dir, map_num, width, height)
+    with open(path, 'wb') as f:
+        f.write(PATCH_HEADER.pack(PATCH_MAGIC, PATCH_VERSION, map_num, width, height,
+                                  len(land_blocks), len(statics_blocks)))
+        entries = np.empty(len(land_blocks), dtype=[('block', '<u4'), ('data', MAP_BLOCK_DTYPE)])
+        entries['block'] = land_blocks
+        entries['data'] = facet.blocks.reshape(-1)[land_blocks]
+        f.write(entries.tobytes())
+
+        for block in statics_blocks:
+            records = statics.records[statics.offsets[block]:statics.offsets[block + 1]] \
+                if statics is not None else np.zeros(0, dtype=STATIC_RECORD_DTYPE)
+            f.write(struct.pack('<II', block, len(records)))
+            f.write(records.tobytes())
+    facet.close()
+
+
+def read_patch(path):
+    """(header dict, land entries, {block: statics records}) of a patch file"""
+    with open(path, 'rb') as f:
+        magic, version, map_num, width, height, land_count, statics_count = \
+            PATCH_HEADER.unpack(f.read(PATCH_HEADER.size))
+        if magic != PATCH_MAGIC or version != PATCH_VERSION:
+            raise ValueError(f"Not a map patch: {path}")
+        land = np.fromfile(f, dtype=[('block', '<u4'), ('data', MAP_BLOCK_DTYPE)], count=land_count)
+        statics = {}
+        for _ in range(statics_count):
+            block, count = struct.unpack('<II', f.read(8))
+            statics[block] = np.fromfile(f, dtype=STATIC_RECORD_DTYPE, count=count)
+    header = {'map': map_num, 'width': width, 'height': height}
+    return header, land, statics
+
+
+def apply_patch(patch_path, mul_dir=MUL_PATH, output_dir=None):
+    """Apply a patch to map#/staidx#/statics#.mul in mul_dir (or to copies in output_dir)"""
+    header, land, statics = read_patch(patch_path)
+    map_num = header['map']
+    names = [f"map{map_num}.mul", f"staidx{map_num}.mul", f"statics{map_num}.mul"]
+    mul_dir = Path(mul_dir)
+    if output_dir is not None:
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            if (mul_dir / name).exists():
+                shutil.copyfile(mul_dir / name, output_dir / name)
+        mul_dir = output_dir
+    map_file, staidx_file, statics_file = (mul_dir / name for name in names)
+
+    block_count = (header['width'] // 8) * (header['height'] // 8)
+    blocks = np.memmap(map_file, dtype=MAP_BLOCK_DTYPE, mode='r+', shape=(block_count,))
+    blocks[land['block']] = land['data']
+    blocks.flush()
+    del blocks
+
+    if statics:
+        index = np.full(block_count, MUL_NO_ENTRY, dtype=MUL_INDEX_DTYPE) if not staidx_file.exists() \
+            else np.fromfile(staidx_file, dtype=MUL_INDEX_DTYPE)
+        if len(index) < block_count:
+            padded = np.zeros(block_count, dtype=MUL_INDEX_DTYPE)
+            padded['offset'] = padded['length'] = MUL_NO_ENTRY
+            padded[:len(index)] = index
+            index = padded
+        with open(statics_file, 'ab') as f:
+            position = f.tell()
+            for block, records in statics.items():
+                if len(records):
+                    f.write(records.tobytes())
+                    index['offset'][block] = position
+                    index['length'][block] = records.nbytes
+                    position += records.nbytes
+                else:
+                    index['offset'][block] = MUL_NO_ENTRY
+                    index['length'][block] = MUL_NO_ENTRY
+        index.tofile(staidx_file)
+    return len(land), len(statics)
+
+
+def main():
+    args = sys.argv[1:]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    region_blocks = DEFAULT_REGION_BLOCKS
+    if '--region-blocks' in args:
+        i = args.index('--region-blocks')
+        region_blocks = int(args[i + 1])
+        del args[i:i + 2]
+    output_dir = None
+    if '--output-dir' in args:
+        i = args.index('--output-dir')
+        output_dir = Path(args[i + 1])
+        del args[i:i + 2]
+
+    if '--apply' in args:
+        i = args.index('--apply')
+        patch_file = Path(args[i + 1])
+        del args[i:i + 2]
+        mul_dir = Path(args[0]) if args else MUL_PATH
+        land_count, statics_count = apply_patch(patch_file, mul_dir, output_dir)
+        print(f"✅ Applied {patch_file}: {land_count} land blocks, {statics_count} statics blocks "
+              f"-> {output_dir or mul_dir}")
+        return
+
+    if len(args) < 2:
+        print("Usage: python map_diff.py OLD_MUL_DIR NEW_MUL_DIR [map_number] [--size WIDTHxHEIGHT]")
+        print("       python map_diff.py --apply PATCH_FILE [MUL_DIR] [--output-dir DIR]")
+        sys.exit(1)
+    old_dir, new_dir = Path(args[0]), Path(args[1])
+    map_num = int(args[2]) if len(args) > 2 else 0
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    print(f"Diffing map {map_num} ({width}×{height}): {old_dir} -> {new_dir}")
+    started = time.time()
+    land_blocks, statics_blocks = diff_maps(old_dir, new_dir, map_num, (width, height))
+    blocks_y = height // 8
+    changed = np.union1d(land_blocks, statics_blocks)
+    regions = changed_regions(changed, blocks_y, region_blocks)
+    print(f"  {len(land_blocks)} land blocks, {len(statics_blocks)} statics blocks changed "
+          f"({len(changed)}/{(width // 8) * blocks_y} blocks) in {time.time() - started:.1f}s")
+    if regions:
+        print(f"  {len(regions)} regions of {region_blocks * 8} tiles: "
+              + ' '.join(f"r_{rx}_{ry}" for rx, ry in regions))
+
+    PATCH_PATH.mkdir(parents=True, exist_ok=True)
+    output_file = PATCH_PATH / f"map{map_num}.patch.bin"
+    write_patch(output_file, new_dir, map_num, land_blocks, statics_blocks, (width, height))
+    full_size = sum((new_dir / name).stat().st_size for name in
+                    (f"map{map_num}.mul", f"staidx{map_num}.mul", f"statics{map_num}.mul")
+                    if (new_dir / name).exists())
+    print(f"✅ {output_file.stat().st_size / 1024:.1f} KB patch "
+          f"(full files: {full_size / 1024 / 1024:.1f} MB) -> {output_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+"""
+Map Patch Files (mapdif / stadif / verdata)
+Loads the block overrides a patched client ships next to the base facet
+files and indexes them per block, so MapArray and StaticsIndex return the
+patched terrain the live shard uses. Bake mode writes fully patched
+map#.mul / staidx#.mul / statics#.mul for tools that read files directly.
+
+Run: python map_patches.py [map_number] [--size WIDTHxHEIGHT] [--output-dir DIR]
+Output: DIR/map#.mul, staidx#.mul, statics#.mul (default assets/mul/patched)
+
+Usage:
+    patches = MapPatches.load('assets/mul', 0)          # None if the facet has no patches
+    facet = MapArray('assets/mul/map0.mul', patches=patches)
+    statics = StaticsIndex.from_mul('assets/mul/staidx0.mul', 'assets/mul/statics0.mul', patches=patches)
+
+Patch files (all optional):
+    mapdifl#.mul              uint32 block index per patched land block
+    mapdif#.mul               196-byte map#.mul blocks, same order
+    stadifl#.mul              uint32 block index per patched statics block
+    stadifi#.mul              12-byte idx entries, same order
+    stadif#.mul               statics#.mul records the entries point at
+    verdata.mul               int32 count, then (file, index, offset, length, extra) int32s;
+                              file 0 patches map0.mul blocks, file 2 statics0.mul blocks
+Verdata is applied first and the dif files over it; within a file the last
+entry for a block wins. Block indices are in map order (bx * blocks_y + by).
+"""
+
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+
+from array_utils import gather_ranges
+from map_array import MAP_BLOCK_DTYPE, MAP_SIZES, MapArray
+from mul_reader import MUL_INDEX_DTYPE, MUL_NO_ENTRY
+from statics_index import STATIC_RECORD_DTYPE, StaticsIndex, read_static_blocks
+
+MUL_PATH = Path('assets/mul')
+
+VERDATA_ENTRY_DTYPE = np.dtype([
+    ('file', '<i4'),
+    ('index', '<i4'),
+    ('offset', '<i4'),
+    ('length', '<i4'),
+    ('extra', '<i4'),
+])
+VERDATA_MAP_FILE = 0      # map0.mul
+VERDATA_STATICS_FILE = 2  # statics0.mul
+
+
+def _last_per_block(blocks):
+    """Positions of the last occurrence of each block index"""
+    reverse_unique = np.unique(blocks[::-1], return_index=True)[1]
+    return len(blocks) - 1 - reverse_unique
+
+
+class MapPatches:
+    """Per-block overrides of one facet.
+
+    land_override[bx, by] and statics_override[block] are -1 for unpatched
+    blocks, else the row of the patched block in land_blocks or in the
+    statics_offsets / statics_records CSR arrays.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.blocks_x = width // 8
+        self.blocks_y = height // 8
+        self.land_override = np.full((self.blocks_x, self.blocks_y), -1, dtype=np.int32)
+        self.land_blocks = np.zeros(0, dtype=MAP_BLOCK_DTYPE)
+        self.statics_override = np.full(self.blocks_x * self.blocks_y, -1, dtype=np.int32)
+        self.statics_offsets = np.zeros(1, dtype=np.int64)
+        self.statics_records = np.zeros(0, dtype=STATIC_RECORD_DTYPE)
+
+    @property
+    def land_count(self):
+        return int(np.count_nonzero(self.land_override >= 0))
+
+    @property
+    def statics_count(self):
+        return int(np.count_nonzero(self.statics_override >= 0))
+
+    @classmethod
+    def load(cls, mul_dir, map_num, width=None, height=None):
+        """Patches of a facet found in mul_dir, or None if it has none"""
+        mul_dir = Path(mul_dir)
+        if width is None or height is None:
+            width, height = MAP_SIZES.get(map_num, MAP_SIZES[0])
+        patches = cls(width, height)
+
+        verdata_file = mul_dir / 'verdata.mul'
+        if map_num == 0 and verdata_file.exists():
+            patches.add_verdata(verdata_file)
+        if (mul_dir / f"mapdifl{map_num}.mul").exists() and (mul_dir / f"mapdif{map_num}.mul").exists():
+            patches.add_mapdif(mul_dir / f"mapdifl{map_num}.mul", mul_dir / f"mapdif{map_num}.mul")
+        stadif_files = [mul_dir / f"{name}{map_num}.mul" for name in ('stadifl', 'stadifi', 'stadif')]
+        if all(path.exists() for path in stadif_files):
+            patches.add_stadif(*stadif_files)
+
+        if not patches.land_count and not patches.statics_count:
+            return None
+        return patches
+
+    def _valid_blocks(self, blocks):
+        blocks = np.asarray(blocks, dtype=np.int64)
+        return (blocks >= 0) & (blocks < self.blocks_x * self.blocks_y)
+
+    def add_land(self, blocks, data):
+        """Override land blocks (map-order indices) with MAP_BLOCK_DTYPE records"""
+        blocks = np.asarray(blocks, dtype=np.int64)
+        keep = self._valid_blocks(blocks)
+        blocks, data = blocks[keep], data[keep]
+        last = _last_per_block(blocks)
+        rows = np.arange(len(last)) + len(self.land_blocks)
+        self.land_blocks = np.concatenate([self.land_blocks, data[last]])
+        self.land_override.reshape(-1)[blocks[last]] = rows
+
+    def add_statics(self, blocks, offsets, records):
+        """Override statics blocks with a CSR of records (an empty block removes its statics)"""
+        blocks = np.asarray(blocks, dtype=np.int64)
+        keep = np.flatnonzero(self._valid_blocks(blocks))
+        last = keep[_last_per_block(blocks[keep])]
+        counts = np.diff(offsets)[last]
+        rows = np.arange(len(last)) + len(self.statics_offsets) - 1
+        gathered = records[gather_ranges(offsets[last], counts)]
+        self.statics_records = np.concatenate([self.statics_records, gathered])
+        self.statics_offsets = np.concatenate([self.statics_offsets,
+                                               self.statics_offsets[-1] + np.cumsum(counts)])
+        self.statics_override[blocks[last]] = rows
+
+    def add_mapdif(self, list_path, data_path):
+        blocks = np.fromfile(list_path, dtype='<u4')
+        data = np.fromfile(data_path, dtype=MAP_BLOCK_DTYPE)
+        count = min(len(blocks), len(data))
+        self.add_land(blocks[:count], data[:count])
+
+    def add_stadif(self, list_path, index_path, data_path):
+        blocks = np.fromfile(list_path, dtype='<u4')
+        index = np.fromfile(index_path, dtype=MUL_INDEX_DTYPE)
+        count = min(len(blocks), len(index))
+        offsets, records = read_static_blocks(index[:count], np.fromfile(data_path, dtype=np.uint8))
+        self.add_statics(blocks[:count], offsets, records)
+
+    def add_verdata(self, path):
+        data = np.fromfile(path, dtype=np.uint8)
+        count = int(data[:4].view('<i4')[0]) if len(data) >= 4 else 0
+        entries = data[4:4 + count * VERDATA_ENTRY_DTYPE.itemsize].view(VERDATA_ENTRY_DTYPE)
+
+        land = entries[(entries['file'] == VERDATA_MAP_FILE)
+                       & (entries['length'] >= MAP_BLOCK_DTYPE.itemsize)
+                       & (entries['offset'] >= 0)
+                       & (entries['offset'].astype(np.int64) + MAP_BLOCK_DTYPE.itemsize <= len(data))]
+        if len(land):
+            raw = data[land['offset'].astype(np.int64)[:, None] + np.arange(MAP_BLOCK_DTYPE.itemsize)]
+            self.add_land(land['index'], raw.reshape(-1).view(MAP_BLOCK_DTYPE))
+
+        statics = entries[entries['file'] == VERDATA_STATICS_FILE]
+        if len(statics):
+            index = np.empty(len(statics), dtype=MUL_INDEX_DTYPE)
+            index['offset'] = np.where(statics['offset'] < 0, MUL_NO_ENTRY, statics['offset'].astype(np.int64))
+            index['length'] = np.where(statics['length'] < 0, MUL_NO_ENTRY, statics['length'].astype(np.int64))
+            index['extra'] = 0
+            offsets, records = read_static_blocks(index, data)
+            self.add_statics(statics['index'], offsets, records)
+
+    def patch_cells(self, cells, bx0, by0):
+        """Overwrite patched blocks in a (blocks x, blocks y, 8, 8) cell array starting at (bx0, by0)"""
+        override = self.land_override[bx0:bx0 + cells.shape[0], by0:by0 + cells.shape[1]]
+        local_x, local_y = np.nonzero(override >= 0)
+        if len(local_x):
+            cells[local_x, local_y] = self.land_blocks['cells'][override[local_x, local_y]]
+        return cells
+
+
+def bake(mul_dir, map_num, output_dir, map_size=None):
+    """Write map#.mul / staidx#.mul / statics#.mul with every patch applied"""
+    mul_dir, output_dir = Path(mul_dir), Path(output_dir)
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    patches = MapPatches.load(mul_dir, map_num, width, height)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    facet = MapArray(mul_dir / f"map{map_num}.mul", width, height)
+    blocks = np.array(facet.blocks)
+    facet.close()
+    if patches is not None:
+        patched = np.flatnonzero(patches.land_override.reshape(-1) >= 0)
+        blocks.reshape(-1)[patched] = patches.land_blocks[patches.land_override.reshape(-1)[patched]]
+    blocks.tofile(output_dir / f"map{map_num}.mul")
+
+    statics = StaticsIndex.from_mul(mul_dir / f"staidx{map_num}.mul", mul_dir / f"statics{map_num}.mul",
+                                    width, height, patches)
+    # Records are already contiguous per block in map order: one write each
+    counts = np.diff(statics.offsets)
+    index = np.empty(len(counts), dtype=MUL_INDEX_DTYPE)
+    index['offset'] = np.where(counts > 0, statics.offsets[:-1] * statics.records.itemsize, MUL_NO_ENTRY)
+    index['length'] = np.where(counts > 0, counts * statics.records.itemsize, MUL_NO_ENTRY)
+    index['extra'] = 0
+    index.tofile(output_dir / f"staidx{map_num}.mul")
+    statics.records.tofile(output_dir / f"statics{map_num}.mul")
+    return patches
+
+
+def main():
+    args = sys.argv[1:]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    output_dir = MUL_PATH / 'patched'
+    if '--output-dir' in args:
+        i = args.index('--output-dir')
+        output_dir = Path(args[i + 1])
+        del args[i:i + 2]
+    map_num = int(args[0]) if args else 0
+
+    print(f"Baking patches into map {map_num} -> {output_dir}")
+    started = time.time()
+    patches = bake(MUL_PATH, map_num, output_dir, map_size)
+    if patches is None:
+        print(f"  No mapdif/stadif/verdata patches for map {map_num}, files copied unpatched")
+    else:
+        print(f"  {patches.land_count} land blocks, {patches.statics_count} statics blocks patched")
+    print(f"✅ Done in {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
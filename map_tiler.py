@@ -0,0 +1,122 @@
+"""
+Map Region Tiler
+Splits map#.mul into region files (32×32 blocks = 256×256 tiles by default) so
+the client can stream the terrain around the camera instead of downloading the
+whole map. Read by js/modules/mapRegionStreamer.js.
+
+Run: python map_tiler.py [map_number] [--region-blocks N] [--size WIDTHxHEIGHT]
+Output: assets/regions/map#/index.json + r_<rx>_<ry>.bin
+
+Region file (little-endian):
+    char[4]  magic 'UORG'
+    uint16   version
+    uint16   region x, region y (in regions)
+    uint16   width, height (in tiles; edge regions may be smaller)
+    uint16   reserved
+    uint16   tile_ids[height][width]   row-major
+    int8     z[height][width]          row-major
+Block headers are dropped and tiles are stored row-major, so a region is one
+contiguous read per plane and needs no block-order math on the client.
+"""
+
+from pathlib import Path
+import json
+import struct
+import sys
+
+import numpy as np
+
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+
+MUL_PATH = Path('assets/mul')
+REGIONS_PATH = Path('assets/regions')
+
+REGION_MAGIC = b'UORG'
+REGION_VERSION = 1
+REGION_HEADER = struct.Struct('<4sHHHHHH')
+DEFAULT_REGION_BLOCKS = 32
+
+
+def write_region(path, rx, ry, tile_ids, z):
+    """Write one region file"""
+    height, width = tile_ids.shape
+    with open(path, 'wb') as f:
+        f.write(REGION_HEADER.pack(REGION_MAGIC, REGION_VERSION, rx, ry, width, height, 0))
+        f.write(np.ascontiguousarray(tile_ids, dtype='<u2').tobytes())
+        f.write(np.ascontiguousarray(z).tobytes())
+
+
+def tile_map(map_num, region_blocks=DEFAULT_REGION_BLOCKS, map_size=None):
+    """Write every region of map#.mul plus the region directory"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    if not map_file.exists():
+        raise FileNotFoundError(f"{map_file} not found (convert the UOP first)")
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    output_dir = REGIONS_PATH / f"map{map_num}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in output_dir.glob('r_*.bin'):
+        old.unlink()
+
+    # mapdif/verdata overrides, so the regions match a patched client
+    patches = MapPatches.load(MUL_PATH, map_num, map_width, map_height)
+    if patches is not None:
+        print(f"  Applying {patches.land_count} patched land blocks")
+    facet = MapArray(map_file, map_width, map_height, patches)
+    region_tiles_size = region_blocks * 8
+    columns = -(-facet.blocks_x // region_blocks)
+    rows = -(-facet.blocks_y // region_blocks)
+    print(f"Tiling {map_file} ({map_width}×{map_height}) into {columns}×{rows} regions "
+          f"of {region_tiles_size}×{region_tiles_size} tiles")
+
+    regions = []
+    total_bytes = 0
+    for rx in range(columns):
+        for ry in range(rows):
+            tile_ids, z = facet.region(rx * region_tiles_size, ry * region_tiles_size,
+                                       region_tiles_size, region_tiles_size)
+            path = output_dir / f"r_{rx}_{ry}.bin"
+            write_region(path, rx, ry, tile_ids, z)
+            total_bytes += path.stat().st_size
+            regions.append([rx, ry, tile_ids.shape[1], tile_ids.shape[0]])
+        print(f"  Column {rx + 1}/{columns}", end='\r')
+    facet.close()
+
+    directory = {
+        'map': map_num,
+        'version': REGION_VERSION,
+        'width': map_width,
+        'height': map_height,
+        'regionSize': region_tiles_size,
+        'columns': columns,
+        'rows': rows,
+        'file': 'r_{x}_{y}.bin',
+        'regions': regions,
+    }
+    with open(output_dir / 'index.json', 'w') as f:
+        json.dump(directory, f)
+
+    print(f"\n✅ {len(regions)} regions, {total_bytes / 1024 / 1024:.1f} MB total, "
+          f"{total_bytes / len(regions) / 1024:.0f} KB per region -> {output_dir}")
+
+
+def main():
+    args = sys.argv[1:]
+    region_blocks = DEFAULT_REGION_BLOCKS
+    if '--region-blocks' in args:
+        i = args.index('--region-blocks')
+        region_blocks = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+
+    map_num = int(args[0]) if args else 0
+    tile_map(map_num, region_blocks, map_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,511 @@
+"""
+Transition Statistics Miner
+Builds the land transition tables from how tiles are actually placed on the
+map instead of guessing tile edges from a few pixels (analyze_isometric_edges.py,
+analyze_embank_tiles.py). Every land tile ID is given a biome from LandData.csv
+(name keywords, the Wet flag, the TextureID tile's name for unnamed tiles). Then
+each tile on the facet is counted under its dominant foreign neighbour biome and
+that biome's 8-neighbour mask. The facet is scanned in row bands with NumPy
+only, so map0's 29M tiles take a few seconds.
+
+Run: python mine_transitions.py [map_number] [--size WIDTHxHEIGHT] [--band-rows N] [--output-dir DIR]
+Output: <output dir>/sandTileMapping.js, grassTileMapping.js (tables replaced in place)
+        <output dir>/embankTileMapping.js, rockTileMapping.js, dirtTileMapping.js
+        <output dir>/transitionTiles8bit.js (tile tables replaced, logic untouched)
+        assets/tiles/transition_stats_map#.json (raw frequency table)
+The output dir defaults to js/data. Table entries that never occur on the map
+keep their previous values.
+
+Neighbour mask bits (grid directions, as in the calculate*Bitmask() helpers):
+    N=1 (y-1), E=2 (x+1), S=4 (y+1), W=8 (x-1), NE=16, SE=32, SW=64, NW=128
+The low 4 bits are the *TileMapping.js bitmask. Marching-squares corners for
+transitionTiles8bit.js come from all 8 bits: a corner belongs to the foreign
+biome if any of the 3 neighbours that share it does.
+"""
+
+from pathlib import Path
+import csv
+import json
+import re
+import sys
+import time
+
+import numpy as np
+
+from analyze_isometric_edges import generate_js_mapping
+from map_array import MAP_SIZES, MapArray
+
+MUL_PATH = Path('assets/mul')
+JS_DATA_PATH = Path('js/data')
+LAND_DATA_PATH = Path('assets/tiles/LandData.csv')
+STATS_PATH = Path('assets/tiles')
+
+DEFAULT_BAND_ROWS = 256
+MIN_TILE_COUNT = 4       # Placements below this are treated as map noise
+MIN_TILE_SHARE = 0.01    # ... as are tiles under 1% of their table entry
+MAX_TILES_PER_ENTRY = 16
+MAX_PURE_TILES = 64
+
+# Biome index per land tile. 'other' covers built surfaces and unknown names.
+BIOMES = ('other', 'water', 'lava', 'void', 'cave', 'rock', 'snow', 'sand',
+          'furrows', 'dirt', 'jungle', 'forest', 'grass', 'embank')
+BIOME_INDEX = {name: i for i, name in enumerate(BIOMES)}
+NO_BIOME = 15  # "other" value of tiles without any foreign neighbour
+
+# Name keywords, first match wins (order follows landSurfaceClassifier.js)
+BIOME_KEYWORDS = (
+    ('other', ('cobble', 'flagstone', 'paver', 'brick', 'plank', 'wooden', 'tile', 'marble', 'path')),
+    ('water', ('water',)),
+    ('lava', ('lava',)),
+    ('void', ('void',)),
+    ('cave', ('cave',)),
+    ('rock', ('rock', 'stone', 'obsidian', 'cliff')),
+    ('snow', ('snow',)),
+    ('sand', ('sand',)),
+    ('furrows', ('furrow',)),
+    ('dirt', ('dirt',)),
+    ('jungle', ('jungle',)),
+    ('forest', ('forest', 'tree', 'leaves')),
+    ('grass', ('grass',)),
+    ('embank', ('embank',)),
+)
+UNNAMED = ('', 'noname', 'nodraw', 'terrainfallback', 'terrainfal')
+
+GRASS_LIKE = ('grass', 'forest', 'jungle', 'furrows')  # as isGrassType() in sandTileMapping.js
+SHORE_LAND = GRASS_LIKE + ('dirt', 'embank')
+
+# (bit, dx, dy) per neighbour
+NEIGHBOURS = (
+    (1, 0, -1), (2, 1, 0), (4, 0, 1), (8, -1, 0),
+    (16, 1, -1), (32, 1, 1), (64, -1, 1), (128, -1, -1),
+)
+NEIGHBOUR_BITS = np.array([bit for bit, _, _ in NEIGHBOURS], dtype=np.int64)
+EDGE_NAMES = ((1, 'NORTH'), (2, 'EAST'), (4, 'SOUTH'), (8, 'WEST'))
+
+# Marching-squares corner bits (TL=8, TR=4, BR=2, BL=1) and the neighbours sharing each corner
+CORNERS = ((8, 'TL', 1 | 8 | 128), (4, 'TR', 1 | 2 | 16), (2, 'BR', 4 | 2 | 32), (1, 'BL', 4 | 8 | 64))
+CORNER_CASE = np.array([sum(bit for bit, _, sides in CORNERS if mask & sides) for mask in range(256)],
+                       dtype=np.uint8)
+
+# transitionTiles8bit.js tables: (const name, biome for corner bit 0, biome for corner bit 1)
+TRANSITION_TABLES = (
+    ('GRASS_SAND_TILES', 'grass', 'sand'),
+    ('GRASS_FOREST_TILES', 'grass', 'forest'),
+    ('GRASS_DIRT_TILES', 'grass', 'dirt'),
+    ('GRASS_ROCK_TILES', 'grass', 'rock'),
+    ('FOREST_JUNGLE_TILES', 'forest', 'jungle'),
+    ('GRASS_WATER_TILES', 'grass', 'water'),
+    ('SAND_WATER_TILES', 'sand', 'water'),
+)
+
+
+def classify_name(name):
+    """Biome for a LandData name, or None when no keyword matches"""
+    for biome, keywords in BIOME_KEYWORDS:
+        if any(keyword in name for keyword in keywords):
+            return biome
+    return None
+
+
+def load_biome_lut(path=LAND_DATA_PATH):
+    """Biome index per tile ID (65536 entries, IDs outside LandData are 'other')"""
+    names, textures, wet = {}, {}, {}
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f, delimiter=';'):
+            tile_id = int(row['ID'], 16)
+            name = row['Name'].strip().lower()
+            while name.startswith('decimated_'):
+                name = name[len('decimated_'):]
+            names[tile_id] = name
+            textures[tile_id] = int(row['TextureID'], 16)
+            wet[tile_id] = row['Wet'] == '1'
+
+    lut = np.zeros(0x10000, dtype=np.uint8)
+    for tile_id, name in names.items():
+        if name in UNNAMED:
+            # Unnamed tiles usually share a texture with a named one
+            name = names.get(textures[tile_id], '')
+        biome = classify_name(name)
+        if biome is None and wet[tile_id]:
+            biome = 'water'
+        lut[tile_id] = BIOME_INDEX[biome or 'other']
+    return lut
+
+
+def count_band(biome_lut, ids, top, bottom):
+    """(keys, counts) for one band of tile IDs.
+
+    `ids` carries one halo row above/below unless the band touches the map
+    edge (`top`/`bottom` say so); off-map neighbours repeat the edge tile, so
+    the map border never reads as a transition.
+    Key = tile_id << 12 | dominant foreign biome << 8 | its 8-neighbour mask.
+    """
+    padded = np.pad(ids, ((int(top), int(bottom)), (1, 1)), mode='edge')
+    biome = biome_lut[padded]
+    height, width = padded.shape[0] - 2, padded.shape[1] - 2
+    centre = biome[1:-1, 1:-1]
+    neighbours = np.stack([biome[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+                           for _, dx, dy in NEIGHBOURS], axis=-1)
+    foreign = np.where(neighbours != centre[..., None], neighbours, NO_BIOME).reshape(-1, 8)
+
+    other = np.full(len(foreign), NO_BIOME, dtype=np.int64)
+    mask = np.zeros(len(foreign), dtype=np.int64)
+    edge = np.flatnonzero((foreign != NO_BIOME).any(axis=1))
+    if len(edge):
+        # Dominant foreign biome: most neighbours, lowest biome index on ties
+        edge_foreign = foreign[edge].astype(np.int64)
+        votes = np.bincount((np.arange(len(edge))[:, None] * 16 + edge_foreign).reshape(-1),
+                            minlength=len(edge) * 16).reshape(-1, 16)
+        votes[:, NO_BIOME] = 0
+        other[edge] = votes.argmax(axis=1)
+        mask[edge] = ((edge_foreign == other[edge][:, None]) * NEIGHBOUR_BITS).sum(axis=1)
+
+    tile_ids = padded[1:-1, 1:-1].reshape(-1).astype(np.int64)
+    return np.unique((tile_ids << 12) | (other << 8) | mask, return_counts=True)
+
+
+def mine_map(facet, biome_lut, band_rows=DEFAULT_BAND_ROWS):
+    """Frequency table of a facet as a structured array (tile, biome, other, mask, count)"""
+    keys, counts = [], []
+    for y0 in range(0, facet.height, band_rows):
+        y1 = min(facet.height, y0 + band_rows)
+        top, bottom = y0 == 0, y1 == facet.height
+        ids = facet.tile_ids[y0 - (not top):y1 + (not bottom), :]
+        band_keys, band_counts = count_band(biome_lut, ids, top, bottom)
+        keys.append(band_keys)
+        counts.append(band_counts)
+        print(f"  Rows {y1}/{facet.height}", end='\r')
+    print()
+
+    keys, inverse = np.unique(np.concatenate(keys), return_inverse=True)
+    counts = np.bincount(inverse.reshape(-1), weights=np.concatenate(counts)).astype(np.int64)
+
+    stats = np.zeros(len(keys), dtype=[('tile', '<u2'), ('biome', 'u1'), ('other', 'u1'),
+                                        ('mask', 'u1'), ('count', '<i8'), ('transition', '?')])
+    stats['tile'] = keys >> 12
+    stats['biome'] = biome_lut[keys >> 12]
+    stats['other'] = (keys >> 8) & 15
+    stats['mask'] = keys & 255
+    stats['count'] = counts
+
+    # Transition tiles sit next to another biome more often than not; base tiles
+    # bordering a transition are counted too but fill interiors most of the time
+    interior = stats['other'] == NO_BIOME
+    placed = np.bincount(stats['tile'], weights=counts, minlength=0x10000)
+    inside = np.bincount(stats['tile'][interior], weights=counts[interior], minlength=0x10000)
+    stats['transition'] = (inside * 2 < placed)[stats['tile']]
+    return stats
+
+
+def rank_tiles(rows, limit=MAX_TILES_PER_ENTRY):
+    """[(tile ID, placements)] most placed first, without tiles below the noise thresholds"""
+    if len(rows) == 0:
+        return []
+    totals = np.bincount(rows['tile'], weights=rows['count'], minlength=0x10000).astype(np.int64)
+    floor = max(MIN_TILE_COUNT, MIN_TILE_SHARE * totals.sum())
+    order = np.lexsort((np.arange(len(totals)), -totals))
+    order = order[totals[order] >= floor][:limit]
+    return list(zip(order.tolist(), totals[order].tolist()))
+
+
+def hex_id(tile_id):
+    return f"0x{tile_id:04X}"
+
+
+def biome_rows(stats, own, other):
+    """Rows whose tile is one of `own` biomes and whose dominant foreign biome is one of `other`.
+
+    other=[None] selects interior placements; otherwise only transition tiles count.
+    """
+    own_index = [BIOME_INDEX[name] for name in own]
+    other_index = [NO_BIOME if name is None else BIOME_INDEX[name] for name in other]
+    selected = np.isin(stats['biome'], own_index) & np.isin(stats['other'], other_index)
+    if None not in other:
+        selected &= stats['transition']
+    return stats[selected]
+
+
+def group_by_edges(rows, type_of_row):
+    """{4-bit mask: {TYPE: [tile IDs]}} in generate_js_mapping's layout.
+
+    Diagonal-only neighbours (mask 0) are skipped; a MIXED list with every
+    type's tiles is added where a mask has more than one type, since the
+    lookup helpers fall back to MIXED for unknown types.
+    """
+    rows = rows[(rows['mask'] & 15) != 0]
+    edges = rows['mask'] & 15
+    types = np.array([type_of_row(row) for row in rows], dtype=object)
+    grouped = {}
+    for bitmask in np.unique(edges).tolist():
+        in_mask = edges == bitmask
+        groups = {}
+        for trans_type in sorted(set(types[in_mask])):
+            tiles = rank_tiles(rows[in_mask & (types == trans_type)])
+            if tiles:
+                groups[trans_type] = [hex_id(t) for t, _ in tiles]
+        if len(groups) > 1:
+            groups['MIXED'] = [hex_id(t) for t, _ in rank_tiles(rows[in_mask])]
+        if groups:
+            grouped[bitmask] = groups
+    return grouped
+
+
+def replace_literal(source, declaration, literal):
+    """Replace the object/array literal opened by `declaration` (up to the closing brace at column 0)"""
+    start = source.index(declaration)
+    closing = '\n}' if source[start + len(declaration)] == '{' else '\n]'
+    end = source.index(closing, start) + len(closing)
+    return source[:start] + literal + source[end:]
+
+
+def literal_body(source, declaration):
+    """Text between the braces of the literal opened by `declaration`"""
+    start = source.index(declaration) + len(declaration) + 1
+    closing = '\n}' if source[start - 1] == '{' else '\n]'
+    return source[start:source.index(closing, start)]
+
+
+def format_id_list(ids, indent, per_line=7):
+    lines = []
+    for i in range(0, len(ids), per_line):
+        lines.append(indent + ', '.join(f"'{t}'" for t in ids[i:i + per_line]))
+    return ',\n'.join(lines)
+
+
+def read_grouped_mapping(source, variable_name):
+    """{bitmask: {TYPE: [tile IDs]}} of a table written by generate_js_mapping()"""
+    body = literal_body(source, f"export const {variable_name} = ")
+    grouped = {}
+    for bitmask, groups in re.findall(r'^    (\d+): \{\n(.*?)^    \},', body, re.M | re.S):
+        grouped[int(bitmask)] = {trans_type: re.findall(r"'(0x[0-9A-Fa-f]+)'", tiles) for trans_type, tiles in
+                                 re.findall(r"^\s*'(\w+)': \[(.*?)\],", groups, re.M)}
+    return grouped
+
+
+def write_grouped_mapping(grouped, output_dir, file_name, variable_name, description, helper_prefix):
+    """generate_js_mapping() over the mined bitmasks, the others kept from js/data"""
+    previous_file = JS_DATA_PATH / file_name
+    merged = read_grouped_mapping(previous_file.read_text(), variable_name) if previous_file.exists() else {}
+    kept = len(set(merged) - set(grouped))
+    merged.update(grouped)
+    generate_js_mapping(str(output_dir / file_name), variable_name, merged, description, helper_prefix,
+                        'mine_transitions.py (map placement statistics)')
+    print(f"  {len(grouped)} bitmasks from map usage, {kept} kept from the previous table")
+
+
+def write_sand_mapping(stats, source, output_file):
+    """Replace SAND_TILE_MAPPING with the sand tiles seen next to grass-type biomes"""
+    declaration = 'export const SAND_TILE_MAPPING = '
+    previous = {int(key): re.findall(r"'(0x[0-9A-Fa-f]+)'", tiles) for key, tiles in
+                re.findall(r'^\s*(\d+):\s*\[(.*?)\]', literal_body(source, declaration), re.M | re.S)}
+
+    pure = biome_rows(stats, ['sand'], [None])
+    edges = biome_rows(stats, ['sand'], GRASS_LIKE)
+    lines = [declaration + '{']
+    mined = 0
+    for bitmask in range(16):
+        rows = pure if bitmask == 0 else edges[(edges['mask'] & 15) == bitmask]
+        tiles = rank_tiles(rows, MAX_PURE_TILES if bitmask == 0 else MAX_TILES_PER_ENTRY)
+        if bitmask == 0:
+            label = 'Pure sand - no grass on any edge'
+        else:
+            label = 'Grass on ' + ' + '.join(name for bit, name in EDGE_NAMES if bitmask & bit) + \
+                    (' edge' if bitmask in (1, 2, 4, 8) else ' edges')
+        if tiles:
+            ids = [hex_id(t) for t, _ in tiles]
+            note = f"{len(ids)} tiles, {sum(c for _, c in tiles)} placements"
+            mined += 1
+        else:
+            ids = previous.get(bitmask, [])
+            note = 'not placed on the map - previous analysis'
+        lines.append(f"    // Bitmask {bitmask}: {label} ({note})")
+        lines.append(f"    {bitmask}: [")
+        lines.append(format_id_list(ids, ' ' * 8))
+        lines.append('    ],' if bitmask < 15 else '    ]')
+        if bitmask < 15:
+            lines.append('    ')
+    lines.append('}')
+
+    output_file.write_text(replace_literal(source, declaration, '\n'.join(lines)))
+    print(f"Generated {output_file} ({mined}/16 bitmasks from map usage)")
+
+
+def write_grass_tiles(stats, source, output_file):
+    """Replace PURE_GRASS_TILES with the grass tiles placed away from any other biome"""
+    declaration = 'export const PURE_GRASS_TILES = '
+    tiles = rank_tiles(biome_rows(stats, ['grass'], [None]), MAX_PURE_TILES)
+    if not tiles:
+        output_file.write_text(source)
+        print(f"Kept {output_file} (no pure grass on the map)")
+        return
+    ids = [hex_id(t) for t, _ in tiles]
+    lines = [declaration + '[']
+    lines.extend(f"    {', '.join(repr(t) for t in ids[i:i + 4])}," for i in range(0, len(ids), 4))
+    lines.append(']')
+    output_file.write_text(replace_literal(source, declaration, '\n'.join(lines)))
+    print(f"Generated {output_file} ({len(ids)} tiles)")
+
+
+def case_name(case, biome_a, biome_b):
+    if case == 0:
+        return f"Pure {biome_a.title()}"
+    if case == 15:
+        return f"Pure {biome_b.title()}"
+    return f"{biome_b.title()} at {'+'.join(name for bit, name, _ in CORNERS if case & bit)}"
+
+
+def transition_table_entries(stats, biome_a, biome_b):
+    """{case: [(tile ID, placements)]} for one biome pair.
+
+    A biome_a tile gets the foreign corners as its case; a biome_b tile next
+    to biome_a gets the complement (its own corners are the biome_b ones).
+    """
+    cases = {}
+    a_rows = biome_rows(stats, [biome_a], [biome_b])
+    b_rows = biome_rows(stats, [biome_b], [biome_a])
+    case_of_a = CORNER_CASE[a_rows['mask']]
+    case_of_b = 15 ^ CORNER_CASE[b_rows['mask']]
+    for case in range(1, 15):
+        rows = np.concatenate([a_rows[case_of_a == case], b_rows[case_of_b == case]])
+        cases[case] = rank_tiles(rows)
+    cases[0] = rank_tiles(biome_rows(stats, [biome_a], [None]), 4)
+    cases[15] = rank_tiles(biome_rows(stats, [biome_b], [None]), 4)
+    return cases
+
+
+def write_transition_tables(stats, source, output_file):
+    """Replace the tile tables of transitionTiles8bit.js, keeping unseen cases and all logic"""
+    entry_pattern = re.compile(r'^[ \t]*(\d+):[ \t]*(\{.*\}),?[ \t]*(//.*)?$', re.M)
+    mined = 0
+    for const_name, biome_a, biome_b in TRANSITION_TABLES:
+        declaration = f"const {const_name} = "
+        previous = {int(case): (entry, comment) for case, entry, comment in
+                    entry_pattern.findall(literal_body(source, declaration))}
+        entries = transition_table_entries(stats, biome_a, biome_b)
+
+        lines = [declaration + '{']
+        for case in range(16):
+            tiles = entries[case]
+            if tiles:
+                ids = [hex_id(t) for t, _ in tiles]
+                entry = f"{{ id: '{ids[0]}', name: '{case_name(case, biome_a, biome_b)}'"
+                if len(ids) > 1 or case in (0, 15):
+                    entry += f", tiles: [{', '.join(repr(t) for t in ids)}]"
+                entry += ' }'
+                comment = f"// {sum(c for _, c in tiles)} placements"
+                mined += 1
+            elif case in previous:
+                entry, comment = previous[case]
+            else:
+                continue
+            line = f"    {f'{case}:':<3} {entry}{',' if case < 15 else ''}"
+            lines.append(f"{line}  {comment}" if comment else line)
+        lines.append('}')
+        source = replace_literal(source, declaration, '\n'.join(lines))
+
+    # Pure tiles per biome: the four most placed, for the 2×2 position pattern
+    declaration = 'const BIOME_TILES = '
+    lines = [declaration + '{']
+    for line in literal_body(source, declaration).strip('\n').split('\n'):
+        match = re.match(r'^\s*(\w+):', line)
+        biome = match.group(1) if match else None
+        tiles = rank_tiles(biome_rows(stats, [biome], [None]), 4) if biome in BIOME_INDEX else []
+        if tiles:
+            ids = ', '.join(repr(hex_id(t)) for t, _ in tiles)
+            line = f"    {biome}: [{ids}],  // {sum(c for _, c in tiles)} placements"
+        lines.append(line)
+    lines.append('}')
+    source = replace_literal(source, declaration, '\n'.join(lines))
+
+    output_file.write_text(source)
+    print(f"Generated {output_file} ({mined}/{16 * len(TRANSITION_TABLES)} cases from map usage)")
+
+
+def write_stats(stats, map_num, width, height, output_file):
+    """Raw frequency table: one row per (tile, foreign biome, mask)"""
+    order = np.lexsort((stats['mask'], stats['other'], stats['tile']))
+    rows = np.stack([stats[name][order].astype(np.int64)
+                     for name in ('tile', 'biome', 'other', 'mask', 'count')], axis=1)
+    payload = {
+        'map': map_num,
+        'width': width,
+        'height': height,
+        'biomes': list(BIOMES),
+        'noBiome': NO_BIOME,
+        'columns': ['tile', 'biome', 'other', 'mask', 'count'],
+        'rows': rows.tolist(),
+    }
+    with open(output_file, 'w') as f:
+        json.dump(payload, f, separators=(',', ':'))
+
+
+def main():
+    args = sys.argv[1:]
+    band_rows = DEFAULT_BAND_ROWS
+    if '--band-rows' in args:
+        i = args.index('--band-rows')
+        band_rows = int(args[i + 1])
+        del args[i:i + 2]
+    output_dir = JS_DATA_PATH
+    if '--output-dir' in args:
+        i = args.index('--output-dir')
+        output_dir = Path(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    map_num = int(args[0]) if args else 0
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    if not map_file.exists():
+        print(f"❌ {map_file} not found (convert the UOP first)")
+        sys.exit(1)
+
+    biome_lut = load_biome_lut()
+    print(f"Mining transitions from {map_file} ({width}×{height})...")
+    started = time.time()
+    with MapArray(map_file, width, height) as facet:
+        stats = mine_map(facet, biome_lut, band_rows)
+    elapsed = time.time() - started
+    edge_count = int(stats['count'][stats['other'] != NO_BIOME].sum())
+    print(f"✅ {width * height} tiles in {elapsed:.1f}s, {edge_count} next to another biome, "
+          f"{len(stats)} distinct (tile, biome, mask) entries")
+
+    STATS_PATH.mkdir(parents=True, exist_ok=True)
+    stats_file = STATS_PATH / f"transition_stats_map{map_num}.json"
+    write_stats(stats, map_num, width, height, stats_file)
+    print(f"Wrote {stats_file}")
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Shore tiles: land tiles with water on their edges, typed by the land biome
+    shore = biome_rows(stats, SHORE_LAND, ['water'])
+    write_grouped_mapping(group_by_edges(shore, lambda row: BIOMES[row['biome']].upper()),
+                          output_dir, 'embankTileMapping.js', 'EMBANK_TILE_MAPPING',
+                          "Embankment (Coast/Cliff) Tiles", "Embank")
+
+    # Rock edges: bits are non-rock neighbours, typed by that neighbour's biome
+    rock = biome_rows(stats, ['rock'], [name for name in BIOMES if name != 'rock'])
+    write_grouped_mapping(group_by_edges(rock, lambda row: BIOMES[row['other']].upper()),
+                          output_dir, 'rockTileMapping.js', 'ROCK_TILE_MAPPING',
+                          "Rock Transition Tiles", "Rock")
+
+    # Dirt with grass edges
+    dirt = biome_rows(stats, ['dirt'], ['grass'])
+    write_grouped_mapping(group_by_edges(dirt, lambda row: 'GRASS'),
+                          output_dir, 'dirtTileMapping.js', 'DIRT_TILE_MAPPING',
+                          "Dirt Transition Tiles", "Dirt")
+
+    write_sand_mapping(stats, (JS_DATA_PATH / 'sandTileMapping.js').read_text(),
+                       output_dir / 'sandTileMapping.js')
+    write_grass_tiles(stats, (JS_DATA_PATH / 'grassTileMapping.js').read_text(),
+                      output_dir / 'grassTileMapping.js')
+    write_transition_tables(stats, (JS_DATA_PATH / 'transitionTiles8bit.js').read_text(),
+                            output_dir / 'transitionTiles8bit.js')
+
+
+if __name__ == '__main__':
+    main()
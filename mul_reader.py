@@ -0,0 +1,88 @@
+"""
+Classic MUL index reader
+Memory-maps an idx/mul pair (artidx.mul + art.mul, staidx#.mul + statics#.mul, ...)
+and reads entries by ID. The idx file is parsed once as a structured array.
+
+Usage:
+    with MulArchive('Ultima Online Classic/artidx.mul', 'Ultima Online Classic/art.mul') as art:
+        data = art.read_entry(0x4000 + 0x0CDA)
+"""
+
+import mmap
+from pathlib import Path
+
+import numpy as np
+
+# One 12-byte idx record: lookup offset, length, extra (-1 / 0xFFFFFFFF = no entry)
+MUL_INDEX_DTYPE = np.dtype([
+    ('offset', '<u4'),
+    ('length', '<u4'),
+    ('extra', '<u4'),
+])
+
+MUL_NO_ENTRY = 0xFFFFFFFF
+
+
+class MulArchive:
+    """Read-only, memory-mapped idx/mul pair"""
+
+    def __init__(self, idx_path, mul_path):
+        self.idx_path = Path(idx_path)
+        self.filepath = Path(mul_path)
+        self.index = np.fromfile(self.idx_path, dtype=MUL_INDEX_DTYPE)
+        self._file = open(self.filepath, 'rb')
+        if self.filepath.stat().st_size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mm)
+        else:
+            self._mm = None
+            self._view = memoryview(b'')
+
+        size = len(self._view)
+        offsets = self.index['offset'].astype(np.int64)
+        lengths = self.index['length'].astype(np.int64)
+        self.valid = ((offsets != MUL_NO_ENTRY) & (lengths != MUL_NO_ENTRY)
+                      & (lengths > 0) & (offsets + lengths <= size))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, entry_id):
+        return 0 <= entry_id < len(self.index) and bool(self.valid[entry_id])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping and the file handle"""
+        if self._file is None:
+            return
+        self._view.release()
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except BufferError:
+                # A caller still holds a zero-copy view
+                pass
+        self._file.close()
+        self._file = None
+
+    def entry_ids(self):
+        """IDs that have data"""
+        return np.flatnonzero(self.valid)
+
+    def entry_length(self, entry_id):
+        """Stored length of an entry, 0 if absent"""
+        if entry_id not in self:
+            return 0
+        return int(self.index['length'][entry_id])
+
+    def read_entry(self, entry_id):
+        """Zero-copy view of an entry's bytes, or None if absent"""
+        if entry_id not in self:
+            return None
+        start = int(self.index['offset'][entry_id])
+        return self._view[start:start + int(self.index['length'][entry_id])]
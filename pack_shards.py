@@ -0,0 +1,188 @@
+"""
+Shard Pack Builder
+Packs art entries or map blocks into fixed-size shard files plus a compact
+binary index, so the browser can fetch only the art IDs and map blocks in view
+(HTTP Range requests or per-shard fetches) instead of the whole archive.
+
+Run:
+    python pack_shards.py art [--shard-size MB]
+    python pack_shards.py map <map_number> [--shard-size MB]
+Output: assets/packs/<art|map#>/index.bin + shard_000.bin, shard_001.bin, ...
+
+Index layout (little-endian), read by js/modules/shardPackLoader.js:
+    char[4]  magic 'UOSP'
+    uint16   version
+    uint16   kind (1 = art entries, 2 = map blocks)
+    uint32   entry count
+    uint32   shard count
+    uint32   record size (0 = variable, entry_starts follows)
+    uint32   shard_starts[shard count + 1]   global byte offset of each shard
+    uint32   entry_starts[entry count + 1]   only when record size is 0
+Entry i spans global bytes [entry_starts[i], entry_starts[i + 1]) (empty when
+equal) or [i * record size, (i + 1) * record size). Entries never straddle
+shards, so one Range request on one shard returns one entry.
+"""
+
+from pathlib import Path
+import mmap
+import struct
+import sys
+
+import numpy as np
+
+from mul_reader import MulArchive
+from uop_reader import ART_ENTRY, UOPArchive
+
+UO_PATH = Path('Ultima Online Classic')
+MUL_PATH = Path('assets/mul')
+PACKS_PATH = Path('assets/packs')
+
+PACK_MAGIC = b'UOSP'
+PACK_VERSION = 1
+PACK_KIND_ART = 1
+PACK_KIND_MAP = 2
+PACK_HEADER = struct.Struct('<4sHHIII')
+
+ART_COUNT = 0x14000  # land 0x0000-0x3FFF + statics 0x4000-0x13FFF
+MAP_BLOCK_SIZE = 196
+DEFAULT_SHARD_SIZE = 1024 * 1024
+
+
+class ShardWriter:
+    """Writes entries into shard files no larger than shard_size (unless a
+    single entry is bigger), tracking global offsets for the index"""
+
+    def __init__(self, output_dir, shard_size=DEFAULT_SHARD_SIZE):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for old in self.output_dir.glob('shard_*.bin'):
+            old.unlink()
+        self.shard_size = shard_size
+        self.shard_starts = [0]
+        self.position = 0
+        self.shard_fill = 0
+        self._file = None
+        self._open_shard()
+
+    def _open_shard(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.output_dir / f"shard_{len(self.shard_starts) - 1:03d}.bin", 'wb')
+        self.shard_fill = 0
+
+    def add(self, data):
+        """Append one entry, returns its global start offset"""
+        if self.shard_fill and self.shard_fill + len(data) > self.shard_size:
+            self.shard_starts.append(self.position)
+            self._open_shard()
+        start = self.position
+        self._file.write(data)
+        self.position += len(data)
+        self.shard_fill += len(data)
+        return start
+
+    def close(self):
+        """Finish the last shard; returns shard start offsets (count + 1)"""
+        self._file.close()
+        return np.asarray(self.shard_starts + [self.position], dtype='<u4')
+
+
+def write_index(output_dir, kind, count, shard_starts, entry_starts=None, record_size=0):
+    """Write index.bin for a finished pack"""
+    with open(Path(output_dir) / 'index.bin', 'wb') as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, kind, count,
+                                 len(shard_starts) - 1, record_size))
+        f.write(shard_starts.astype('<u4').tobytes())
+        if record_size == 0:
+            f.write(np.asarray(entry_starts, dtype='<u4').tobytes())
+
+
+def open_art_source():
+    """Open the art source: (archive, iterator of (art id, data or None))"""
+    uop_file = UO_PATH / 'artLegacyMUL.uop'
+    if uop_file.exists():
+        archive = UOPArchive(uop_file)
+        rows = archive.rows_for(ART_ENTRY, ART_COUNT)
+        # Entries are decoded on the archive's thread pool, in ID order
+        entries = archive.iter_rows((None if row < 0 else int(row)) for row in rows)
+        return archive, ((art_id, data) for art_id, (_, data) in enumerate(entries))
+
+    idx_file, mul_file = UO_PATH / 'artidx.mul', UO_PATH / 'art.mul'
+    if idx_file.exists() and mul_file.exists():
+        archive = MulArchive(idx_file, mul_file)
+        count = min(ART_COUNT, len(archive))
+        return archive, ((art_id, archive.read_entry(art_id)) for art_id in range(count))
+
+    raise FileNotFoundError(f"No artLegacyMUL.uop or art.mul/artidx.mul in {UO_PATH}")
+
+
+def pack_art(shard_size=DEFAULT_SHARD_SIZE):
+    """Pack every art entry (decompressed) by art ID"""
+    output_dir = PACKS_PATH / 'art'
+    archive, entries = open_art_source()
+    print(f"Packing art from {archive.filepath.name} -> {output_dir}")
+
+    writer = ShardWriter(output_dir, shard_size)
+    entry_starts = np.zeros(ART_COUNT + 1, dtype=np.int64)
+    present = 0
+    art_id = -1
+    try:
+        for art_id, data in entries:
+            entry_starts[art_id] = writer.position
+            if data:
+                writer.add(data)
+                present += 1
+            if (art_id + 1) % 0x1000 == 0:
+                print(f"  {art_id + 1}/{ART_COUNT} IDs ({writer.position / 1024 / 1024:.1f} MB)", end='\r')
+        # IDs past the end of a short source are empty
+        entry_starts[art_id + 1:] = writer.position
+    finally:
+        shard_starts = writer.close()
+        archive.close()
+
+    write_index(output_dir, PACK_KIND_ART, ART_COUNT, shard_starts, entry_starts)
+    print(f"\n✅ {present} art entries in {len(shard_starts) - 1} shards "
+          f"({writer.position / 1024 / 1024:.1f} MB)")
+
+
+def pack_map(map_num, shard_size=DEFAULT_SHARD_SIZE):
+    """Pack map#.mul into shards of whole 196-byte blocks"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    output_dir = PACKS_PATH / f"map{map_num}"
+    if not map_file.exists():
+        raise FileNotFoundError(f"{map_file} not found (convert the UOP first)")
+
+    print(f"Packing {map_file} -> {output_dir}")
+    blocks_per_shard = max(1, shard_size // MAP_BLOCK_SIZE)
+    writer = ShardWriter(output_dir, blocks_per_shard * MAP_BLOCK_SIZE)
+
+    with open(map_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        block_count = len(mm) // MAP_BLOCK_SIZE
+        step = blocks_per_shard * MAP_BLOCK_SIZE
+        for start in range(0, block_count * MAP_BLOCK_SIZE, step):
+            writer.add(mm[start:min(start + step, block_count * MAP_BLOCK_SIZE)])
+
+    shard_starts = writer.close()
+    write_index(output_dir, PACK_KIND_MAP, block_count, shard_starts, record_size=MAP_BLOCK_SIZE)
+    print(f"✅ {block_count} blocks in {len(shard_starts) - 1} shards")
+
+
+def main():
+    args = sys.argv[1:]
+    shard_size = DEFAULT_SHARD_SIZE
+    if '--shard-size' in args:
+        i = args.index('--shard-size')
+        shard_size = int(float(args[i + 1]) * 1024 * 1024)
+        del args[i:i + 2]
+
+    if args[:1] == ['art']:
+        pack_art(shard_size)
+    elif args[:1] == ['map']:
+        pack_map(int(args[1]) if len(args) > 1 else 0, shard_size)
+    else:
+        print("Usage: python pack_shards.py art|map [map_number] [--shard-size MB]")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
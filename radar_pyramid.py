@@ -0,0 +1,215 @@
+"""
+Radar Map Pyramid
+Renders every facet through the radarcol.mul colour table into a zoomable
+pyramid of PNG tiles (slippy-map style), for looking at whole facets without
+starting the client.
+
+Level 0 is 1 pixel per map tile; each following level halves the size by
+averaging 2×2 pixels, down to a level that fits in a single tile.
+
+Run: python radar_pyramid.py [map_number ...|all] [--statics] [--tile-size N] [--workers N] [--size WIDTHxHEIGHT]
+Output: assets/radar/map#/index.json + <level>/<x>_<y>.png
+
+radarcol.mul is a flat array of RGB555 colours: entries 0x0000-0x3FFF are
+land tiles, entries from 0x4000 are statics (0x4000 + graphic). With
+--statics, the topmost static standing on a tile colours it instead of the
+land, as on the client's radar. mapdif/stadif/verdata patches in assets/mul
+are applied to both (map_patches.py).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+from statics_index import StaticsIndex
+
+MUL_PATH = Path('assets/mul')
+RADAR_PATH = Path('assets/radar')
+
+RADAR_STATIC_OFFSET = 0x4000
+DEFAULT_TILE_SIZE = 256
+PNG_COMPRESS_LEVEL = 3  # zlib level: 6+ is several times slower for ~5% smaller tiles
+
+
+def load_radar_palette(path):
+    """radarcol.mul as an (entries, 3) uint8 RGB table"""
+    colors = np.fromfile(path, dtype='<u2')
+    palette = np.empty((len(colors), 3), dtype=np.uint8)
+    # RGB555 -> RGB888, low bits filled from the high ones so 0x1F maps to 255
+    for channel, shift in enumerate((10, 5, 0)):
+        value = (colors >> shift) & 0x1F
+        palette[:, channel] = (value << 3) | (value >> 2)
+    return palette
+
+
+def top_statics(statics, land_z):
+    """(radar index per tile or -1, as a [y, x] int32 raster) of the topmost static on each tile.
+
+    Statics below the land surface are ignored; on equal Z the later record wins.
+    """
+    height, width = land_z.shape
+    items = statics.query(0, 0, width, height)
+    tiles = items['world_y'].astype(np.int64) * width + items['world_x']
+    z = items['z'].astype(np.int16)
+    visible = z >= land_z.reshape(-1)[tiles]
+    tiles, z, graphics = tiles[visible], z[visible], items['graphic'][visible]
+
+    # Sort by tile then Z (stable, so file order breaks ties); the last of each tile is on top
+    order = np.lexsort((z, tiles))
+    tiles = tiles[order]
+    last = np.r_[tiles[1:] != tiles[:-1], True]
+    top = np.full(width * height, -1, dtype=np.int32)
+    top[tiles[last]] = RADAR_STATIC_OFFSET + graphics[order][last].astype(np.int32)
+    return top.reshape(height, width)
+
+
+def render_radar(facet, palette, statics=None):
+    """Whole facet as a [y, x, 3] RGB image, one palette lookup per pixel"""
+    tile_ids, land_z = facet.region(0, 0, facet.width, facet.height)
+    index = tile_ids.astype(np.int32)
+    if statics is not None:
+        top = top_statics(statics, land_z)
+        # Graphics past the end of an older radarcol.mul keep the land colour
+        use_static = (top >= 0) & (top < len(palette))
+        index = np.where(use_static, top, index)
+    return palette[np.minimum(index, len(palette) - 1)]
+
+
+def downsample(image):
+    """Half-size image by averaging 2×2 pixels (odd edges are repeated)"""
+    height, width = image.shape[:2]
+    if height % 2 or width % 2:
+        image = np.pad(image, ((0, height % 2), (0, width % 2), (0, 0)), mode='edge')
+    height, width = image.shape[:2]
+    blocks = image.reshape(height // 2, 2, width // 2, 2, 3).astype(np.uint16)
+    return ((blocks.sum(axis=(1, 3)) + 2) >> 2).astype(np.uint8)
+
+
+def write_tile_row(task):
+    """Write the PNG tiles of one row of a level; returns bytes written"""
+    output_dir, level, ty, tile_size, strip = task
+    total = 0
+    for tx in range(-(-strip.shape[1] // tile_size)):
+        path = output_dir / str(level) / f"{tx}_{ty}.png"
+        Image.fromarray(strip[:, tx * tile_size:(tx + 1) * tile_size]).save(
+            path, compress_level=PNG_COMPRESS_LEVEL)
+        total += path.stat().st_size
+    return total
+
+
+def build_pyramid(map_num, with_statics=False, tile_size=DEFAULT_TILE_SIZE, workers=None, map_size=None):
+    """Render one facet and write every pyramid level plus index.json"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    radar_file = MUL_PATH / 'radarcol.mul'
+    for path in (map_file, radar_file):
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found")
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    started = time.time()
+    palette = load_radar_palette(radar_file)
+    patches = MapPatches.load(MUL_PATH, map_num, map_width, map_height)
+    if patches is not None:
+        print(f"  Applying {patches.land_count} land / {patches.statics_count} statics patched blocks")
+    statics = None
+    if with_statics:
+        staidx_file = MUL_PATH / f"staidx{map_num}.mul"
+        statics_file = MUL_PATH / f"statics{map_num}.mul"
+        if staidx_file.exists() and statics_file.exists():
+            statics = StaticsIndex.from_mul(staidx_file, statics_file, map_width, map_height, patches)
+        else:
+            print(f"  ⚠️ {statics_file} not found, rendering land only")
+    print(f"Rendering map {map_num} ({map_width}×{map_height}, {len(palette)} radar colours)"
+          f"{' with statics' if statics is not None else ''}")
+    with MapArray(map_file, map_width, map_height, patches) as facet:
+        image = render_radar(facet, palette, statics)
+
+    output_dir = RADAR_PATH / f"map{map_num}"
+    levels = []
+    tasks = []
+    while True:
+        level = len(levels)
+        height, width = image.shape[:2]
+        (output_dir / str(level)).mkdir(parents=True, exist_ok=True)
+        for old in (output_dir / str(level)).glob('*.png'):
+            old.unlink()
+        columns, rows = -(-width // tile_size), -(-height // tile_size)
+        levels.append({'level': level, 'scale': 2 ** level, 'width': width, 'height': height,
+                       'columns': columns, 'rows': rows})
+        tasks += [(output_dir, level, ty, tile_size, image[ty * tile_size:(ty + 1) * tile_size])
+                  for ty in range(rows)]
+        if columns == 1 and rows == 1:
+            break
+        image = downsample(image)
+
+    total_bytes = 0
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, size in enumerate(pool.map(write_tile_row, tasks), 1):
+            total_bytes += size
+            print(f"  Tile row {i}/{len(tasks)}", end='\r')
+    print()
+
+    directory = {
+        'map': map_num,
+        'width': map_width,
+        'height': map_height,
+        'tileSize': tile_size,
+        'statics': statics is not None,
+        'file': '{level}/{x}_{y}.png',
+        'levels': levels,
+    }
+    with open(output_dir / 'index.json', 'w') as f:
+        json.dump(directory, f)
+
+    tile_count = sum(level['columns'] * level['rows'] for level in levels)
+    print(f"✅ {len(levels)} levels, {tile_count} tiles, {total_bytes / 1024 / 1024:.1f} MB "
+          f"in {time.time() - started:.1f}s -> {output_dir}")
+
+
+def main():
+    args = sys.argv[1:]
+    with_statics = '--statics' in args
+    if with_statics:
+        args.remove('--statics')
+    tile_size = DEFAULT_TILE_SIZE
+    if '--tile-size' in args:
+        i = args.index('--tile-size')
+        tile_size = int(args[i + 1])
+        del args[i:i + 2]
+    workers = None
+    if '--workers' in args:
+        i = args.index('--workers')
+        workers = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+
+    if args == ['all']:
+        map_nums = [num for num in MAP_SIZES if (MUL_PATH / f"map{num}.mul").exists()]
+    else:
+        map_nums = [int(arg) for arg in args] or [0]
+
+    started = time.time()
+    for map_num in map_nums:
+        try:
+            build_pyramid(map_num, with_statics, tile_size, workers, map_size)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+    if len(map_nums) > 1:
+        print(f"✅ {len(map_nums)} facets in {time.time() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+"""
+Static Art Atlas Builder
+Packs the static art a map area or the biome profiles use into a few
+power-of-two atlas pages, so the renderer can bind one texture per page and
+draw every static on it in one batch instead of one texture per graphic.
+Read by js/modules/staticAtlasLoader.js.
+
+Graphics are decoded (art_decoder.py), trimmed to their opaque bounding box,
+deduplicated (identical art shares one rectangle) and packed tallest first
+with MaxRects, best-short-side-fit, each onto the first page with room.
+Every page is then shrunk to the smallest power of two that holds it.
+
+Run: python static_atlas.py NAME [--region X,Y,WIDTH,HEIGHT [--map N] [--size WIDTHxHEIGHT]]
+                                 [--biomes] [--ids 0x0CCA,0x0CCB,...] [--page-size N] [--no-cache]
+Output: assets/sprites/atlas/NAME_#.png + NAME.json
+
+    --region   statics inside a rectangle of a facet (assets/mul, patches applied)
+    --biomes   every graphic in the biome profiles of js/modules/biomeStaticPlacer.js
+    --ids      explicit graphic IDs
+Sources can be combined; the union is packed. Decoded art goes through the
+shared asset_cache.py cache unless --no-cache is given.
+
+NAME.json:
+    {
+      "version": 1, "padding": 1,
+      "pages": [{"file": "NAME_0.png", "width": 1024, "height": 512}, ...],
+      "sprites": {"0x0CCA": [page, x, y, width, height, offsetX, offsetY, artWidth, artHeight], ...}
+    }
+(x, y, width, height) is the trimmed rectangle in the page; (offsetX, offsetY)
+is where it sits inside the untrimmed artWidth×artHeight art.
+"""
+
+from pathlib import Path
+import json
+import re
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+
+from arena_export import covered_blocks
+from art_decoder import (DECODER_VERSION, STATIC_ART_OFFSET, art_entries, decode_static_arts,
+                         open_art_archive, read_art, to_rgba)
+from asset_cache import AssetCache
+from map_array import MAP_SIZES
+from map_patches import MapPatches
+from statics_index import StaticsIndex
+
+MUL_PATH = Path('assets/mul')
+SPRITE_ATLAS_PATH = Path('assets/sprites/atlas')
+BIOME_PLACER_FILE = Path('js/modules/biomeStaticPlacer.js')
+
+ATLAS_VERSION = 1
+PADDING = 1
+DEFAULT_PAGE_SIZE = 2048
+PNG_COMPRESS_LEVEL = 3  # zlib level 9 is several times slower for a few percent
+GRAPHIC_PATTERN = re.compile(r'\b(?:graphic|fallbackGraphic)\s*:\s*(0x[0-9A-Fa-f]+|\d+)')
+
+
+class MaxRectsPage:
+    """One page of a MaxRects packer; free rectangles are (x, y, width, height) rows"""
+
+    def __init__(self, size):
+        self.size = size
+        self.free = np.array([[0, 0, size, size]], dtype=np.int64)
+        self.used_width = 0
+        self.used_height = 0
+
+    def find(self, width, height):
+        """(x, y) with the best short side fit, or None if the rectangle does not fit"""
+        fits = (self.free[:, 2] >= width) & (self.free[:, 3] >= height)
+        if not fits.any():
+            return None
+        candidates = self.free[fits]
+        leftover_w = candidates[:, 2] - width
+        leftover_h = candidates[:, 3] - height
+        short_side = np.minimum(leftover_w, leftover_h)
+        long_side = np.maximum(leftover_w, leftover_h)
+        best = np.lexsort((long_side, short_side))[0]
+        return int(candidates[best, 0]), int(candidates[best, 1])
+
+    def place(self, x, y, width, height):
+        """Carve a placed rectangle out of the free rectangles"""
+        free = self.free
+        fx, fy, fw, fh = free.T
+        hit = (x < fx + fw) & (x + width > fx) & (y < fy + fh) & (y + height > fy)
+        kept, split = free[~hit], free[hit]
+        sx, sy, sw, sh = split.T
+        pieces = np.concatenate([
+            np.stack([sx, sy, x - sx, sh], axis=1),                                # left
+            np.stack([np.full_like(sx, x + width), sy, sx + sw - x - width, sh], axis=1),  # right
+            np.stack([sx, sy, sw, y - sy], axis=1),                                # above
+            np.stack([sx, np.full_like(sy, y + height), sw, sy + sh - y - height], axis=1),  # below
+        ])
+        pieces = pieces[(pieces[:, 2] > 0) & (pieces[:, 3] > 0)]
+        self.free = self._prune(np.concatenate([kept, pieces]))
+        self.used_width = max(self.used_width, x + width)
+        self.used_height = max(self.used_height, y + height)
+
+    @staticmethod
+    def _prune(free):
+        """Drop free rectangles contained in another one (keeping one of any duplicates)"""
+        x, y, w, h = (free[:, i][:, None] for i in range(4))
+        ox, oy, ow, oh = (free[:, i][None, :] for i in range(4))
+        # inside[i, j]: rectangle i lies within rectangle j
+        inside = (x >= ox) & (y >= oy) & (x + w <= ox + ow) & (y + h <= oy + oh)
+        np.fill_diagonal(inside, False)
+        same = inside & inside.T
+        # Of two identical rectangles only the later one is dropped
+        inside &= ~(same & np.tri(len(free), k=-1, dtype=bool).T)
+        return free[~inside.any(axis=1)]
+
+
+def next_power_of_two(value):
+    return 1 << max(0, int(value - 1).bit_length())
+
+
+def pack_rects(sizes, page_size):
+    """(page, x, y) per (width, height), tallest first; pages fill in order"""
+    order = np.lexsort((-sizes[:, 0], -sizes[:, 1]))
+    placements = np.zeros((len(sizes), 3), dtype=np.int64)
+    pages = []
+    for i in order:
+        width, height = int(sizes[i, 0]), int(sizes[i, 1])
+        if width > page_size or height > page_size:
+            raise ValueError(f"A {width}×{height} sprite does not fit a {page_size}px page")
+        for page_num, page in enumerate(pages):
+            spot = page.find(width, height)
+            if spot is not None:
+                break
+        else:
+            pages.append(MaxRectsPage(page_size))
+            page_num, page = len(pages) - 1, pages[-1]
+            spot = page.find(width, height)
+        page.place(spot[0], spot[1], width, height)
+        placements[i] = (page_num, spot[0], spot[1])
+    return placements, pages
+
+
+def region_graphics(rect, map_num=0, map_size=None):
+    """Graphics of the statics inside a rectangle of a facet"""
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+    staidx_file, statics_file = MUL_PATH / f"staidx{map_num}.mul", MUL_PATH / f"statics{map_num}.mul"
+    if not (staidx_file.exists() and statics_file.exists()):
+        raise FileNotFoundError(f"{staidx_file} / {statics_file} not found")
+    patches = MapPatches.load(MUL_PATH, map_num, width, height)
+    statics = StaticsIndex.from_mul(staidx_file, statics_file, width, height, patches,
+                                    blocks=covered_blocks([rect], width, height))
+    return np.unique(statics.query(*rect)['graphic'])
+
+
+def biome_graphics(path=BIOME_PLACER_FILE):
+    """Graphics named in the biome profiles: biomeStaticPlacer.getAllGraphicIds() plus prefab fallbacks"""
+    text = Path(path).read_text(encoding='utf-8')
+    return np.unique([int(value, 0) for value in GRAPHIC_PATTERN.findall(text)])
+
+
+def build_static_atlas(name, graphics, page_size=DEFAULT_PAGE_SIZE, cache=None):
+    """Decode (through an AssetCache if given), trim, pack and write the pages and NAME.json"""
+    graphics = np.unique(np.asarray(graphics, dtype=np.int64))
+    art_ids = STATIC_ART_OFFSET + graphics
+    archive = open_art_archive() if cache is not None else None
+    if archive is not None:
+        # Cached art is found from the archive index, without reading the entries
+        with archive:
+            canvases = cache.get_or_decode_many(archive, art_entries(archive, art_ids), 'static_art',
+                                                DECODER_VERSION, decode_static_arts)
+    else:
+        canvases = decode_static_arts(read_art(art_ids.tolist()))
+
+    # Trim; identical trimmed art is stored once
+    sprites = {}
+    unique_art = {}
+    images = []
+    for graphic, canvas in zip(graphics.tolist(), canvases):
+        if canvas is None:
+            continue
+        rows, cols = np.flatnonzero(canvas.any(axis=1)), np.flatnonzero(canvas.any(axis=0))
+        if len(rows) == 0:
+            continue
+        trimmed = canvas[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        key = (trimmed.shape, trimmed.tobytes())
+        if key not in unique_art:
+            unique_art[key] = len(images)
+            images.append(trimmed)
+        sprites[graphic] = (unique_art[key], int(cols[0]), int(rows[0]), canvas.shape[1], canvas.shape[0])
+    print(f"  {len(sprites)} of {len(graphics)} graphics have art, {len(images)} unique after trimming")
+    if not images:
+        raise ValueError("No static art to pack")
+
+    sizes = np.array([(image.shape[1] + 2 * PADDING, image.shape[0] + 2 * PADDING) for image in images])
+    placements, pages = pack_rects(sizes, page_size)
+
+    SPRITE_ATLAS_PATH.mkdir(parents=True, exist_ok=True)
+    for old in SPRITE_ATLAS_PATH.glob(f"{name}_*.png"):
+        old.unlink()
+    manifest = {'version': ATLAS_VERSION, 'padding': PADDING, 'pages': [], 'sprites': {}}
+    for page_num, page in enumerate(pages):
+        width, height = next_power_of_two(page.used_width), next_power_of_two(page.used_height)
+        canvas = np.zeros((height, width), dtype=np.uint16)
+        for i in np.flatnonzero(placements[:, 0] == page_num):
+            _, x, y = placements[i]
+            image = images[i]
+            canvas[y + PADDING:y + PADDING + image.shape[0], x + PADDING:x + PADDING + image.shape[1]] = image
+        file_name = f"{name}_{page_num}.png"
+        Image.fromarray(to_rgba(canvas), 'RGBA').save(SPRITE_ATLAS_PATH / file_name,
+                                                      compress_level=PNG_COMPRESS_LEVEL)
+        manifest['pages'].append({'file': file_name, 'width': width, 'height': height})
+
+    for graphic, (image_num, offset_x, offset_y, art_width, art_height) in sprites.items():
+        page_num, x, y = placements[image_num].tolist()
+        image = images[image_num]
+        manifest['sprites'][f"0x{graphic:04X}"] = [page_num, x + PADDING, y + PADDING, image.shape[1],
+                                                   image.shape[0], offset_x, offset_y, art_width, art_height]
+    with open(SPRITE_ATLAS_PATH / f"{name}.json", 'w') as f:
+        json.dump(manifest, f)
+
+    packed = int(sizes.prod(axis=1).sum())
+    area = sum(page['width'] * page['height'] for page in manifest['pages'])
+    page_sizes = ', '.join(f"{page['width']}×{page['height']}" for page in manifest['pages'])
+    print(f"  {len(pages)} page(s) {page_sizes}, {packed / area:.0%} filled")
+    return manifest
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for flag in ('--region', '--map', '--size', '--ids', '--page-size'):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            del args[i:i + 2]
+    use_biomes = '--biomes' in args
+    if use_biomes:
+        args.remove('--biomes')
+    use_cache = '--no-cache' not in args
+    if not use_cache:
+        args.remove('--no-cache')
+
+    if not args or not ('--region' in options or '--ids' in options or use_biomes):
+        print("Usage: python static_atlas.py NAME [--region X,Y,WIDTH,HEIGHT [--map N]] [--biomes] [--ids 0x0CCA,...]")
+        sys.exit(1)
+    name = args[0]
+
+    graphics = []
+    if '--region' in options:
+        rect = tuple(int(v) for v in options['--region'].split(','))
+        map_size = tuple(int(v) for v in options['--size'].lower().split('x')) if '--size' in options else None
+        graphics.append(region_graphics(rect, int(options.get('--map', 0)), map_size))
+    if use_biomes:
+        graphics.append(biome_graphics())
+    if '--ids' in options:
+        graphics.append(np.array([int(v, 0) for v in options['--ids'].split(',')]))
+
+    print(f"Building static atlas '{name}' -> {SPRITE_ATLAS_PATH}")
+    started = time.time()
+    cache = AssetCache() if use_cache else None
+    manifest = build_static_atlas(name, np.concatenate(graphics),
+                                  int(options.get('--page-size', DEFAULT_PAGE_SIZE)), cache)
+    print(f"✅ {len(manifest['sprites'])} sprites in {len(manifest['pages'])} page(s) "
+          f"in {time.time() - started:.1f}s")
+    if cache is not None:
+        print(f"   {cache.report()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+"""
+Statics Index
+Converts staidx#.mul + statics#.mul into CSR-style arrays: one offset per map
+block plus packed graphic / x / y / z / hue columns, so a block lookup is two
+array reads and a rectangle query is a handful of vectorized gathers.
+
+Run: python statics_index.py [map_number] [--size WIDTHxHEIGHT]
+Output: assets/mul/statics#.idx.bin (compact export, see below)
+
+Usage:
+    statics = StaticsIndex.from_mul('assets/mul/staidx0.mul', 'assets/mul/statics0.mul')
+    items = statics.query(1000, 1500, 64, 64)    # x, y, width, height
+    items['graphic'], items['world_x'], items['world_y'], items['z']
+
+Compact export (little-endian):
+    char[4]  magic 'UOSI'
+    uint16   version, uint16 reserved
+    uint32   width, height (tiles), block count, static count
+    uint32   offsets[block count + 1]    first record of each block
+    record   statics[static count]       7 bytes: u16 graphic, u8 x, u8 y, i8 z, u16 hue
+Blocks are in map order (column-major, bx * blocks_y + by) and every block's
+records are contiguous, so a column of blocks is one HTTP Range request.
+"""
+
+from pathlib import Path
+import struct
+import sys
+
+import numpy as np
+
+from array_utils import gather_ranges
+from map_array import MAP_SIZES
+from mul_reader import MUL_INDEX_DTYPE, MUL_NO_ENTRY
+
+MUL_PATH = Path('assets/mul')
+
+# One 7-byte statics#.mul record; x/y are 0-7 within the block
+STATIC_RECORD_DTYPE = np.dtype([
+    ('graphic', '<u2'),
+    ('x', 'u1'),
+    ('y', 'u1'),
+    ('z', 'i1'),
+    ('hue', '<u2'),
+])
+
+# Query results carry world coordinates as well
+STATIC_QUERY_DTYPE = np.dtype([
+    ('graphic', '<u2'),
+    ('world_x', '<u2'),
+    ('world_y', '<u2'),
+    ('z', 'i1'),
+    ('hue', '<u2'),
+])
+
+STATICS_INDEX_MAGIC = b'UOSI'
+STATICS_INDEX_VERSION = 1
+STATICS_INDEX_HEADER = struct.Struct('<4sHHIIII')
+
+
+def read_static_blocks(index, data):
+    """(offsets, records) CSR of the blocks an idx array points at in statics data.
+
+    Blocks running past the end of the data are clipped and records with
+    graphic 0 or 0xFFFF are dropped.
+    """
+    block_count = len(index)
+    positions = index['offset'].astype(np.int64)
+    sizes = index['length'].astype(np.int64)
+    valid = (positions != MUL_NO_ENTRY) & (sizes != MUL_NO_ENTRY) & (sizes > 0)
+    counts = np.where(valid, sizes // STATIC_RECORD_DTYPE.itemsize, 0)
+    # Clip blocks that run past the end of statics#.mul
+    available = np.maximum((len(data) - positions) // STATIC_RECORD_DTYPE.itemsize, 0)
+    counts = np.minimum(counts, np.where(valid, available, 0))
+
+    # Byte offset of every record, then one gather of 7 bytes each.
+    # Positions need not be multiples of 7, so records are not read as one view.
+    record_starts = np.repeat(positions, counts) + \
+        (gather_ranges(np.zeros(block_count, dtype=np.int64), counts) * STATIC_RECORD_DTYPE.itemsize)
+    raw = data[record_starts[:, None] + np.arange(STATIC_RECORD_DTYPE.itemsize)]
+    records = raw.reshape(-1).view(STATIC_RECORD_DTYPE)
+
+    keep = (records['graphic'] != 0) & (records['graphic'] != 0xFFFF)
+    block_of_record = np.repeat(np.arange(block_count), counts)
+    kept_counts = np.bincount(block_of_record[keep], minlength=block_count)
+
+    offsets = np.zeros(block_count + 1, dtype=np.int64)
+    np.cumsum(kept_counts, out=offsets[1:])
+    return offsets, np.ascontiguousarray(records[keep])
+
+
+class StaticsIndex:
+    """CSR statics for one facet: offsets[block] .. offsets[block + 1] index the columns"""
+
+    def __init__(self, width, height, offsets, records):
+        self.width = width
+        self.height = height
+        self.blocks_x = width // 8
+        self.blocks_y = height // 8
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.records = records
+        if len(self.offsets) != self.blocks_x * self.blocks_y + 1:
+            raise ValueError(f"{len(self.offsets) - 1} blocks do not match a {width}×{height} map")
+
+    @classmethod
+    def from_mul(cls, staidx_path, statics_path, width=7168, height=4096, patches=None, blocks=None):
+        """Build the index from staidx#.mul + statics#.mul.
+
+        Records with graphic 0 or 0xFFFF are dropped, as the client does.
+        With a map_patches.MapPatches, patched blocks replace the base ones.
+        With `blocks` (map-order indices), the files are memory-mapped and
+        only those blocks are read; the others are left empty.
+        """
+        if blocks is None:
+            index = np.fromfile(staidx_path, dtype=MUL_INDEX_DTYPE)
+            data = np.fromfile(statics_path, dtype=np.uint8)
+        else:
+            index = np.memmap(staidx_path, dtype=MUL_INDEX_DTYPE, mode='r')
+            data = np.memmap(statics_path, dtype=np.uint8, mode='r') if Path(statics_path).stat().st_size \
+                else np.zeros(0, dtype=np.uint8)
+        block_count = (width // 8) * (height // 8)
+        if len(index) < block_count:
+            # Short index files leave the trailing blocks empty
+            padded = np.zeros(block_count, dtype=MUL_INDEX_DTYPE)
+            padded['offset'] = MUL_NO_ENTRY
+            padded[:len(index)] = index
+            index = padded
+        index = index[:block_count]
+        if blocks is not None:
+            selected = np.zeros(block_count, dtype=MUL_INDEX_DTYPE)
+            selected['offset'] = MUL_NO_ENTRY
+            selected[blocks] = index[blocks]
+            index = selected
+        offsets, records = read_static_blocks(index, data)
+
+        if patches is not None and patches.statics_count:
+            # Patched blocks point into the patch records, appended after the base ones
+            override = patches.statics_override
+            starts = np.where(override >= 0, patches.statics_offsets[override] + len(records), offsets[:-1])
+            counts = np.where(override >= 0, np.diff(patches.statics_offsets)[override], np.diff(offsets))
+            records = np.concatenate([records, patches.statics_records])[gather_ranges(starts, counts)]
+            offsets = np.zeros(block_count + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+        return cls(width, height, offsets, np.ascontiguousarray(records))
+
+    @classmethod
+    def load(cls, path):
+        """Load a compact export written by save()"""
+        with open(path, 'rb') as f:
+            header = f.read(STATICS_INDEX_HEADER.size)
+            magic, version, _, width, height, block_count, static_count = \
+                STATICS_INDEX_HEADER.unpack(header)
+            if magic != STATICS_INDEX_MAGIC or version != STATICS_INDEX_VERSION:
+                raise ValueError(f"Not a statics index: {path}")
+            offsets = np.fromfile(f, dtype='<u4', count=block_count + 1)
+            records = np.fromfile(f, dtype=STATIC_RECORD_DTYPE, count=static_count)
+        return cls(width, height, offsets, records)
+
+    def save(self, path):
+        """Write the compact export"""
+        with open(path, 'wb') as f:
+            f.write(STATICS_INDEX_HEADER.pack(STATICS_INDEX_MAGIC, STATICS_INDEX_VERSION, 0,
+                                              self.width, self.height,
+                                              len(self.offsets) - 1, len(self.records)))
+            f.write(self.offsets.astype('<u4').tobytes())
+            f.write(self.records.tobytes())
+
+    def __len__(self):
+        return len(self.records)
+
+    def block_index(self, bx, by):
+        """Map-order index of block (bx, by)"""
+        return bx * self.blocks_y + by
+
+    def block(self, bx, by):
+        """Records of one block (zero-copy slice), x/y local to the block"""
+        i = self.block_index(bx, by)
+        return self.records[self.offsets[i]:self.offsets[i + 1]]
+
+    def counts(self):
+        """Statics per block as a (blocks_y, blocks_x) raster"""
+        return np.diff(self.offsets).reshape(self.blocks_x, self.blocks_y).T
+
+    def query(self, x, y, width, height):
+        """Statics inside a tile rectangle, with world coordinates.
+
+        Within each block column, the covered blocks are contiguous in the
+        CSR arrays, so the gather is one range per block column.
+        """
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = min(self.width, x + width), min(self.height, y + height)
+        if x1 <= x0 or y1 <= y0:
+            return np.zeros(0, dtype=STATIC_QUERY_DTYPE)
+
+        bx = np.arange(x0 // 8, -(-x1 // 8))
+        by0, by1 = y0 // 8, -(-y1 // 8)
+        starts = self.offsets[bx * self.blocks_y + by0]
+        ends = self.offsets[bx * self.blocks_y + by1]
+        rows = gather_ranges(starts, ends - starts)
+
+        # Recover each record's block from its position in the CSR offsets
+        blocks = np.searchsorted(self.offsets, rows, side='right') - 1
+        selected = self.records[rows]
+        world_x = (blocks // self.blocks_y) * 8 + (selected['x'] & 7)
+        world_y = (blocks % self.blocks_y) * 8 + (selected['y'] & 7)
+        inside = (world_x >= x0) & (world_x < x1) & (world_y >= y0) & (world_y < y1)
+
+        result = np.empty(int(inside.sum()), dtype=STATIC_QUERY_DTYPE)
+        result['graphic'] = selected['graphic'][inside]
+        result['world_x'] = world_x[inside]
+        result['world_y'] = world_y[inside]
+        result['z'] = selected['z'][inside]
+        result['hue'] = selected['hue'][inside]
+        return result
+
+
+def main():
+    args = sys.argv[1:]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+    map_num = int(args[0]) if args else 0
+    width, height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    staidx_file = MUL_PATH / f"staidx{map_num}.mul"
+    statics_file = MUL_PATH / f"statics{map_num}.mul"
+    output_file = MUL_PATH / f"statics{map_num}.idx.bin"
+    print(f"Indexing {statics_file} ({width}×{height})...")
+
+    statics = StaticsIndex.from_mul(staidx_file, statics_file, width, height)
+    statics.save(output_file)
+
+    counts = statics.counts()
+    print(f"✅ {len(statics)} statics in {np.count_nonzero(counts)}/{counts.size} blocks "
+          f"(max {counts.max()} per block)")
+    print(f"   {statics_file.stat().st_size + staidx_file.stat().st_size} bytes -> "
+          f"{output_file.stat().st_size} bytes ({output_file})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+"""
+Terrain Mesh Baker
+Precomputes what ClassicUO's Land.ApplyStretch works out per tile at load
+time (corner heights, the stretched flag, sort Z and per-corner normals) for
+a whole facet, and writes it as region files laid out as vertex attributes.
+The WebGL renderer can upload a region as-is instead of building
+cornerHeights and normals on the CPU. Read by js/modules/terrainMeshStreamer.js.
+
+Run: python terrain_mesh.py [map_number] [--region-blocks N] [--size WIDTHxHEIGHT]
+Output: assets/terrain/map#/index.json + t_<rx>_<ry>.bin (same region grid as map_tiler.py)
+
+A tile's corners are the Z of the tile itself (TOP), of x + 1 (RIGHT), y + 1
+(LEFT) and x + 1, y + 1 (BOTTOM), with the facet edge repeating itself. A
+tile is stretched when its land tile has a texmap and the corners are not
+all equal; other tiles are drawn flat from their art, so all four of their
+vertices carry the tile's own Z and an upward normal. Normals are the
+screen-space cross product of the corner's neighbouring corners along x and
+along y (x right, y down, z toward the viewer, 4 pixels per Z unit).
+
+Region file (little-endian):
+    char[4]  magic 'UOTM'
+    uint16   version
+    uint16   region x, region y (in regions)
+    uint16   width, height (in tiles; edge regions may be smaller)
+    uint16   reserved
+    tile     tiles[height][width]        4 bytes: uint8 flags, int8 average Z, int8 min Z, uint8 reserved
+    vertex   vertices[height][width][4]  4 bytes: int8 Z, int8 normal x, y, z (× 127)
+Vertices are in ClassicUO's YOffsets order: TOP, RIGHT, LEFT, BOTTOM.
+"""
+
+from pathlib import Path
+import json
+import struct
+import sys
+
+import numpy as np
+
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+from tiledata import TileData
+from walk_grid import average_land_z
+
+MUL_PATH = Path('assets/mul')
+TERRAIN_PATH = Path('assets/terrain')
+
+MESH_MAGIC = b'UOTM'
+MESH_VERSION = 1
+MESH_HEADER = struct.Struct('<4sHHHHHH')
+DEFAULT_REGION_BLOCKS = 32
+
+TILE_STRETCHED = 0x01
+PIXELS_PER_Z = 4
+TILE_HALF = 22  # Screen pixels between neighbouring corners, along each axis
+TILE_RECORD_DTYPE = np.dtype([
+    ('flags', 'u1'),
+    ('average_z', 'i1'),
+    ('min_z', 'i1'),
+    ('reserved', 'u1'),
+])
+VERTEX_DTYPE = np.dtype([
+    ('z', 'i1'),
+    ('normal', 'i1', (3,)),
+])
+
+
+def corner_normals(z):
+    """Unit normals (height + 1, width + 1, 3) of the inner corners of a (height + 3, width + 3) Z raster.
+
+    Corner (x, y) sits at screen ((x - y) * 22, (x + y) * 22, z * 4); the
+    normal is (E - W) × (S - N) over its four neighbouring corners.
+    """
+    z = z.astype(np.float32) * PIXELS_PER_Z
+    dx = z[1:-1, 2:] - z[1:-1, :-2]
+    dy = z[2:, 1:-1] - z[:-2, 1:-1]
+    # (2h, 2h, dx) × (-2h, 2h, dy) = 2h * (dy - dx, -(dx + dy), 4h)
+    normals = np.stack([dy - dx, -(dx + dy), np.full_like(dx, 4 * TILE_HALF)], axis=-1)
+    normals /= np.linalg.norm(normals, axis=-1, keepdims=True)
+    return normals
+
+
+def bake_region(z, textured):
+    """(tile records, vertices) of a region.
+
+    z is the (height + 3, width + 3) Z raster from one tile above/left of the
+    region to two below/right; textured is the (height, width) mask of land
+    tiles that have a texmap.
+    """
+    height, width = textured.shape
+    corners = z[1:-1, 1:-1].astype(np.int16)
+    top, right = corners[:-1, :-1], corners[:-1, 1:]
+    left, bottom = corners[1:, :-1], corners[1:, 1:]
+    stretched = textured & ~((top == right) & (top == left) & (top == bottom))
+
+    tiles = np.zeros((height, width), dtype=TILE_RECORD_DTYPE)
+    low, average = average_land_z(corners)
+    tiles['flags'] = np.where(stretched, TILE_STRETCHED, 0)
+    tiles['average_z'] = np.where(stretched, average, top)
+    tiles['min_z'] = np.where(stretched, low, top)
+
+    normals = np.rint(corner_normals(z) * 127).astype(np.int8)
+    vertices = np.zeros((height, width, 4), dtype=VERTEX_DTYPE)
+    for v, (dy, dx) in enumerate([(0, 0), (0, 1), (1, 0), (1, 1)]):  # TOP, RIGHT, LEFT, BOTTOM
+        vertices['z'][:, :, v] = np.where(stretched, corners[dy:dy + height, dx:dx + width], top)
+        vertices['normal'][:, :, v] = np.where(stretched[:, :, None],
+                                               normals[dy:dy + height, dx:dx + width], (0, 0, 127))
+    return tiles, vertices
+
+
+def read_padded_z(facet, x0, y0, width, height):
+    """Z raster of tiles (x0 - 1 .. x0 + width + 1, y0 - 1 .. y0 + height + 1), edges repeated"""
+    x, y = x0 - 1, y0 - 1
+    _, z = facet.region(x, y, width + 3, height + 3)
+    pad_left, pad_top = max(0, -x), max(0, -y)
+    return np.pad(z, ((pad_top, height + 3 - z.shape[0] - pad_top),
+                      (pad_left, width + 3 - z.shape[1] - pad_left)), mode='edge')
+
+
+def write_region(path, rx, ry, tiles, vertices):
+    """Write one region file"""
+    height, width = tiles.shape
+    with open(path, 'wb') as f:
+        f.write(MESH_HEADER.pack(MESH_MAGIC, MESH_VERSION, rx, ry, width, height, 0))
+        f.write(np.ascontiguousarray(tiles).tobytes())
+        f.write(np.ascontiguousarray(vertices).tobytes())
+
+
+def bake_map(map_num, region_blocks=DEFAULT_REGION_BLOCKS, map_size=None):
+    """Write every terrain mesh region of a facet plus the region directory"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    if not map_file.exists():
+        raise FileNotFoundError(f"{map_file} not found (convert the UOP first)")
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    # Land texmap IDs decide which tiles can stretch
+    tiledata_file = MUL_PATH / 'tiledata.mul'
+    textures = None
+    if tiledata_file.exists():
+        textures = TileData(tiledata_file).land['texture']
+    else:
+        print(f"  ⚠️ {tiledata_file} not found, every sloped tile is treated as textured")
+
+    patches = MapPatches.load(MUL_PATH, map_num, map_width, map_height)
+    if patches is not None:
+        print(f"  Applying {patches.land_count} patched land blocks")
+    facet = MapArray(map_file, map_width, map_height, patches)
+
+    output_dir = TERRAIN_PATH / f"map{map_num}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in output_dir.glob('t_*.bin'):
+        old.unlink()
+
+    region_size = region_blocks * 8
+    columns = -(-facet.blocks_x // region_blocks)
+    rows = -(-facet.blocks_y // region_blocks)
+    print(f"Baking terrain mesh for {map_file} ({map_width}×{map_height}) into {columns}×{rows} regions")
+
+    regions = []
+    total_bytes = 0
+    stretched_tiles = 0
+    for rx in range(columns):
+        for ry in range(rows):
+            x0, y0 = rx * region_size, ry * region_size
+            land_ids, _ = facet.region(x0, y0, region_size, region_size)
+            height, width = land_ids.shape
+            if textures is not None:
+                known = land_ids < len(textures)
+                textured = known & (textures[np.where(known, land_ids, 0)] != 0)
+            else:
+                textured = np.ones(land_ids.shape, dtype=bool)
+
+            tiles, vertices = bake_region(read_padded_z(facet, x0, y0, width, height), textured)
+            path = output_dir / f"t_{rx}_{ry}.bin"
+            write_region(path, rx, ry, tiles, vertices)
+            total_bytes += path.stat().st_size
+            stretched_tiles += int(np.count_nonzero(tiles['flags'] & TILE_STRETCHED))
+            regions.append([rx, ry, width, height])
+        print(f"  Column {rx + 1}/{columns}", end='\r')
+    facet.close()
+
+    directory = {
+        'map': map_num,
+        'version': MESH_VERSION,
+        'width': map_width,
+        'height': map_height,
+        'regionSize': region_size,
+        'columns': columns,
+        'rows': rows,
+        'pixelsPerZ': PIXELS_PER_Z,
+        'tileFlags': {'stretched': TILE_STRETCHED},
+        'file': 't_{x}_{y}.bin',
+        'regions': regions,
+    }
+    with open(output_dir / 'index.json', 'w') as f:
+        json.dump(directory, f)
+
+    tiles = map_width * map_height
+    print(f"\n✅ {stretched_tiles}/{tiles} tiles stretched, "
+          f"{total_bytes / 1024 / 1024:.1f} MB total -> {output_dir}")
+
+
+def main():
+    args = sys.argv[1:]
+    region_blocks = DEFAULT_REGION_BLOCKS
+    if '--region-blocks' in args:
+        i = args.index('--region-blocks')
+        region_blocks = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+
+    map_num = int(args[0]) if args else 0
+    bake_map(map_num, region_blocks, map_size)
+
+
+if __name__ == '__main__':
+    main()
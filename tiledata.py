@@ -0,0 +1,156 @@
+"""
+tiledata.mul reader
+Parses the land and static tile tables (flags, heights, names) into structured
+NumPy arrays, so per-graphic lookups over many statics are one fancy index.
+Handles both the classic layout (32-bit flags) and the High Seas layout
+(64-bit flags, 7.0.9.0+).
+
+Usage:
+    tiledata = TileData('assets/mul/tiledata.mul')
+    tiledata.statics['height'][graphics]                    # heights of many statics
+    tiledata.static_flags[graphics] & TILE_FLAGS['Surface']
+    tiledata.land_name(0x0003)                              # 'grass'
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+# TileData flag bits (low 32 bits are shared by both layouts; same order as LandData.csv)
+TILE_FLAGS = {
+    'Background': 0x00000001,
+    'Weapon': 0x00000002,
+    'Transparent': 0x00000004,
+    'Translucent': 0x00000008,
+    'Wall': 0x00000010,
+    'Damaging': 0x00000020,
+    'Impassable': 0x00000040,
+    'Wet': 0x00000080,
+    'Unknown1': 0x00000100,
+    'Surface': 0x00000200,
+    'Bridge': 0x00000400,
+    'Generic': 0x00000800,
+    'Window': 0x00001000,
+    'NoShoot': 0x00002000,
+    'ArticleA': 0x00004000,
+    'ArticleAn': 0x00008000,
+    'Internal': 0x00010000,
+    'Foliage': 0x00020000,
+    'PartialHue': 0x00040000,
+    'Unknown2': 0x00080000,
+    'Map': 0x00100000,
+    'Container': 0x00200000,
+    'Wearable': 0x00400000,
+    'LightSource': 0x00800000,
+    'Animation': 0x01000000,
+    'HoverOver': 0x02000000,
+    'Unknown3': 0x04000000,
+    'Armor': 0x08000000,
+    'Roof': 0x10000000,
+    'Door': 0x20000000,
+    'StairBack': 0x40000000,
+    'StairRight': 0x80000000,
+}
+
+LAND_TILE_COUNT = 0x4000
+TILES_PER_GROUP = 32
+
+
+def _tile_dtypes(flag_type):
+    land = np.dtype([
+        ('flags', flag_type),
+        ('texture', '<u2'),
+        ('name', 'S20'),
+    ])
+    static = np.dtype([
+        ('flags', flag_type),
+        ('weight', 'u1'),
+        ('layer', 'u1'),
+        ('count', '<i4'),
+        ('anim', '<u2'),
+        ('hue', '<u2'),
+        ('light', '<u2'),
+        ('height', 'u1'),
+        ('name', 'S20'),
+    ])
+    return land, static
+
+
+# Classic: 26-byte land / 37-byte static entries; High Seas: 30 / 41 bytes
+LAND_TILE_DTYPE, STATIC_TILE_DTYPE = _tile_dtypes('<u4')
+LAND_TILE_DTYPE_HS, STATIC_TILE_DTYPE_HS = _tile_dtypes('<u8')
+
+
+def _group_dtype(tile_dtype):
+    """Tiles come in groups of 32 behind a 4-byte header"""
+    return np.dtype([('header', '<u4'), ('tiles', tile_dtype, (TILES_PER_GROUP,))])
+
+
+def detect_high_seas(size):
+    """True if a tiledata.mul of `size` bytes uses the 64-bit flag layout"""
+    layouts = []
+    for high_seas, (land, static) in ((True, (LAND_TILE_DTYPE_HS, STATIC_TILE_DTYPE_HS)),
+                                      (False, (LAND_TILE_DTYPE, STATIC_TILE_DTYPE))):
+        land_size = LAND_TILE_COUNT // TILES_PER_GROUP * _group_dtype(land).itemsize
+        rest = size - land_size
+        if rest >= 0 and rest % _group_dtype(static).itemsize == 0:
+            layouts.append(high_seas)
+    if len(layouts) == 1:
+        return layouts[0]
+    # Both (or neither) divide evenly: High Seas files are the large ones
+    return size >= 3188736
+
+
+class TileData:
+    """Land and static tile tables of tiledata.mul"""
+
+    def __init__(self, filepath, high_seas=None):
+        self.filepath = Path(filepath)
+        data = np.fromfile(self.filepath, dtype=np.uint8)
+        self.high_seas = detect_high_seas(len(data)) if high_seas is None else high_seas
+        land_dtype, static_dtype = ((LAND_TILE_DTYPE_HS, STATIC_TILE_DTYPE_HS) if self.high_seas
+                                    else (LAND_TILE_DTYPE, STATIC_TILE_DTYPE))
+
+        land_group = _group_dtype(land_dtype)
+        land_size = LAND_TILE_COUNT // TILES_PER_GROUP * land_group.itemsize
+        if len(data) < land_size:
+            raise ValueError(f"{self.filepath} is too small for the land table ({len(data)} bytes)")
+        self.land = data[:land_size].view(land_group)['tiles'].reshape(-1).copy()
+
+        static_group = _group_dtype(static_dtype)
+        group_count = (len(data) - land_size) // static_group.itemsize
+        static_data = data[land_size:land_size + group_count * static_group.itemsize]
+        self.statics = static_data.view(static_group)['tiles'].reshape(-1).copy()
+
+        # 64-bit flags for both layouts, so callers can mask without caring
+        self.land_flags = self.land['flags'].astype(np.uint64)
+        self.static_flags = self.statics['flags'].astype(np.uint64)
+
+    def __len__(self):
+        return len(self.statics)
+
+    def land_has(self, tile_ids, flag):
+        """Boolean array: land tiles carrying a TILE_FLAGS flag (by name)"""
+        tile_ids = np.asarray(tile_ids)
+        known = tile_ids < len(self.land)
+        flags = self.land_flags[np.where(known, tile_ids, 0)]
+        return known & ((flags & np.uint64(TILE_FLAGS[flag])) != 0)
+
+    def static_has(self, graphics, flag):
+        """Boolean array: statics carrying a TILE_FLAGS flag; unknown graphics have none"""
+        graphics = np.asarray(graphics)
+        known = graphics < len(self.statics)
+        flags = self.static_flags[np.where(known, graphics, 0)]
+        return known & ((flags & np.uint64(TILE_FLAGS[flag])) != 0)
+
+    def static_heights(self, graphics):
+        """Heights of statics (0 for graphics past the end of the table)"""
+        graphics = np.asarray(graphics)
+        known = graphics < len(self.statics)
+        return np.where(known, self.statics['height'][np.where(known, graphics, 0)], 0)
+
+    def land_name(self, tile_id):
+        return self.land['name'][tile_id].split(b'\0', 1)[0].decode('latin-1')
+
+    def static_name(self, graphic):
+        return self.statics['name'][graphic].split(b'\0', 1)[0].decode('latin-1')
@@ -0,0 +1,142 @@
+"""
+Decoder for UOP compression flag 3 (zlib + BWT)
+Flag-3 entries are zlib streams; the inflated payload is decoded the way the
+client does (ClassicUO's BwtDecompress), in two stages:
+
+1. Move-to-front, after a 4-byte header:
+       uint32  header (not used for decoding)
+       bytes   MTF codes; the last byte of the stream is never decoded
+   BuildTable seeds the table with every uint16 counting up from the first
+   code byte and sorts it, so the low bytes of its first 256 entries are
+   0..255 in order: a plain identity MTF table.
+
+2. Symbol ranking, on the MTF output:
+       int32   counts[256]   occurrences of each byte value in the output
+       bytes   one segment per used symbol, ordered by count (highest first,
+               ties by lower value), count bytes long: the symbol's initial
+               slot in the symbol table, then one slot per occurrence but
+               the last
+   The symbol table lists the live symbols in the order they occur next.
+   Each step emits table[0]; the symbol then moves to the slot read from
+   its segment (0 = it is also the next byte), or leaves the table after
+   its last occurrence.
+
+Both stages update a table per symbol, which is sequential by nature. Zero
+codes (repeat the previous symbol) are the common case and are handled in
+bulk with NumPy; only non-zero codes take a Python step, on a list of at
+most 256 entries.
+"""
+
+import zlib
+
+import numpy as np
+
+BWT_HEADER_SIZE = 4
+COUNTS_SIZE = 256 * 4
+
+
+def mtf_decode(codes):
+    """Inverse move-to-front over bytes with the identity table BuildTable produces.
+
+    Index 0 repeats the previous symbol and leaves the table untouched, so
+    only the non-zero codes need the table update; zero runs are filled by a
+    forward fill over the positions of the non-zero codes.
+    """
+    codes = np.frombuffer(codes, dtype=np.uint8)
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.uint8)
+
+    table = list(range(256))
+    moves = np.flatnonzero(codes)
+    symbols = np.empty(len(moves) + 1, dtype=np.uint8)
+    symbols[0] = 0  # symbol emitted by leading zeros (table starts as identity)
+    for i, code in enumerate(codes[moves].tolist(), 1):
+        symbol = table.pop(code)
+        table.insert(0, symbol)
+        symbols[i] = symbol
+
+    # Position i takes the symbol of the last non-zero code at or before i
+    last_move = np.zeros(n, dtype=np.int64)
+    last_move[moves] = np.arange(1, len(moves) + 1)
+    np.maximum.accumulate(last_move, out=last_move)
+    return symbols[last_move]
+
+
+def unrank_symbols(data):
+    """Second stage: rebuild the output from the symbol counts and slot segments"""
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) < COUNTS_SIZE:
+        raise ValueError("Truncated BWT block: no symbol count table")
+    counts = data[:COUNTS_SIZE].view('<i4').astype(np.int64)
+    if (counts < 0).any():
+        raise ValueError("Corrupt BWT block: negative symbol count")
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.uint8)
+    if COUNTS_SIZE + total > len(data):
+        raise ValueError(f"Corrupt BWT block: {total} bytes of segments, {len(data) - COUNTS_SIZE} present")
+
+    # Segments in count order (stable sort keeps ties in value order)
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0]
+    segment_start = COUNTS_SIZE + np.cumsum(counts[order]) - counts[order]
+    table = list(range(256))
+    for symbol, slot in zip(order.tolist(), data[segment_start].tolist()):
+        table[slot] = symbol
+    position = [0] * 256
+    end = [0] * 256
+    for symbol, start, count in zip(order.tolist(), segment_start.tolist(), counts[order].tolist()):
+        position[symbol] = start + 1
+        end[symbol] = start + count
+
+    # next_slot[p]: first non-zero byte at or after p
+    next_slot = np.full(len(data) + 1, len(data), dtype=np.int64)
+    nonzero = np.flatnonzero(data)
+    next_slot[nonzero] = nonzero
+    next_slot = np.minimum.accumulate(next_slot[::-1])[::-1].tolist()
+    slots = data.tolist()
+
+    values, runs = [], []
+    emitted = 0
+    live = len(order)
+    value = table[0]
+    while emitted < total and live > 0:
+        p, stop = position[value], end[value]
+        # The symbol repeats once per zero slot before its next move
+        repeats = min(next_slot[p], stop) - p
+        values.append(value)
+        runs.append(repeats + 1)
+        emitted += repeats + 1
+        p += repeats
+        if p >= stop:
+            # Retired: the live symbols shift down over it, as the client's
+            # ShiftLeft(live) does (the slot past them keeps its value)
+            live -= 1
+            if live:
+                del table[0]
+                table.insert(live, table[live - 1])
+        else:
+            del table[0]
+            table.insert(slots[p], value)
+            p += 1
+        position[value] = p
+        value = table[0]
+    if emitted < total:
+        raise ValueError("Corrupt BWT block: symbol segments ended early")
+    return np.repeat(np.array(values, dtype=np.uint8), runs)[:total]
+
+
+def decode_bwt_block(payload):
+    """Undo MTF + symbol ranking on an inflated flag-3 payload"""
+    if len(payload) < BWT_HEADER_SIZE + 1:
+        raise ValueError("Truncated BWT block")
+    # The client reads one code ahead and stops at the end of the stream, so
+    # the last byte is never decoded; its slot in the buffer stays 0
+    codes = mtf_decode(memoryview(payload)[BWT_HEADER_SIZE:-1])
+    return unrank_symbols(np.append(codes, np.uint8(0))).tobytes()
+
+
+def decompress_flag3(raw):
+    """Full flag-3 decode: zlib, then inverse MTF and symbol ranking"""
+    return decode_bwt_block(zlib.decompress(raw))
@@ -0,0 +1,171 @@
+"""
+Incremental rebuild manifest for UOP archives
+Records the per-entry data hash of every entry we converted so a re-run after
+a client patch only decompresses and rewrites the entries that changed.
+
+A manifest belongs to one (archive, output) pair: map0LegacyMUL.uop ->
+map0.mul and artLegacyMUL.uop -> assets/export/art are tracked separately,
+so building one output never marks entries as built for another. Only the
+converters and exporters record; this script just reports.
+
+Run: python uop_manifest.py <archive.uop> <output>
+Prints which art IDs or map chunks changed since <output> was last built.
+"""
+
+from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+
+from uop_reader import ART_ENTRY, MAP_ENTRY, UOPArchive
+
+MANIFEST_DIR = Path('assets/mul/manifests')
+
+
+def entry_signature(archive, row):
+    """Signature that changes whenever an entry's content changes.
+
+    Uses the data hash from the entry table; archives that leave it zero fall
+    back to a CRC of the stored bytes (cheap next to decompressing them).
+    """
+    data_hash = int(archive.entries['data_hash'][row])
+    if data_hash == 0:
+        data_hash = zlib.crc32(archive.read_raw(row))
+    return [data_hash,
+            int(archive.entries['compressed_size'][row]),
+            int(archive.entries['decompressed_size'][row])]
+
+
+class UOPManifest:
+    """Record of entry hash -> content signature for one archive and one output"""
+
+    def __init__(self, archive_path, output_path, manifest_dir=MANIFEST_DIR):
+        self.archive_name = Path(archive_path).name
+        self.output = str(Path(output_path).resolve())
+        # Output paths are hashed so same-named outputs in other folders stay apart
+        output_key = hashlib.blake2b(self.output.encode(), digest_size=4).hexdigest()
+        self.path = Path(manifest_dir) / f"{self.archive_name}-{Path(output_path).name}-{output_key}.json"
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def changed_rows(self, archive, rows=None):
+        """Table rows (of `rows`, default all) whose content differs from the record"""
+        if rows is None:
+            rows = np.arange(len(archive))
+        hashes = archive.entries['hash'][rows].tolist()
+        changed = [row for row, file_hash in zip(np.asarray(rows).tolist(), hashes)
+                   if self.entries.get(f"{file_hash:016x}") != entry_signature(archive, row)]
+        return np.asarray(changed, dtype=np.int64)
+
+    def removed_hashes(self, archive):
+        """Recorded entry hashes that no longer exist in the archive"""
+        present = {f"{h:016x}" for h in archive.entries['hash'].tolist()}
+        return sorted(set(self.entries) - present)
+
+    def record(self, archive, rows=None):
+        """Mark `rows` (default all) as rebuilt from the archive's current content"""
+        if rows is None:
+            rows = np.arange(len(archive))
+        for row in np.asarray(rows).tolist():
+            file_hash = int(archive.entries['hash'][row])
+            self.entries[f"{file_hash:016x}"] = entry_signature(archive, row)
+
+    def forget(self, hashes):
+        """Drop recorded hashes, e.g. entries removed by a patch"""
+        for file_hash in hashes:
+            self.entries.pop(file_hash, None)
+
+    def save(self):
+        """Atomically write the manifest"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump({'archive': self.archive_name, 'output': self.output, 'entries': self.entries}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+
+def format_ranges(values):
+    """Compact "a-b, c" rendering of a sorted list of integers"""
+    parts = []
+    start = prev = None
+    for value in values:
+        if prev is not None and value == prev + 1:
+            prev = value
+            continue
+        if start is not None:
+            parts.append(f"{start}-{prev}" if prev != start else f"{start}")
+        start = prev = value
+    if start is not None:
+        parts.append(f"{start}-{prev}" if prev != start else f"{start}")
+    return ', '.join(parts)
+
+
+def changed_art_ids(archive, manifest, max_id=0x14000, rows=None):
+    """Art IDs (land 0x0000-0x3FFF, statics 0x4000+) whose entries changed.
+
+    `rows` may pass in an already resolved rows_for(ART_ENTRY, max_id).
+    """
+    if rows is None:
+        rows = archive.rows_for(ART_ENTRY, max_id)
+    ids = np.flatnonzero(rows >= 0)
+    changed = set(manifest.changed_rows(archive, rows[ids]).tolist())
+    return [int(art_id) for art_id, row in zip(ids, rows[ids]) if int(row) in changed]
+
+
+def changed_map_chunks(archive, manifest, map_num):
+    """Chunk indices of map#LegacyMUL.uop whose entries changed"""
+    rows = archive.rows_for(MAP_ENTRY, None, map_num)
+    indices = np.flatnonzero(rows >= 0)
+    changed = set(manifest.changed_rows(archive, rows[indices]).tolist())
+    return [int(i) for i, row in zip(indices, rows[indices]) if int(row) in changed]
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python uop_manifest.py <archive.uop> <output>")
+        sys.exit(1)
+
+    uop_file = Path(sys.argv[1])
+    manifest = UOPManifest(uop_file, sys.argv[2])
+    print(f"Manifest: {manifest.path} ({len(manifest)} recorded entries)")
+
+    with UOPArchive(uop_file) as archive:
+        name = uop_file.name.lower()
+        map_match = re.match(r'map(\d+)x?legacymul\.uop$', name)
+        if name == 'artlegacymul.uop':
+            ids = changed_art_ids(archive, manifest)
+            land = [i for i in ids if i < 0x4000]
+            statics = [i - 0x4000 for i in ids if i >= 0x4000]
+            print(f"Changed land tiles: {len(land)}")
+            print(f"Changed static items: {len(statics)}")
+            for art_id in statics[:50]:
+                print(f"  0x{art_id:04X}")
+        elif map_match:
+            chunks = changed_map_chunks(archive, manifest, int(map_match.group(1)))
+            print(f"Changed map chunks: {format_ranges(chunks) or 'none'}")
+        else:
+            rows = manifest.changed_rows(archive)
+            print(f"Changed entries: {len(rows)}/{len(archive)}")
+
+        removed = manifest.removed_hashes(archive)
+        if removed:
+            print(f"Removed entries: {len(removed)}")
+
+
+if __name__ == '__main__':
+    main()
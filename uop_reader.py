@@ -0,0 +1,350 @@
+"""
+Shared UOP container reader
+Memory-maps a .uop archive, parses each entry table block with a single
+structured-array read and indexes entries by their hashlittle2 filename hash.
+
+Usage:
+    with UOPArchive('Ultima Online Classic/artLegacyMUL.uop') as art:
+        data = art.read_entry(art_entry_name(0x4000 + 0x0CDA))
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import mmap
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from uop_bwt import decompress_flag3
+
+UOP_MAGIC = b'MYP\x00'
+
+# magic, version, signature, first table offset, block size, file count
+UOP_HEADER = struct.Struct('<4sIIQII')
+# files in block, next table offset
+UOP_BLOCK_HEADER = struct.Struct('<IQ')
+
+# One 34-byte entry of a UOP table block (packed, little-endian)
+UOP_ENTRY_DTYPE = np.dtype([
+    ('offset', '<u8'),
+    ('header_length', '<u4'),
+    ('compressed_size', '<u4'),
+    ('decompressed_size', '<u4'),
+    ('hash', '<u8'),
+    ('data_hash', '<u4'),
+    ('compression', '<u2'),
+])
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZLIB_BWT = 3
+
+# Entry name patterns used by the LegacyMUL archives
+ART_ENTRY = 'build/artlegacymul/{:08d}.tga'
+MAP_ENTRY = 'build/map{}legacymul/{:08d}.dat'
+
+# Every map chunk holds 4096 blocks of 196 bytes, so chunk i starts at i * MAP_CHUNK_SIZE
+MAP_CHUNK_SIZE = 0xC4000
+
+_seek_lock = threading.Lock()
+
+
+def _rot(value, bits):
+    """Rotate a 32-bit value left"""
+    return ((value << bits) | (value >> (32 - bits))) & 0xFFFFFFFF
+
+
+def uop_hash(name):
+    """Bob Jenkins' hashlittle2 as used by the UO client for entry names.
+
+    Returns the 64-bit value stored in the UOP entry table.
+    """
+    s = name.lower().encode('ascii')
+    length = len(s)
+    a = b = c = (0xDEADBEEF + length) & 0xFFFFFFFF
+
+    i = 0
+    while length - i > 12:
+        a = (a + int.from_bytes(s[i:i + 4], 'little')) & 0xFFFFFFFF
+        b = (b + int.from_bytes(s[i + 4:i + 8], 'little')) & 0xFFFFFFFF
+        c = (c + int.from_bytes(s[i + 8:i + 12], 'little')) & 0xFFFFFFFF
+
+        a = (a - c) & 0xFFFFFFFF; a ^= _rot(c, 4);  c = (c + b) & 0xFFFFFFFF
+        b = (b - a) & 0xFFFFFFFF; b ^= _rot(a, 6);  a = (a + c) & 0xFFFFFFFF
+        c = (c - b) & 0xFFFFFFFF; c ^= _rot(b, 8);  b = (b + a) & 0xFFFFFFFF
+        a = (a - c) & 0xFFFFFFFF; a ^= _rot(c, 16); c = (c + b) & 0xFFFFFFFF
+        b = (b - a) & 0xFFFFFFFF; b ^= _rot(a, 19); a = (a + c) & 0xFFFFFFFF
+        c = (c - b) & 0xFFFFFFFF; c ^= _rot(b, 4);  b = (b + a) & 0xFFFFFFFF
+        i += 12
+
+    if length - i == 0:
+        return (c << 32) | b
+
+    tail = s[i:] + b'\x00' * (12 - (length - i))
+    a = (a + int.from_bytes(tail[0:4], 'little')) & 0xFFFFFFFF
+    b = (b + int.from_bytes(tail[4:8], 'little')) & 0xFFFFFFFF
+    c = (c + int.from_bytes(tail[8:12], 'little')) & 0xFFFFFFFF
+
+    c ^= b; c = (c - _rot(b, 14)) & 0xFFFFFFFF
+    a ^= c; a = (a - _rot(c, 11)) & 0xFFFFFFFF
+    b ^= a; b = (b - _rot(a, 25)) & 0xFFFFFFFF
+    c ^= b; c = (c - _rot(b, 16)) & 0xFFFFFFFF
+    a ^= c; a = (a - _rot(c, 4)) & 0xFFFFFFFF
+    b ^= a; b = (b - _rot(a, 14)) & 0xFFFFFFFF
+    c ^= b; c = (c - _rot(b, 24)) & 0xFFFFFFFF
+
+    return (b << 32) | c
+
+
+def art_entry_name(index):
+    """Entry name for art index (land 0x0000-0x3FFF, statics 0x4000+)"""
+    return ART_ENTRY.format(index)
+
+
+def map_entry_name(map_num, index):
+    """Entry name for chunk `index` of map#LegacyMUL.uop"""
+    return MAP_ENTRY.format(map_num, index)
+
+
+def pwrite(fd, data, offset):
+    """Write all of `data` at `offset` without relying on a shared file position.
+
+    Falls back to a locked seek + write where os.pwrite is unavailable (Windows).
+    """
+    view = memoryview(data)
+    if hasattr(os, 'pwrite'):
+        while view:
+            written = os.pwrite(fd, view, offset)
+            view = view[written:]
+            offset += written
+        return
+
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+
+
+def pread(fd, size, offset):
+    """Read up to `size` bytes at `offset`; counterpart of pwrite()"""
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, offset)
+
+    with _seek_lock:
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, size)
+
+
+class UOPArchive:
+    """Read-only, memory-mapped view of a UOP archive"""
+
+    def __init__(self, filepath):
+        self.filepath = Path(filepath)
+        self._file = open(self.filepath, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Not a valid UOP file: {self.filepath}")
+        self._view = memoryview(self._mm)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._parse()
+
+    def _parse(self):
+        """Parse header and every table block into one structured array"""
+        if len(self._mm) < UOP_HEADER.size:
+            raise ValueError(f"Not a valid UOP file: {self.filepath}")
+
+        magic, version, signature, next_table, block_size, file_count = \
+            UOP_HEADER.unpack_from(self._mm, 0)
+        if magic != UOP_MAGIC:
+            raise ValueError(f"Not a valid UOP file: {self.filepath}")
+
+        self.version = version
+        self.signature = signature
+        self.block_size = block_size
+        self.file_count = file_count
+
+        blocks = []
+        seen = set()
+        size = len(self._mm)
+        while next_table != 0:
+            if next_table in seen or next_table + UOP_BLOCK_HEADER.size > size:
+                raise ValueError(f"Corrupt UOP table chain at {next_table} in {self.filepath}")
+            seen.add(next_table)
+
+            files_in_block, following = UOP_BLOCK_HEADER.unpack_from(self._mm, next_table)
+            table_start = next_table + UOP_BLOCK_HEADER.size
+            count = min(files_in_block, (size - table_start) // UOP_ENTRY_DTYPE.itemsize)
+            block = np.frombuffer(self._mm, dtype=UOP_ENTRY_DTYPE, count=count, offset=table_start)
+            blocks.append(block[block['offset'] != 0])
+            next_table = following
+
+        # Concatenation copies the table out of the mapping so close() never
+        # trips over exported buffers.
+        if blocks:
+            self.entries = np.concatenate(blocks)
+        else:
+            self.entries = np.zeros(0, dtype=UOP_ENTRY_DTYPE)
+
+        self.data_offsets = self.entries['offset'] + self.entries['header_length']
+        self._by_hash = dict(zip(self.entries['hash'].tolist(), range(len(self.entries))))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return self.find(key) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping and the file handle"""
+        if self._mm is None:
+            return
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        self._view.release()
+        try:
+            self._mm.close()
+        except BufferError:
+            # A caller still holds a zero-copy view; the mapping is freed
+            # once that view is garbage collected.
+            pass
+        self._file.close()
+        self._mm = None
+
+    def find(self, key):
+        """Table row for an entry name or 64-bit hash, or None"""
+        if isinstance(key, str):
+            key = uop_hash(key)
+        return self._by_hash.get(int(key))
+
+    def entry(self, key):
+        """Table record (offset, sizes, hashes, compression) for a name or hash"""
+        row = self.find(key)
+        if row is None:
+            return None
+        return self.entries[row]
+
+    def read_raw(self, row):
+        """Zero-copy view of the stored (possibly compressed) bytes of a table row"""
+        start = int(self.data_offsets[row])
+        return self._view[start:start + int(self.entries['compressed_size'][row])]
+
+    def decode(self, row, raw):
+        """Decompress stored bytes of a table row according to its flag"""
+        compression = int(self.entries['compression'][row])
+        if compression == COMPRESSION_NONE:
+            return raw
+        if compression == COMPRESSION_ZLIB:
+            return zlib.decompress(raw)
+        if compression == COMPRESSION_ZLIB_BWT:
+            return decompress_flag3(raw)
+        raise ValueError(f"Unsupported UOP compression flag {compression} in {self.filepath}")
+
+    def read_index(self, row):
+        """Read and decompress an entry by table position.
+
+        Uncompressed entries are returned as a memoryview into the mapping.
+        """
+        return self.decode(row, self.read_raw(row))
+
+    def read_entry(self, key):
+        """Read and decompress an entry by name or hash, or None if absent"""
+        row = self.find(key)
+        if row is None:
+            return None
+        return self.read_index(row)
+
+    def _read_batch(self, rows, return_errors):
+        """Decompress a batch of table rows (one pool task)"""
+        results = []
+        for row in rows:
+            try:
+                results.append(None if row is None else self.read_index(row))
+            except Exception as e:
+                if not return_errors:
+                    raise
+                results.append(e)
+        return results
+
+    def _get_pool(self, workers):
+        """The archive's decode pool, created on first use and shut down by close()"""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=workers)
+            return self._pool
+
+    def iter_rows(self, rows, workers=None, prefetch=None, batch_size=16, return_errors=False):
+        """Decompress table rows on a thread pool, yielding (row, data) in order.
+
+        zlib (and the NumPy-heavy BWT path) release the GIL, so batches of
+        `batch_size` rows decode concurrently. At most `prefetch` batches are
+        in flight, which bounds memory however many rows are requested.
+        A row of None yields None data; with `return_errors` a failing row
+        yields its exception instead of aborting the iteration.
+
+        The pool belongs to the archive: the first call creates it with
+        `workers` threads and later calls reuse it until close().
+        """
+        workers = workers or os.cpu_count() or 4
+        prefetch = prefetch or workers * 2
+        rows = iter(rows)
+        pool = self._get_pool(workers)
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < prefetch:
+                    batch = list(islice(rows, batch_size))
+                    if not batch:
+                        break
+                    pending.append((batch, pool.submit(self._read_batch, batch, return_errors)))
+                if not pending:
+                    break
+                batch, future = pending.popleft()
+                yield from zip(batch, future.result())
+        finally:
+            # Stopping early (break, exception) drops this call's queued batches
+            for _, future in pending:
+                future.cancel()
+
+    def read_many(self, keys, workers=None, prefetch=None, batch_size=16, return_errors=False):
+        """Bulk read_entry(): yields (key, data) in order, data None if absent"""
+        keys = list(keys)
+        rows = [self.find(key) for key in keys]
+        results = self.iter_rows(rows, workers, prefetch, batch_size, return_errors)
+        for key, (_, data) in zip(keys, results):
+            yield key, data
+
+    def rows_for(self, pattern, count=None, *args):
+        """Table rows for pattern.format(*args, i) with i = 0..count-1.
+
+        Missing names map to -1. `count` defaults to the number of entries,
+        which covers every chunk of the sequentially numbered archives.
+        """
+        if count is None:
+            count = len(self.entries)
+        rows = np.full(count, -1, dtype=np.int64)
+        for i in range(count):
+            row = self._by_hash.get(uop_hash(pattern.format(*args, i)))
+            if row is not None:
+                rows[i] = row
+        return rows
+
+    def map_rows(self, map_num):
+        """Table rows of map chunks in file order (missing chunks dropped)"""
+        rows = self.rows_for(MAP_ENTRY, None, map_num)
+        return rows[rows >= 0]
@@ -0,0 +1,292 @@
+"""
+Walkability Grid Baker
+Combines map#.mul land heights, statics#.mul and tiledata.mul flags into the
+Z levels a character can stand on for every tile. Movement checks and
+pathfinding then read a few bytes per tile instead of scanning the statics.
+Read by js/modules/walkGridStreamer.js.
+
+Run: python walk_grid.py [map_number] [--region-blocks N] [--size WIDTHxHEIGHT]
+Output: assets/walkgrid/map#/index.json + w_<rx>_<ry>.bin (same region grid as map_tiler.py)
+
+A level is a surface (land, or the top of a Surface static) with PERSON_HEIGHT
+of free space above it. Impassable land and water have no land level, and
+Impassable statics block the space they occupy. Land stands at the averaged
+corner height, as the server computes it.
+
+Region file (little-endian):
+    char[4]  magic 'UOWK'
+    uint16   version
+    uint16   region x, region y (in regions)
+    uint16   width, height (in tiles; edge regions may be smaller)
+    uint16   reserved
+    uint32   level count
+    uint8    counts[height][width]     levels per tile, row-major (0 = impassable)
+    int8     level_z[level count]      per tile in row-major order, lowest first
+    uint8    level_flags[level count]  LEVEL_FLAGS bits
+"""
+
+from pathlib import Path
+import json
+import struct
+import sys
+
+import numpy as np
+
+from array_utils import gather_ranges
+from map_array import MAP_SIZES, MapArray
+from map_patches import MapPatches
+from statics_index import StaticsIndex
+from tiledata import TileData
+
+MUL_PATH = Path('assets/mul')
+WALKGRID_PATH = Path('assets/walkgrid')
+
+WALK_MAGIC = b'UOWK'
+WALK_VERSION = 1
+WALK_HEADER = struct.Struct('<4sHHHHHHI')
+DEFAULT_REGION_BLOCKS = 32
+
+PERSON_HEIGHT = 16  # Free space needed above a level (as the server checks)
+NO_LEVEL = -32768  # read_surface_grid() value of impassable tiles
+NODRAW_LAND = 0x0002  # Land tile left out of rendering and collision
+
+LEVEL_FLAGS = {
+    'land': 0x01,
+    'surface': 0x02,
+    'bridge': 0x04,
+    'wet': 0x08,
+}
+
+
+def average_land_z(z):
+    """(low, average) land Z per tile from a (height + 1, width + 1) Z raster.
+
+    Same corner rule as the server's GetAverageZ: average along the flatter
+    diagonal, rounding down.
+    """
+    z = z.astype(np.int16)
+    top, right = z[:-1, :-1], z[:-1, 1:]
+    left, bottom = z[1:, :-1], z[1:, 1:]
+    low = np.minimum(np.minimum(top, right), np.minimum(left, bottom))
+    average = np.where(np.abs(top - bottom) > np.abs(left - right),
+                       (left + right) // 2, (top + bottom) // 2)
+    return low, average
+
+
+def bake_region(tiledata, land_ids, land_z, items, x0, y0):
+    """(counts, level_z, level_flags) for one region.
+
+    land_ids: (h, w) tile IDs; land_z: (h + 1, w + 1) Z with one halo
+    row/column; items: StaticsIndex.query() records inside the region.
+    """
+    height, width = land_ids.shape
+    tile_count = height * width
+    _, average = average_land_z(land_z)
+    land_ids = land_ids.reshape(-1)
+    average = average.reshape(-1)
+    drawn = land_ids != NODRAW_LAND
+
+    # Land levels
+    land_ok = drawn & ~tiledata.land_has(land_ids, 'Impassable')
+    land_flags = np.where(tiledata.land_has(land_ids, 'Wet'), LEVEL_FLAGS['wet'], 0) | LEVEL_FLAGS['land']
+    land_tiles = np.flatnonzero(land_ok)
+
+    # Static surfaces and blockers
+    graphic = items['graphic']
+    tile = (items['world_y'].astype(np.int64) - y0) * width + (items['world_x'].astype(np.int64) - x0)
+    base = items['z'].astype(np.int16)
+    item_height = tiledata.static_heights(graphic).astype(np.int16)
+    surface = tiledata.static_has(graphic, 'Surface')
+    bridge = tiledata.static_has(graphic, 'Bridge')
+    impassable = tiledata.static_has(graphic, 'Impassable')
+    # Bridges (stairs, ramps) are walked at half their height
+    walk_height = np.where(bridge, item_height // 2, item_height)
+    top = base + walk_height
+    static_flags = (LEVEL_FLAGS['surface']
+                    | np.where(bridge, LEVEL_FLAGS['bridge'], 0)
+                    | np.where(tiledata.static_has(graphic, 'Wet'), LEVEL_FLAGS['wet'], 0))
+    # Surfaces under the terrain cannot be reached
+    on_top = surface & (~drawn[tile] | (top >= average[tile]))
+
+    candidate_tile = np.concatenate([land_tiles, tile[on_top]])
+    candidate_z = np.concatenate([average[land_tiles], top[on_top]])
+    candidate_flags = np.concatenate([land_flags[land_tiles], static_flags[on_top]]).astype(np.uint8)
+
+    # Space each blocker occupies: surfaces up to where they are walked on,
+    # other impassable statics their full height (at least one unit)
+    blocking = surface | impassable
+    block_tile = tile[blocking]
+    block_low = base[blocking]
+    block_high = np.where(surface, top, base + np.maximum(item_height, 1))[blocking]
+    order = np.argsort(block_tile, kind='stable')
+    block_tile, block_low, block_high = block_tile[order], block_low[order], block_high[order]
+    block_counts = np.bincount(block_tile, minlength=tile_count)
+    block_starts = np.cumsum(block_counts) - block_counts
+
+    # Pair every candidate with the blockers of its tile
+    pair_counts = block_counts[candidate_tile]
+    pair_block = gather_ranges(block_starts[candidate_tile], pair_counts)
+    pair_candidate = np.repeat(np.arange(len(candidate_tile)), pair_counts)
+    level = candidate_z[pair_candidate]
+    hit = (block_low[pair_block] < level + PERSON_HEIGHT) & (block_high[pair_block] > level)
+    blocked = np.bincount(pair_candidate[hit], minlength=len(candidate_tile)) > 0
+
+    keep = ~blocked & (candidate_z >= -128) & (candidate_z <= 127)
+    candidate_tile, candidate_z, candidate_flags = candidate_tile[keep], candidate_z[keep], candidate_flags[keep]
+
+    # One level per (tile, z), merging the flags of everything standing there
+    keys, inverse = np.unique(candidate_tile * 256 + (candidate_z + 128), return_inverse=True)
+    inverse = inverse.reshape(-1)
+    level_flags = np.zeros(len(keys), dtype=np.uint8)
+    np.bitwise_or.at(level_flags, inverse, candidate_flags)
+    level_tiles = keys // 256
+    level_z = (keys % 256 - 128).astype(np.int8)
+    counts = np.minimum(np.bincount(level_tiles, minlength=tile_count), 255).astype(np.uint8)
+    return counts.reshape(height, width), level_z, level_flags
+
+
+def write_region(path, rx, ry, counts, level_z, level_flags):
+    """Write one region file"""
+    height, width = counts.shape
+    with open(path, 'wb') as f:
+        f.write(WALK_HEADER.pack(WALK_MAGIC, WALK_VERSION, rx, ry, width, height, 0, len(level_z)))
+        f.write(np.ascontiguousarray(counts, dtype=np.uint8).tobytes())
+        f.write(np.ascontiguousarray(level_z, dtype=np.int8).tobytes())
+        f.write(np.ascontiguousarray(level_flags, dtype=np.uint8).tobytes())
+
+
+class WalkRegion:
+    """One region file: levels of tile (x, y) are z[offsets[i]:offsets[i + 1]]"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            header = f.read(WALK_HEADER.size)
+            magic, version, self.rx, self.ry, self.width, self.height, _, level_count = \
+                WALK_HEADER.unpack(header)
+            if magic != WALK_MAGIC or version != WALK_VERSION:
+                raise ValueError(f"Not a walk grid region: {path}")
+            self.counts = np.fromfile(f, dtype=np.uint8, count=self.width * self.height) \
+                .reshape(self.height, self.width)
+            self.z = np.fromfile(f, dtype=np.int8, count=level_count)
+            self.flags = np.fromfile(f, dtype=np.uint8, count=level_count)
+        self.offsets = np.zeros(self.counts.size + 1, dtype=np.int64)
+        np.cumsum(self.counts.reshape(-1), out=self.offsets[1:])
+
+    def levels(self, x, y):
+        """(z, flags) arrays of the levels at region-local tile (x, y)"""
+        i = y * self.width + x
+        return self.z[self.offsets[i]:self.offsets[i + 1]], self.flags[self.offsets[i]:self.offsets[i + 1]]
+
+
+def read_surface_grid(directory):
+    """Lowest level of every tile as an int16 [y, x] raster (NO_LEVEL where impassable).
+
+    Upper floors and bridge decks are dropped, which is what 2-D pathfinding needs.
+    """
+    directory = Path(directory)
+    with open(directory / 'index.json') as f:
+        info = json.load(f)
+    grid = np.full((info['height'], info['width']), NO_LEVEL, dtype=np.int16)
+    size = info['regionSize']
+    for rx, ry, width, height in info['regions']:
+        region = WalkRegion(directory / info['file'].format(x=rx, y=ry))
+        counts = region.counts.reshape(-1)
+        lowest = np.full(counts.size, NO_LEVEL, dtype=np.int16)
+        lowest[counts > 0] = region.z[region.offsets[:-1][counts > 0]]
+        grid[ry * size:ry * size + height, rx * size:rx * size + width] = lowest.reshape(height, width)
+    return grid
+
+
+def bake_map(map_num, region_blocks=DEFAULT_REGION_BLOCKS, map_size=None):
+    """Write every walk grid region of a facet plus the region directory"""
+    map_file = MUL_PATH / f"map{map_num}.mul"
+    tiledata_file = MUL_PATH / 'tiledata.mul'
+    for required in (map_file, tiledata_file):
+        if not required.exists():
+            raise FileNotFoundError(f"{required} not found")
+    map_width, map_height = map_size or MAP_SIZES.get(map_num, MAP_SIZES[0])
+
+    tiledata = TileData(tiledata_file)
+    patches = MapPatches.load(MUL_PATH, map_num, map_width, map_height)
+    if patches is not None:
+        print(f"  Applying {patches.land_count} land / {patches.statics_count} statics patched blocks")
+    statics = StaticsIndex.from_mul(MUL_PATH / f"staidx{map_num}.mul", MUL_PATH / f"statics{map_num}.mul",
+                                    map_width, map_height, patches)
+    facet = MapArray(map_file, map_width, map_height, patches)
+
+    output_dir = WALKGRID_PATH / f"map{map_num}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for old in output_dir.glob('w_*.bin'):
+        old.unlink()
+
+    region_size = region_blocks * 8
+    columns = -(-facet.blocks_x // region_blocks)
+    rows = -(-facet.blocks_y // region_blocks)
+    print(f"Baking walk grid for {map_file} ({map_width}×{map_height}, "
+          f"{'High Seas' if tiledata.high_seas else 'classic'} tiledata) into {columns}×{rows} regions")
+
+    regions = []
+    total_bytes = 0
+    total_levels = 0
+    blocked_tiles = 0
+    for rx in range(columns):
+        for ry in range(rows):
+            x0, y0 = rx * region_size, ry * region_size
+            land_ids, _ = facet.region(x0, y0, region_size, region_size)
+            height, width = land_ids.shape
+            # One extra row/column for the corner heights (edge tiles repeat themselves)
+            _, land_z = facet.region(x0, y0, width + 1, height + 1)
+            land_z = np.pad(land_z, ((0, height + 1 - land_z.shape[0]), (0, width + 1 - land_z.shape[1])),
+                            mode='edge')
+            items = statics.query(x0, y0, width, height)
+
+            counts, level_z, level_flags = bake_region(tiledata, land_ids, land_z, items, x0, y0)
+            path = output_dir / f"w_{rx}_{ry}.bin"
+            write_region(path, rx, ry, counts, level_z, level_flags)
+            total_bytes += path.stat().st_size
+            total_levels += len(level_z)
+            blocked_tiles += int(np.count_nonzero(counts == 0))
+            regions.append([rx, ry, width, height])
+        print(f"  Column {rx + 1}/{columns}", end='\r')
+    facet.close()
+
+    directory = {
+        'map': map_num,
+        'version': WALK_VERSION,
+        'width': map_width,
+        'height': map_height,
+        'regionSize': region_size,
+        'columns': columns,
+        'rows': rows,
+        'personHeight': PERSON_HEIGHT,
+        'levelFlags': LEVEL_FLAGS,
+        'file': 'w_{x}_{y}.bin',
+        'regions': regions,
+    }
+    with open(output_dir / 'index.json', 'w') as f:
+        json.dump(directory, f)
+
+    tiles = map_width * map_height
+    print(f"\n✅ {total_levels} levels, {blocked_tiles}/{tiles} tiles impassable, "
+          f"{total_bytes / 1024 / 1024:.1f} MB total -> {output_dir}")
+
+
+def main():
+    args = sys.argv[1:]
+    region_blocks = DEFAULT_REGION_BLOCKS
+    if '--region-blocks' in args:
+        i = args.index('--region-blocks')
+        region_blocks = int(args[i + 1])
+        del args[i:i + 2]
+    map_size = None
+    if '--size' in args:
+        i = args.index('--size')
+        map_size = tuple(int(v) for v in args[i + 1].lower().split('x'))
+        del args[i:i + 2]
+
+    map_num = int(args[0]) if args else 0
+    bake_map(map_num, region_blocks, map_size)
+
+
+if __name__ == '__main__':
+    main()